@@ -0,0 +1,18 @@
+# app/__main__.py
+# ---------------------------------------------------------------------
+# Author: Marvin Schubert
+# © 2025, Marvin Schubert. All rights reserved.
+#
+# Description:
+# Entry point for `python -m app` (headless CLI, see app/cli.py).
+# ---------------------------------------------------------------------
+
+import sys
+from .cli import main
+
+if __name__ == "__main__":
+    if getattr(sys, "frozen", False):
+        # Needed for the parser process pool in frozen builds
+        import multiprocessing
+        multiprocessing.freeze_support()
+    sys.exit(main())
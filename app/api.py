@@ -0,0 +1,219 @@
+# app/api.py
+# ---------------------------------------------------------------------
+# Author: Marvin Schubert
+# © 2025, Marvin Schubert. All rights reserved.
+#
+# Description:
+# Plain Python API for scripts and CI jobs. Builds on FileScanner and
+# never imports PySide6, so it starts as fast as the scan itself.
+# ---------------------------------------------------------------------
+
+import os
+import time
+from typing import Callable, Iterable, List, Optional, Sequence, Tuple
+from .config import Settings
+from .file_scanner import FileScanner
+from .batch_scanner import BatchScanner
+from .scan_diff import DiffScanner, ScanRecord
+from .progress import ScanProgress
+from .cancellation import CancellationToken
+from .scan_metrics import ScanMetrics
+from .tree_model import ScanSnapshot
+
+# Separator between the tree and the extracted file contents
+CONTENTS_HEADER = "\n----- Python / Additional Contents -----\n"
+
+# Heading of each folder's section in the output of a batch scan
+ROOT_HEADER = "===== {} ====="
+
+class ScanResult:
+    """
+    Result of a scan: the ASCII tree, the extracted file contents and the
+    scan's timings and counters.
+    """
+
+    def __init__(self, root_folder: str, tree_str: str, classes_str: str,
+                 metrics: Optional[ScanMetrics] = None):
+        self.root_folder = root_folder
+        self.tree_str = tree_str
+        self.classes_str = classes_str
+        self.metrics = metrics if metrics is not None else ScanMetrics()
+
+    @property
+    def text(self) -> str:
+        """The full output, exactly as shown in the GUI."""
+        return format_output(self.root_folder, self.tree_str, self.classes_str)
+
+    def __str__(self) -> str:
+        return self.text
+
+class BatchResult:
+    """
+    Result of a batch scan: one ScanResult per folder, in the order given,
+    and the combined timings and counters.
+    """
+
+    def __init__(self, results: List[ScanResult], metrics: ScanMetrics):
+        self.results = results
+        self.metrics = metrics
+
+    @property
+    def text(self) -> str:
+        """The combined output, one section per folder."""
+        return format_batch_output((result.root_folder, result.tree_str, result.classes_str)
+                                   for result in self.results)
+
+    def __str__(self) -> str:
+        return self.text
+
+class DiffResult:
+    """
+    Result of a diff scan: the list of changed entries, the content blocks
+    of the added and modified files and the scan's timings and counters.
+    """
+
+    def __init__(self, root_folder: str, changes_str: str, classes_str: str,
+                 metrics: Optional[ScanMetrics] = None):
+        self.root_folder = root_folder
+        self.changes_str = changes_str
+        self.classes_str = classes_str
+        self.metrics = metrics if metrics is not None else ScanMetrics()
+
+    @property
+    def text(self) -> str:
+        """The output: the root name, the changes and the changed contents."""
+        return format_output(self.root_folder, self.changes_str, self.classes_str)
+
+    def __str__(self) -> str:
+        return self.text
+
+def root_name(folder_path: str) -> str:
+    """Name of the scanned folder as printed above the tree."""
+    return os.path.basename(folder_path.rstrip(os.sep))
+
+def format_output(folder_path: str, tree_str: str, classes_str: str) -> str:
+    """
+    Joins root name, tree and (if any) file contents into the final output text.
+    """
+    output_lines = [root_name(folder_path), tree_str]
+    if classes_str.strip():
+        output_lines.append(CONTENTS_HEADER + classes_str)
+    return "\n".join(output_lines)
+
+def format_batch_output(sections: Iterable[Tuple[str, str, str]]) -> str:
+    """
+    Joins (folder_path, tree_str, classes_str) sections into one text; each
+    section starts with a ROOT_HEADER line naming the folder.
+    """
+    return "\n\n".join(f"{ROOT_HEADER.format(folder_path)}\n{format_output(folder_path, tree_str, classes_str)}"
+                       for folder_path, tree_str, classes_str in sections)
+
+def scan(path: str, settings: Optional[Settings] = None,
+         progress_callback: Callable[[ScanProgress], None] = None,
+         cancel_token: Optional[CancellationToken] = None,
+         save_snapshot: str = "") -> ScanResult:
+    """
+    Scans a folder and returns its tree and file contents.
+
+    :param path: Folder to scan.
+    :param settings: Scan settings (defaults to Settings()).
+    :param progress_callback: Optional function receiving ScanProgress snapshots.
+    :param cancel_token: Optional token to stop the scan from another thread
+                         (raises ScanCancelled).
+    :param save_snapshot: Optional file to write a ScanRecord of the scan to,
+                          for later diff scans (see scan_diff).
+    """
+    if settings is None:
+        settings = Settings()
+    scanner = FileScanner(settings, path, progress_callback=progress_callback,
+                          cancel_token=cancel_token)
+    tree_str, classes_str = scanner.build_tree()
+    if save_snapshot:
+        ScanRecord.from_scan(scanner).save(save_snapshot)
+    return ScanResult(path, tree_str, classes_str, scanner.metrics)
+
+def scan_snapshots(paths: Sequence[str], settings: Optional[Settings] = None,
+                   progress_callback: Callable[[ScanProgress], None] = None,
+                   cancel_token: Optional[CancellationToken] = None,
+                   save_snapshot: str = "") -> Tuple[List[ScanSnapshot], ScanMetrics]:
+    """
+    Scans one folder, or several as a batch, without rendering anything.
+    Returns one ScanSnapshot per folder (e.g. for exporter.export) and the
+    timings and counters of the whole scan.
+
+    :param save_snapshot: Optional file to write a ScanRecord to (one folder only, see scan).
+    """
+    if settings is None:
+        settings = Settings()
+    if len(paths) == 1:
+        scanner = FileScanner(settings, paths[0], progress_callback=progress_callback,
+                              cancel_token=cancel_token)
+        scanner.scan()
+        if save_snapshot:
+            ScanRecord.from_scan(scanner).save(save_snapshot)
+        return [scanner.snapshot()], scanner.metrics
+    if save_snapshot:
+        raise ValueError("snapshots can only be saved of a single folder")
+    scanner = BatchScanner(settings, paths, progress_callback=progress_callback,
+                           cancel_token=cancel_token)
+    return [root.snapshot for root in scanner.scan()], scanner.metrics
+
+def scan_diff(path: str, snapshot: str, settings: Optional[Settings] = None,
+              progress_callback: Callable[[ScanProgress], None] = None,
+              cancel_token: Optional[CancellationToken] = None,
+              save_snapshot: str = "") -> DiffResult:
+    """
+    Scans a folder and returns only what changed since a saved snapshot
+    (see DiffScanner). Files unchanged since then are not read or parsed.
+    Raises ScanRecordError if the snapshot cannot be read or was taken of
+    another folder or with other settings.
+
+    :param path: Folder to scan.
+    :param snapshot: File written by an earlier scan with save_snapshot.
+    :param settings: Scan settings, the same as for the snapshot (defaults to Settings()).
+    :param progress_callback: Optional function receiving ScanProgress snapshots.
+    :param cancel_token: Optional token to stop the scan from another thread
+                         (raises ScanCancelled).
+    :param save_snapshot: Optional file to write the new state to (may be `snapshot`
+                          itself, so the next diff starts from here).
+    """
+    if settings is None:
+        settings = Settings()
+    scanner = DiffScanner(settings, path, ScanRecord.load(snapshot),
+                          progress_callback=progress_callback, cancel_token=cancel_token)
+    diff = scanner.scan()
+    if save_snapshot:
+        diff.record.save(save_snapshot)
+    start = time.perf_counter()
+    changes_str, classes_str = diff.render()
+    scanner.metrics.add_time("render", time.perf_counter() - start)
+    scanner.metrics.stop()
+    return DiffResult(path, changes_str, classes_str, scanner.metrics)
+
+def scan_many(paths: Sequence[str], settings: Optional[Settings] = None,
+              progress_callback: Callable[[ScanProgress], None] = None,
+              cancel_token: Optional[CancellationToken] = None) -> BatchResult:
+    """
+    Scans several folders in one batch with shared parser workers
+    (see BatchScanner) and returns one result per folder.
+
+    :param paths: Folders to scan.
+    :param settings: Scan settings for all folders (defaults to Settings()).
+    :param progress_callback: Optional function receiving ScanProgress snapshots
+                              of the whole batch.
+    :param cancel_token: Optional token to stop the batch from another thread
+                         (raises ScanCancelled).
+    """
+    if settings is None:
+        settings = Settings()
+    scanner = BatchScanner(settings, paths, progress_callback=progress_callback,
+                           cancel_token=cancel_token)
+    results = []
+    for root in scanner.scan():
+        start = time.perf_counter()
+        tree_str, classes_str = root.snapshot.render()
+        elapsed = time.perf_counter() - start
+        root.metrics.add_time("render", elapsed)
+        scanner.metrics.add_time("render", elapsed)
+        results.append(ScanResult(root.root_folder, tree_str, classes_str, root.metrics))
+    return BatchResult(results, scanner.metrics)
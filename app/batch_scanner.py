@@ -0,0 +1,123 @@
+# app/batch_scanner.py
+# ---------------------------------------------------------------------
+# Author: Marvin Schubert
+# © 2025, Marvin Schubert. All rights reserved.
+#
+# Description:
+# Scans many root folders in one batch. The roots are walked by a few
+# threads that share one set of parser pools and a cap on concurrent
+# directory listings, so a batch of dozens of repositories neither
+# starts a process pool per root nor thrashes the disk. Progress is
+# reported for the whole batch; results come back in root order.
+# ---------------------------------------------------------------------
+
+import os
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Sequence
+from .config import Settings
+from .file_scanner import FileScanner
+from .content_extractor import ParserPools
+from .cancellation import CancellationToken
+from .progress import BatchProgressReporter, ScanProgress
+from .scan_metrics import ScanMetrics
+from .tree_model import ScanSnapshot
+
+logger = logging.getLogger(__name__)
+
+# Roots in progress at the same time (walking or waiting for parser results)
+MAX_ROOT_THREADS = 8
+
+def batch_roots(folder_path: str) -> List[str]:
+    """
+    The non-hidden subfolders of a folder, sorted by name: the roots of a
+    batch scan started from it.
+    """
+    with os.scandir(folder_path) as it:
+        names = [entry.name for entry in it
+                 if entry.is_dir() and not entry.name.startswith(".")]
+    return [os.path.join(folder_path, name) for name in sorted(names, key=str.lower)]
+
+class RootResult:
+    """
+    Result of one root of a batch scan.
+    """
+    __slots__ = ("root_folder", "snapshot", "metrics")
+
+    def __init__(self, root_folder: str, snapshot: ScanSnapshot, metrics: ScanMetrics):
+        self.root_folder = root_folder
+        self.snapshot = snapshot
+        self.metrics = metrics
+
+class BatchScanner:
+    """
+    Scans several root folders with shared parser pools and a shared cap on
+    concurrent directory listings (settings.batch_io_limit).
+    """
+
+    def __init__(self,
+                 settings: Settings,
+                 roots: Sequence[str],
+                 progress_callback: Callable[[ScanProgress], None] = None,
+                 cancel_token: Optional[CancellationToken] = None):
+        """
+        :param settings: Scan settings, used for every root.
+        :param roots: Folders to scan.
+        :param progress_callback: Optional function receiving ScanProgress snapshots
+                                  of the whole batch (with roots_done / roots_total).
+        :param cancel_token: Optional token; once cancelled, scan() raises ScanCancelled.
+                             It is also triggered when a root fails, to stop the others.
+        """
+        self.settings = settings
+        self.roots = list(roots)
+        self.progress_callback = progress_callback
+        self.cancel_token = cancel_token or CancellationToken()
+        # Combined timings and counters of the most recent batch
+        self.metrics = ScanMetrics()
+
+    def scan(self) -> List[RootResult]:
+        """
+        Scans all roots and returns their results in the order of `roots`.
+        Raises ScanCancelled if the token is triggered meanwhile, or the first
+        error of any root after the other roots were stopped.
+        """
+        self.metrics = ScanMetrics()
+        progress = None
+        if self.progress_callback:
+            progress = BatchProgressReporter(self.progress_callback, len(self.roots))
+        io_slots = threading.BoundedSemaphore(max(1, self.settings.batch_io_limit))
+        threads = max(1, min(len(self.roots), MAX_ROOT_THREADS))
+        start = time.perf_counter()
+
+        results: List[RootResult] = []
+        with ParserPools(self.settings.parser_workers) as pools, \
+                ThreadPoolExecutor(max_workers=threads) as executor:
+            futures = [executor.submit(self._scan_root, root, pools, io_slots,
+                                       progress.root_callback(i) if progress else None)
+                       for i, root in enumerate(self.roots)]
+            try:
+                for future in futures:
+                    results.append(future.result())
+            except BaseException:
+                # Stops the roots still running; the executor waits for them
+                self.cancel_token.cancel()
+                for future in futures:
+                    future.cancel()
+                raise
+
+        for result in results:
+            self.metrics.merge(result.metrics)
+        self.metrics.stop()
+        if progress:
+            progress.finish()
+        logger.info(f"Batch of {len(self.roots)} folders scanned in {time.perf_counter() - start:.2f} s.")
+        return results
+
+    def _scan_root(self, root: str, pools: ParserPools, io_slots: threading.Semaphore,
+                   progress_callback: Optional[Callable[[ScanProgress], None]]) -> RootResult:
+        scanner = FileScanner(self.settings, root, progress_callback=progress_callback,
+                              cancel_token=self.cancel_token, pools=pools, io_slots=io_slots)
+        scanner.scan()
+        return RootResult(root, scanner.snapshot(), scanner.metrics)
@@ -0,0 +1,30 @@
+# app/cancellation.py
+# ---------------------------------------------------------------------
+# Author: Marvin Schubert
+# © 2025, Marvin Schubert. All rights reserved.
+#
+# Description:
+# Cooperative cancellation for scans. The scanner and the parser pool
+# poll a token between entries and stop by raising ScanCancelled.
+# ---------------------------------------------------------------------
+
+class ScanCancelled(Exception):
+    """Raised inside a scan when its cancellation token was triggered."""
+
+class CancellationToken:
+    """
+    A flag that can be set from any thread (e.g. the UI) and is polled by
+    the scanning thread. Reading a plain attribute keeps the check cheap
+    enough to do for every entry.
+    """
+    __slots__ = ("cancelled",)
+
+    def __init__(self):
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def raise_if_cancelled(self):
+        if self.cancelled:
+            raise ScanCancelled()
@@ -0,0 +1,270 @@
+# app/cli.py
+# ---------------------------------------------------------------------
+# Author: Marvin Schubert
+# © 2025, Marvin Schubert. All rights reserved.
+#
+# Description:
+# Headless command line interface (`python -m app`). Scans a folder
+# and writes the same output as the GUI to stdout or a file, without
+# importing PySide6.
+#
+# Usage:
+#   python -m app PATH [-o OUTPUT] [--no-py] [--no-docker] [--no-toml] ...
+# ---------------------------------------------------------------------
+
+import io
+import os
+import sys
+import gzip
+import time
+import logging
+import argparse
+from typing import List, Optional, TextIO
+from .api import scan_snapshots, scan_diff
+from .exporter import EXPORT_FORMATS, EXPORT_TEXT, format_for_path, open_output, write_document
+from .scan_diff import ScanRecordError
+from .parse_cache import ParseCache
+from .config import Settings, SYMLINK_POLICIES, BUDGET_PRIORITIES
+from .parser_services.python_parser import EXTRACTORS
+from .progress import ScanProgress
+
+logger = logging.getLogger(__name__)
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="prompting-assistant-cli",
+        description="Scans folders and prints their ASCII tree and the contents of "
+                    ".py, Docker and .toml files.")
+    parser.add_argument("paths", nargs="+", metavar="PATH",
+                        help="Folder to scan; several folders are scanned as one batch "
+                             "with one output section per folder")
+    parser.add_argument("-o", "--output", default="-",
+                        help="Write the output to this file instead of stdout; the format and "
+                             "compression follow its name (.md, .json, .gz) unless given below")
+    parser.add_argument("--format", choices=EXPORT_FORMATS,
+                        help="Output format: the GUI's plain text, Markdown with fenced code blocks, "
+                             "or JSON (default: from the output file name, else text)")
+    parser.add_argument("--gzip", action="store_true", help="Compress the output with gzip")
+
+    content = parser.add_argument_group("content")
+    content.add_argument("--no-py", action="store_true", help="Do not extract Python classes")
+    content.add_argument("--no-docker", action="store_true", help="Do not include Dockerfiles")
+    content.add_argument("--no-toml", action="store_true", help="Do not include .toml files")
+    content.add_argument("--py-extract", default="classes", metavar="LIST",
+                         help="What to extract from .py files, comma-separated: "
+                              f"{', '.join(EXTRACTORS)} (default: classes)")
+    content.add_argument("--dedup", action="store_true",
+                         help="Print repeated file contents once; later files with the same "
+                              "content refer to the first")
+    content.add_argument("--token-budget", type=int, default=0, metavar="N",
+                         help="Fit the output into about N tokens: the tree is always printed, "
+                              "file contents by priority while they fit (0 = no limit)")
+    content.add_argument("--priority", choices=BUDGET_PRIORITIES, default=Settings().budget_priority,
+                         help="Which file contents come first under --token-budget: shallowest, "
+                              "smallest or most recently modified (default: %(default)s)")
+    content.add_argument("--pin", action="append", default=[], metavar="PATH",
+                         help="File or folder, relative to each PATH, whose contents come before "
+                              "all others under --token-budget (repeatable)")
+
+    walk = parser.add_argument_group("walk")
+    walk.add_argument("--include-git", action="store_true", help="Do not skip .git entries")
+    walk.add_argument("--include-venv", action="store_true", help="Descend into venv folders")
+    walk.add_argument("--skip-python-aux", action="store_true", help="Skip .pyc/.pyo/.pyd files")
+    walk.add_argument("--symlinks", choices=SYMLINK_POLICIES, default=Settings().symlink_policy,
+                      help="How to walk symlinked folders: not at all, each physical folder once, "
+                           "or always except into an ancestor (default: %(default)s)")
+    walk.add_argument("--no-gitignore", action="store_true", help="Do not apply .gitignore files")
+    walk.add_argument("--git-index", action="store_true",
+                      help="List only the files tracked by git, read from .git/index instead of "
+                           "walking the folder (falls back to walking outside a git working tree)")
+    walk.add_argument("--max-depth", type=int, default=0, metavar="N",
+                      help="List folders only down to level N; deeper folders are shown but "
+                           "not listed (1 = only PATH itself, 0 = no limit)")
+    walk.add_argument("--exclude", action="append", default=[], metavar="PATTERN",
+                      help="Extra gitignore-style pattern, relative to each PATH (repeatable)")
+
+    performance = parser.add_argument_group("performance")
+    performance.add_argument("-j", "--workers", type=int, default=0,
+                             help="Parser workers (0 = one per CPU core, 1 = parse inline)")
+    performance.add_argument("--max-file-bytes", type=int, default=Settings().max_file_bytes,
+                             help="Truncate file contents after this many bytes (0 = no limit)")
+    performance.add_argument("--max-total-bytes", type=int, default=0,
+                             help="Read budget for all file contents together (0 = no limit)")
+    performance.add_argument("--io-limit", type=int, default=Settings().batch_io_limit,
+                             help="Directory listings running at once when scanning several "
+                                  "folders (default: %(default)s)")
+    performance.add_argument("--no-cache", action="store_true", help="Do not use the parse cache")
+    performance.add_argument("--cache-path", default="", help="Location of the parse cache database")
+    performance.add_argument("--cache-entries", type=int, default=Settings().parse_cache_entries,
+                             help="Files kept in the parse cache; the least recently used are "
+                                  "dropped beyond that (0 = no limit, default: %(default)s)")
+    performance.add_argument("--clear-cache", action="store_true",
+                             help="Empty the parse cache before scanning")
+
+    snapshots = parser.add_argument_group("snapshots")
+    snapshots.add_argument("--save-snapshot", metavar="FILE",
+                           help="Write a compact record of the scan (tree, file stamps and content "
+                                "digests) to FILE, for later --diff runs")
+    snapshots.add_argument("--diff", metavar="FILE",
+                           help="Print only the entries and contents that changed since the snapshot "
+                                "in FILE; unchanged files are not read (use the same options as for "
+                                "the snapshot)")
+
+    parser.add_argument("--stats", metavar="FILE",
+                        help="Write scan timings and counters as JSON to FILE (- = stderr)")
+    parser.add_argument("--progress", action="store_true", help="Show progress on stderr")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Log scan details to stderr")
+    return parser
+
+def settings_from_args(args: argparse.Namespace) -> Settings:
+    """
+    Maps command line options to scan settings. GUI-only features (watching,
+    streaming into the view) are turned off.
+    """
+    return Settings(
+        skip_git=not args.include_git,
+        skip_venv=not args.include_venv,
+        show_py_content=not args.no_py,
+        show_docker_content=not args.no_docker,
+        show_toml_content=not args.no_toml,
+        skip_python_aux=args.skip_python_aux,
+        use_gitignore=not args.no_gitignore,
+        use_git_index=args.git_index,
+        ignore_patterns=args.exclude,
+        max_depth=args.max_depth,
+        symlink_policy=args.symlinks,
+        parser_workers=args.workers,
+        batch_io_limit=args.io_limit,
+        max_file_bytes=args.max_file_bytes,
+        max_total_bytes=args.max_total_bytes,
+        python_extractors=parse_extractors(args.py_extract),
+        dedup_contents=args.dedup,
+        token_budget=args.token_budget,
+        budget_priority=args.priority,
+        pinned_paths=args.pin,
+        use_parse_cache=not args.no_cache,
+        parse_cache_path=args.cache_path,
+        parse_cache_entries=args.cache_entries,
+        watch_changes=False,
+        stream_results=False,
+    )
+
+def parse_extractors(value: str) -> List[str]:
+    """Splits the --py-extract list; raises ValueError for unknown names."""
+    names = [name.strip() for name in value.split(",") if name.strip()]
+    unknown = [name for name in names if name not in EXTRACTORS]
+    if unknown or not names:
+        raise ValueError(f"unknown --py-extract value: {value}")
+    return names
+
+def print_progress(progress: ScanProgress):
+    """Overwrites a single status line on stderr."""
+    end = "\n" if progress.finished else ""
+    sys.stderr.write(f"\r\033[K{progress.summary()}{end}")
+    sys.stderr.flush()
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Runs the CLI and returns the process exit code.
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    for path in args.paths:
+        if not os.path.isdir(path):
+            parser.error(f"not a directory: {path}")
+    if args.workers < 0:
+        parser.error("--workers must be 0 or greater")
+    if args.io_limit < 1:
+        parser.error("--io-limit must be 1 or greater")
+    if args.max_file_bytes < 0 or args.max_total_bytes < 0:
+        parser.error("byte limits must be 0 or greater")
+    if args.token_budget < 0:
+        parser.error("--token-budget must be 0 or greater")
+    if args.max_depth < 0:
+        parser.error("--max-depth must be 0 or greater")
+    if args.cache_entries < 0:
+        parser.error("--cache-entries must be 0 or greater")
+    if args.save_snapshot or args.diff:
+        if len(args.paths) > 1:
+            parser.error("snapshots can only be taken of a single PATH")
+        if args.token_budget:
+            parser.error("snapshots cannot be combined with --token-budget")
+    try:
+        parse_extractors(args.py_extract)
+    except ValueError as e:
+        parser.error(str(e))
+    fmt, compress = format_for_path(args.output) if args.output != "-" else (EXPORT_TEXT, False)
+    fmt = args.format or fmt
+    compress = compress or args.gzip
+    if args.diff and fmt != EXPORT_TEXT:
+        parser.error("--diff output is plain text only")
+
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.WARNING,
+        format="%(asctime)s [%(levelname)s] %(name)s: %(message)s"
+    )
+
+    if args.clear_cache:
+        cache = ParseCache.open(args.cache_path)
+        if cache is not None:
+            cache.clear()
+            cache.close()
+            logger.info("Parse cache cleared.")
+
+    progress_callback = print_progress if args.progress else None
+    diff = snapshots = None
+    try:
+        if args.diff:
+            diff = scan_diff(args.paths[0], args.diff, settings_from_args(args),
+                             progress_callback=progress_callback, save_snapshot=args.save_snapshot)
+            metrics = diff.metrics
+        else:
+            snapshots, metrics = scan_snapshots(args.paths, settings_from_args(args),
+                                                progress_callback=progress_callback,
+                                                save_snapshot=args.save_snapshot)
+    except KeyboardInterrupt:
+        return 130
+    except ScanRecordError as e:
+        parser.error(str(e))
+
+    # The document is written chunk by chunk, never built as one string
+    start = time.perf_counter()
+    out = open_output(args.output, compress) if args.output != "-" else stdout_output(compress)
+    try:
+        try:
+            if diff is not None:
+                out.write(diff.text)
+            else:
+                write_document(snapshots, out, fmt)
+            if fmt == EXPORT_TEXT:
+                out.write("\n")
+        finally:
+            if out is sys.stdout:
+                out.flush()
+            else:
+                out.close()
+    except BrokenPipeError:
+        if args.output != "-":
+            raise
+        # The reader went away (e.g. `| head`); point stdout at devnull so the
+        # flush at interpreter exit does not fail a second time
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        os.close(devnull)
+        return 141
+    metrics.add_time("render", time.perf_counter() - start)
+    if args.output != "-":
+        logger.info(f"Output written to {args.output}")
+
+    if args.stats == "-":
+        sys.stderr.write(metrics.to_json() + "\n")
+    elif args.stats:
+        with open(args.stats, "w", encoding="utf-8") as f:
+            f.write(metrics.to_json() + "\n")
+    return 0
+
+def stdout_output(compress: bool) -> TextIO:
+    """stdout as the output stream, gzip-compressed if asked to (closing it keeps stdout open)."""
+    if not compress:
+        return sys.stdout
+    return io.TextIOWrapper(gzip.GzipFile(fileobj=sys.stdout.buffer, mode="wb"), encoding="utf-8", newline="")
@@ -7,7 +7,21 @@
 # Defines the application-wide configuration for scanning and UI.
 # ---------------------------------------------------------------------
 
-from typing import Tuple
+from typing import List, Optional, Tuple
+
+# How symlinked folders are walked (Settings.symlink_policy). Every physical
+# folder is identified by (st_dev, st_ino).
+SYMLINKS_NO_FOLLOW = "no-follow"      # Show the link, do not descend into it
+SYMLINKS_FOLLOW_ONCE = "follow-once"  # Descend, but list each physical folder only once
+SYMLINKS_FOLLOW = "follow"            # Descend unless the target is an ancestor (a cycle)
+SYMLINK_POLICIES = (SYMLINKS_NO_FOLLOW, SYMLINKS_FOLLOW_ONCE, SYMLINKS_FOLLOW)
+
+# Which file contents fill a token budget first (Settings.budget_priority).
+# Pinned paths always come first.
+BUDGET_BY_DEPTH = "depth"      # Files closer to the scanned folder first, then smaller ones
+BUDGET_BY_SIZE = "size"        # Smaller files first (most files for the budget)
+BUDGET_BY_RECENCY = "recency"  # Most recently modified files first
+BUDGET_PRIORITIES = (BUDGET_BY_DEPTH, BUDGET_BY_SIZE, BUDGET_BY_RECENCY)
 
 class Settings:
     """
@@ -25,6 +39,27 @@ class Settings:
         show_docker_content: bool = True,
         show_toml_content: bool = True,
         skip_python_aux: bool = False,  # <--- NEU
+        parser_workers: int = 0,  # 0 = one worker per CPU core, 1 = parse inline
+        use_parse_cache: bool = True,
+        parse_cache_path: str = "",  # "" = parse_cache.sqlite3 in the user cache dir
+        parse_cache_entries: int = 200_000,  # Files kept in the parse cache, least recently used go first (0 = no limit)
+        watch_changes: bool = True,  # Keep the output current after file system changes
+        stream_results: bool = True,  # Show output while scanning instead of at the end
+        use_gitignore: bool = True,  # Leave out entries ignored by .gitignore files
+        ignore_patterns: Optional[List[str]] = None,  # Extra gitignore-style patterns, relative to the scanned folder
+        max_file_bytes: int = 2_000_000,  # Larger files are truncated (0 = no limit)
+        max_total_bytes: int = 0,  # Read budget for all file contents together (0 = no limit)
+        python_extractors: Optional[List[str]] = None,  # What to extract from .py files (default: classes)
+        result_cache_bytes: int = 64_000_000,  # Memory for scan results kept by the GUI (0 = no caching)
+        symlink_policy: str = SYMLINKS_FOLLOW_ONCE,  # One of SYMLINK_POLICIES
+        batch_io_limit: int = 4,  # Directory listings running at once in a batch scan
+        dedup_contents: bool = False,  # Emit repeated file contents once, later files refer to the first
+        use_git_index: bool = False,  # List the files tracked in .git/index instead of walking (git working trees)
+        token_budget: int = 0,  # Approximate token limit for the whole output (0 = no limit)
+        budget_priority: str = BUDGET_BY_DEPTH,  # One of BUDGET_PRIORITIES
+        pinned_paths: Optional[List[str]] = None,  # Files/folders (relative to the scanned folder) packed first
+        max_depth: int = 0,  # Deepest folder level that is listed (1 = only the scanned folder, 0 = no limit)
+        preview_depth: int = 0,  # GUI: show the top levels of the tree before the full scan (0 = no preview)
     ):
         self.window_title = window_title
         self.window_size = window_size
@@ -35,3 +70,24 @@ class Settings:
         self.show_docker_content = show_docker_content
         self.show_toml_content = show_toml_content
         self.skip_python_aux = skip_python_aux
+        self.parser_workers = parser_workers
+        self.use_parse_cache = use_parse_cache
+        self.parse_cache_path = parse_cache_path
+        self.parse_cache_entries = parse_cache_entries
+        self.watch_changes = watch_changes
+        self.stream_results = stream_results
+        self.use_gitignore = use_gitignore
+        self.ignore_patterns = list(ignore_patterns or [])
+        self.max_file_bytes = max_file_bytes
+        self.max_total_bytes = max_total_bytes
+        self.python_extractors = list(python_extractors or ["classes"])
+        self.result_cache_bytes = result_cache_bytes
+        self.symlink_policy = symlink_policy
+        self.batch_io_limit = batch_io_limit
+        self.dedup_contents = dedup_contents
+        self.use_git_index = use_git_index
+        self.token_budget = token_budget
+        self.budget_priority = budget_priority
+        self.pinned_paths = list(pinned_paths or [])
+        self.max_depth = max_depth
+        self.preview_depth = preview_depth
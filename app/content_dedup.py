@@ -0,0 +1,69 @@
+# app/content_dedup.py
+# ---------------------------------------------------------------------
+# Author: Marvin Schubert
+# © 2025, Marvin Schubert. All rights reserved.
+#
+# Description:
+# Content blocks of the output ("File: <path>", the extracted content,
+# a separator line) and their deduplication: with dedup_contents on,
+# a block whose content was already emitted for another file is
+# replaced by a one-line reference to that file. Contents are compared
+# by a 128-bit BLAKE2b digest, computed once per block as blocks are
+# produced, so deduplication works on streamed output as well.
+# ---------------------------------------------------------------------
+
+import hashlib
+from typing import Dict, Optional, Tuple
+
+FILE_HEADER = "File: "
+BLOCK_END = "\n------"
+# Body of a block whose content was emitted for an earlier file
+SAME_CONTENT = "Same content as: {}"
+
+def content_block(path: str, content: str) -> str:
+    """The output block of one file's extracted content."""
+    return f"{FILE_HEADER}{path}\n{content}{BLOCK_END}"
+
+def split_block(block: str) -> Tuple[str, str]:
+    """The (path, content) of a content_block()."""
+    header_end = block.index("\n")
+    return block[len(FILE_HEADER):header_end], block[header_end + 1:-len(BLOCK_END)]
+
+def content_digest(content: str) -> bytes:
+    """128-bit digest of a content (lone surrogates from undecodable bytes are kept)."""
+    return hashlib.blake2b(content.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+class ContentDeduplicator:
+    """
+    Turns content blocks, fed in output order, into deduplicated blocks:
+    the first file with a given content keeps its block, later files with
+    the same content get a SAME_CONTENT reference to it.
+    """
+
+    def __init__(self):
+        # Content digest -> path of the first file it was emitted for
+        self._first: Dict[bytes, str] = {}
+        self.duplicates = 0
+
+    def first_path(self, path: str, content: str) -> Optional[str]:
+        """
+        The file the content was already emitted for, or None if this file is
+        the first with it.
+        """
+        first = self._first.setdefault(content_digest(content), path)
+        if first == path:
+            return None
+        self.duplicates += 1
+        return first
+
+    def reference(self, path: str, content: str) -> Optional[str]:
+        """
+        The reference block to emit instead of the file's own block if its
+        content was already emitted for another file, else None.
+        """
+        first = self.first_path(path, content)
+        return content_block(path, SAME_CONTENT.format(first)) if first is not None else None
+
+    def rewrite(self, block: str) -> str:
+        """The block to emit for an already built content_block()."""
+        return self.reference(*split_block(block)) or block
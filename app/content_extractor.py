@@ -0,0 +1,399 @@
+# app/content_extractor.py
+# ---------------------------------------------------------------------
+# Author: Marvin Schubert
+# © 2025, Marvin Schubert. All rights reserved.
+#
+# Description:
+# Runs the parser services for the candidate files collected during a
+# scan. Parsers declared CPU-bound in the registry (.py via ast) go to
+# a process pool, plain reads (Docker, .toml) to a thread pool. Results keep the job order
+# and can be consumed as a stream. The pools can be shared by several
+# scans (ParserPools, used for batch scans).
+# Unchanged files are served from the persistent parse cache.
+# ---------------------------------------------------------------------
+
+import os
+import time
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from .parser_services import python_parser, docker_parser, toml_parser
+from .parser_services.python_parser import extract_python, DEFAULT_EXTRACTORS
+from .parser_services.registry import get_parser
+from .parser_services import instrumentation
+from .parser_services.file_reader import DEFAULT_MAX_FILE_BYTES
+from .parse_cache import ParseCache, CacheKey, Signature
+from .cancellation import CancellationToken
+from .scan_metrics import ScanMetrics
+
+logger = logging.getLogger(__name__)
+
+# Kinds of the built-in parsers (see parser_services/registry.py)
+PYTHON = python_parser.PARSER.kind
+DOCKER = docker_parser.PARSER.kind
+TOML = toml_parser.PARSER.kind
+
+# Below this many jobs the pool start-up costs more than it saves
+MIN_JOBS_FOR_POOL = 16
+
+# How often a wait for parser results checks for cancellation
+CANCEL_POLL_SECONDS = 0.02
+
+def resolve_worker_count(requested: int) -> int:
+    """
+    Turns the parser_workers setting into an actual worker count (0 = one per CPU core).
+    """
+    if requested > 0:
+        return requested
+    return os.cpu_count() or 1
+
+class ParserPools:
+    """
+    The process pool (CPU-bound parsers) and thread pool (plain reads) used for
+    parsing, each with `workers` workers. One instance can be shared by several
+    scans running in different threads, so all of them together never use more
+    workers. The process pool is only started when first needed.
+    """
+
+    def __init__(self, workers: int = 0):
+        """
+        :param workers: Number of workers per pool (0 = one per CPU core).
+        """
+        self.workers = resolve_worker_count(workers)
+        self._lock = threading.Lock()
+        self._process_pool = None
+        self._thread_pool: Optional[ThreadPoolExecutor] = None
+
+    def process_pool(self):
+        with self._lock:
+            if self._process_pool is None:
+                # Imported here: multiprocessing is slow to import and not needed by small scans
+                import multiprocessing
+                from concurrent.futures import ProcessPoolExecutor
+                # "spawn" avoids forking a process that runs Qt threads
+                self._process_pool = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+            return self._process_pool
+
+    def discard_process_pool(self, pool):
+        """
+        Shuts down a process pool that broke (a worker process died), so the
+        next caller of process_pool() gets a fresh one. Does nothing if the
+        pool was already replaced.
+        """
+        with self._lock:
+            if self._process_pool is not pool:
+                return
+            self._process_pool = None
+        pool.shutdown(wait=False)
+
+    def thread_pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._thread_pool is None:
+                self._thread_pool = ThreadPoolExecutor(max_workers=self.workers)
+            return self._thread_pool
+
+    def shutdown(self):
+        """Stops both pools without waiting for running work."""
+        with self._lock:
+            for pool in (self._thread_pool, self._process_pool):
+                if pool is not None:
+                    pool.shutdown(wait=False)
+            self._thread_pool = None
+            self._process_pool = None
+
+    def __enter__(self) -> "ParserPools":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+
+def run_parser(job: Tuple[str, str], max_bytes: int = DEFAULT_MAX_FILE_BYTES,
+               python_extractors: Sequence[str] = DEFAULT_EXTRACTORS) -> str:
+    """
+    Runs the parser for a single (kind, file_path) job, reading at most
+    `max_bytes` of the file (0 = no limit). `python_extractors` selects what
+    is extracted from .py files.
+    Module-level so it can be sent to worker processes.
+    """
+    kind, file_path = job
+    if kind == PYTHON:
+        return extract_python(file_path, max_bytes, python_extractors)
+    return get_parser(kind).parse(file_path, max_bytes)
+
+def extract_contents(jobs: List[Tuple[str, str]], workers: int = 0,
+                     cache: Optional[ParseCache] = None,
+                     cancel_token: Optional[CancellationToken] = None,
+                     max_file_bytes: int = DEFAULT_MAX_FILE_BYTES,
+                     max_total_bytes: int = 0,
+                     python_extractors: Sequence[str] = DEFAULT_EXTRACTORS) -> List[str]:
+    """
+    Runs all (kind, file_path) jobs and returns their results in job order.
+
+    :param jobs: Extraction jobs in tree order.
+    :param workers: Number of parallel workers (0 = one per CPU core, 1 = run inline).
+    :param cache: Optional persistent parse cache; only files that changed are parsed.
+    :param cancel_token: Optional token; raises ScanCancelled soon after it is triggered.
+    :param max_file_bytes: Per-file read cap (0 = no limit); longer files are truncated.
+    :param max_total_bytes: Read budget for all jobs together (0 = no limit); jobs
+                            beyond it are skipped with a marker.
+    :param python_extractors: What to extract from .py files (see python_parser.EXTRACTORS).
+    """
+    results: List[Optional[str]] = [None] * len(jobs)
+    for i, content in iter_contents(jobs, workers, cache, cancel_token=cancel_token,
+                                    max_file_bytes=max_file_bytes,
+                                    max_total_bytes=max_total_bytes,
+                                    python_extractors=python_extractors):
+        results[i] = content
+    return results
+
+def iter_contents(jobs: List[Tuple[str, str]], workers: int = 0,
+                  cache: Optional[ParseCache] = None,
+                  stats: Optional[List[Optional[Tuple[int, int]]]] = None,
+                  cancel_token: Optional[CancellationToken] = None,
+                  max_file_bytes: int = DEFAULT_MAX_FILE_BYTES,
+                  max_total_bytes: int = 0,
+                  python_extractors: Sequence[str] = DEFAULT_EXTRACTORS,
+                  metrics: Optional[ScanMetrics] = None,
+                  pools: Optional[ParserPools] = None) -> Iterator[Tuple[int, str]]:
+    """
+    Like extract_contents, but yields (job index, result) in job order as soon as
+    each result (and all before it) is available, so output can be streamed.
+
+    :param stats: Optional (mtime_ns, size) per job, already known from the walk
+                  (None entries = file could not be stat'ed); avoids a second stat.
+    :param cancel_token: Optional token; raises ScanCancelled soon after it is triggered.
+    :param metrics: Optional ScanMetrics that receives cache counts and per-file timings.
+    :param pools: Optional shared ParserPools (their worker count replaces `workers`);
+                  by default the pools are created for this call and stopped afterwards.
+    """
+    if metrics is None:
+        metrics = ScanMetrics(slowest_files=0)
+    python_extractors = python_parser.normalize_extractors(python_extractors)
+    if stats is None and (cache is not None or max_total_bytes > 0):
+        stats = [_stat(file_path) for _, file_path in jobs]
+    cached: List[Optional[str]] = [None] * len(jobs)
+    if max_total_bytes > 0:
+        _over_budget(jobs, stats, max_file_bytes, max_total_bytes, cached)
+    pending = [i for i in range(len(jobs)) if cached[i] is None]
+
+    signatures: Dict[int, Tuple[CacheKey, Signature]] = {}
+    if cache is not None:
+        start = time.perf_counter()
+        # Truncated results depend on the cap, so only complete reads are cached
+        cacheable = [i for i in pending
+                     if stats[i] is not None and (max_file_bytes <= 0 or stats[i][1] <= max_file_bytes)]
+        still_pending, signatures = _load_cached(jobs, cacheable, pending, cached, cache, stats,
+                                                 python_extractors)
+        metrics.count("cache_hits", len(pending) - len(still_pending))
+        metrics.count("cache_misses", len(still_pending))
+        pending = still_pending
+        metrics.add_time("cache", time.perf_counter() - start)
+
+    new_entries = []
+    parsed = _iter_parsed(jobs, pending, workers, cancel_token, max_file_bytes, python_extractors,
+                          pools)
+    try:
+        for i in range(len(jobs)):
+            content = cached[i]
+            if content is None:
+                _, content, seconds, phases = next(parsed)
+                kind, file_path = jobs[i]
+                failed = _is_error_result(content, file_path)
+                metrics.file_parsed(kind, file_path, seconds, phases, failed)
+                if i in signatures and not failed:
+                    new_entries.append((signatures[i][0], signatures[i][1], content))
+            yield i, content
+    finally:
+        parsed.close()
+        # Keep what was parsed, also when the scan was cancelled half-way
+        if cache is not None:
+            start = time.perf_counter()
+            cache.put_many(new_entries)
+            metrics.add_time("cache", time.perf_counter() - start)
+
+def _stat(file_path: str) -> Optional[Tuple[int, int]]:
+    """(mtime_ns, size) of a file, None if it cannot be stat'ed."""
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+def _over_budget(jobs: List[Tuple[str, str]], stats: List[Optional[Tuple[int, int]]],
+                 max_file_bytes: int, max_total_bytes: int, results: List[Optional[str]]) -> int:
+    """
+    Charges each job (in job order) with the bytes it will read and fills
+    `results` with a skip marker for every job that no longer fits into
+    `max_total_bytes`. Returns the number of skipped jobs.
+    """
+    used = 0
+    skipped = 0
+    for i in range(len(jobs)):
+        size = stats[i][1] if stats[i] is not None else 0
+        if max_file_bytes > 0:
+            size = min(size, max_file_bytes)
+        if used + size > max_total_bytes:
+            results[i] = budget_marker(max_total_bytes)
+            skipped += 1
+        else:
+            used += size
+    if skipped:
+        logger.warning(f"Read budget of {max_total_bytes:,} bytes exhausted, skipped {skipped} files.")
+    return skipped
+
+def budget_marker(max_total_bytes: int) -> str:
+    return f"[Skipped: total read budget of {max_total_bytes:,} bytes exhausted]"
+
+def _load_cached(jobs: List[Tuple[str, str]], cacheable: List[int], pending: List[int],
+                 results: List[Optional[str]], cache: ParseCache,
+                 stats: List[Optional[Tuple[int, int]]],
+                 python_extractors: Tuple[str, ...] = DEFAULT_EXTRACTORS
+                 ) -> Tuple[List[int], Dict[int, Tuple[CacheKey, Signature]]]:
+    """
+    Looks up the `cacheable` jobs and fills `results` with cache hits. Returns
+    the `pending` indices that still need parsing and the cache key/signature
+    of every cacheable job.
+    """
+    signatures: Dict[int, Tuple[CacheKey, Signature]] = {}
+    for i in cacheable:
+        kind, file_path = jobs[i]
+        key = (os.path.abspath(file_path), _cache_kind(kind, python_extractors))
+        signatures[i] = (key, (stats[i][0], stats[i][1], get_parser(kind).version))
+
+    hits = cache.get_many(dict(signatures.values()))
+    still_pending = []
+    for i in pending:
+        content = hits.get(signatures[i][0]) if i in signatures else None
+        if content is None:
+            still_pending.append(i)
+        else:
+            results[i] = content
+
+    logger.info(f"Parse cache: {len(pending) - len(still_pending)} hits, {len(still_pending)} misses.")
+    return still_pending, signatures
+
+def _cache_kind(kind: str, python_extractors: Tuple[str, ...]) -> str:
+    """
+    Kind stored in the cache key. Python results depend on the selected
+    extractors; the default selection keeps the plain kind.
+    """
+    if kind == PYTHON and python_extractors != DEFAULT_EXTRACTORS:
+        return f"{kind}:{','.join(python_extractors)}"
+    return kind
+
+def _is_error_result(content: str, file_path: str) -> bool:
+    """
+    Parsers report failures as "Error reading <path>: ..."; those are not cached
+    because they may be caused by transient conditions (permissions, locks).
+    """
+    return content.startswith(f"Error reading {file_path}:")
+
+def run_parser_timed(job: Tuple[str, str], max_bytes: int = DEFAULT_MAX_FILE_BYTES,
+                     python_extractors: Sequence[str] = DEFAULT_EXTRACTORS
+                     ) -> Tuple[str, float, Dict[str, float]]:
+    """
+    Runs a job and returns (result, seconds, totals recorded by the parser services).
+    """
+    instrumentation.take()
+    start = time.perf_counter()
+    content = run_parser(job, max_bytes, python_extractors)
+    return content, time.perf_counter() - start, instrumentation.take()
+
+def run_parser_batch(batch: List[Tuple[str, str]], max_bytes: int = DEFAULT_MAX_FILE_BYTES,
+                     python_extractors: Sequence[str] = DEFAULT_EXTRACTORS
+                     ) -> List[Tuple[str, float, Dict[str, float]]]:
+    """Runs a batch of jobs in one worker call (less inter-process overhead)."""
+    return [run_parser_timed(job, max_bytes, python_extractors) for job in batch]
+
+def _iter_parsed(jobs: List[Tuple[str, str]], indices: List[int], workers: int,
+                 cancel_token: Optional[CancellationToken] = None,
+                 max_bytes: int = DEFAULT_MAX_FILE_BYTES,
+                 python_extractors: Sequence[str] = DEFAULT_EXTRACTORS,
+                 pools: Optional[ParserPools] = None
+                 ) -> Iterator[Tuple[int, str, float, Dict[str, float]]]:
+    """
+    Parses the jobs at `indices` and yields (index, result, seconds, parser totals)
+    in the order of `indices`.
+    Consecutive jobs of the same cost class are batched; CPU-bound batches go to a
+    process pool, the rest to a thread pool. Batches are submitted up front and
+    collected in order, so early results stream while later ones are still parsed.
+    """
+    if cancel_token is None:
+        cancel_token = CancellationToken()
+    workers = pools.workers if pools is not None else resolve_worker_count(workers)
+    if workers <= 1 or len(indices) < MIN_JOBS_FOR_POOL:
+        for i in indices:
+            cancel_token.raise_if_cancelled()
+            yield (i,) + run_parser_timed(jobs[i], max_bytes, python_extractors)
+        return
+
+    cpu_bound_kinds = {kind for kind, _ in jobs if get_parser(kind).cpu_bound}
+    use_processes = sum(1 for i in indices if jobs[i][0] in cpu_bound_kinds) >= MIN_JOBS_FOR_POOL
+    batch_size = max(1, min(64, len(indices) // (workers * 4)))
+
+    # Split into runs of consecutive indices with the same cost class
+    batches: List[Tuple[bool, List[int]]] = []
+    for i in indices:
+        cpu_bound = use_processes and jobs[i][0] in cpu_bound_kinds
+        if not batches or batches[-1][0] != cpu_bound or len(batches[-1][1]) >= batch_size:
+            batches.append((cpu_bound, []))
+        batches[-1][1].append(i)
+
+    from concurrent.futures.process import BrokenProcessPool
+
+    own_pools = pools is None
+    if own_pools:
+        pools = ParserPools(workers)
+    futures: List[Optional[Future]] = []
+    # Pool of each batch, to replace a process pool that broke
+    batch_pools = []
+    try:
+        for cpu_bound, batch in batches:
+            pool = pools.process_pool() if cpu_bound else pools.thread_pool()
+            batch_pools.append(pool)
+            try:
+                futures.append(pool.submit(run_parser_batch, [jobs[i] for i in batch], max_bytes,
+                                           python_extractors))
+            except BrokenProcessPool:
+                # The pool broke while this scan used it; parsed inline below
+                futures.append(None)
+
+        for (cpu_bound, batch), future, pool in zip(batches, futures, batch_pools):
+            try:
+                if future is None:
+                    raise BrokenProcessPool("the process pool is no longer usable")
+                batch_results = _wait_for(future, cancel_token)
+            except BrokenProcessPool as e:
+                # E.g. the worker processes could not import the app; parse the rest inline.
+                # The next scan gets a fresh pool.
+                logger.warning(f"Parser process pool failed, parsing inline instead: {e}")
+                pools.discard_process_pool(pool)
+                batch_results = run_parser_batch([jobs[i] for i in batch], max_bytes,
+                                                 python_extractors)
+            for i, timed in zip(batch, batch_results):
+                yield (i,) + timed
+    finally:
+        # Also reached on cancellation or when the consumer stops early: drop work that
+        # has not started and do not wait for running batches
+        for future in futures:
+            if future is not None:
+                future.cancel()
+        if own_pools:
+            pools.shutdown()
+
+    logger.info(f"Parsed {len(indices)} files with {workers} workers "
+                f"({'processes' if use_processes else 'threads'} for .py files).")
+
+def _wait_for(future: Future, cancel_token: CancellationToken):
+    """
+    Waits for a batch result, checking the cancellation token in between.
+    """
+    while True:
+        cancel_token.raise_if_cancelled()
+        try:
+            return future.result(timeout=CANCEL_POLL_SECONDS)
+        except FuturesTimeoutError:
+            continue
@@ -0,0 +1,204 @@
+# app/exporter.py
+# ---------------------------------------------------------------------
+# Author: Marvin Schubert
+# © 2025, Marvin Schubert. All rights reserved.
+#
+# Description:
+# Writes scan results to files as plain text (the same text the GUI
+# copies), Markdown with fenced code blocks, or JSON, optionally
+# gzip-compressed. The document is produced as a stream of chunks
+# straight from the ScanSnapshots: tree lines are rendered a batch of
+# nodes at a time and content blocks are written one by one, so the
+# whole output never exists as one string.
+# ---------------------------------------------------------------------
+
+import io
+import re
+import gzip
+import json
+import logging
+from typing import Iterator, List, Optional, Sequence, TextIO, Tuple
+from .api import CONTENTS_HEADER, ROOT_HEADER, root_name
+from .content_dedup import ContentDeduplicator, SAME_CONTENT, split_block
+from .tree_model import ScanSnapshot, TreeRenderer
+
+logger = logging.getLogger(__name__)
+
+# Output formats
+EXPORT_TEXT = "text"          # Exactly the text "Copy Output" gives
+EXPORT_MARKDOWN = "markdown"  # Tree and file contents in fenced code blocks
+EXPORT_JSON = "json"          # {"roots": [{"root_folder", "tree", "files", "note"}]}
+EXPORT_FORMATS = (EXPORT_TEXT, EXPORT_MARKDOWN, EXPORT_JSON)
+
+# File extension of each format, and the suffix of compressed files
+FORMAT_EXTENSIONS = {EXPORT_TEXT: ".txt", EXPORT_MARKDOWN: ".md", EXPORT_JSON: ".json"}
+GZIP_SUFFIX = ".gz"
+
+# Tree nodes rendered per chunk
+EXPORT_BATCH_NODES = 10_000
+
+# Fenced code block languages by file name
+_LANGUAGES = ((".py", "python"), (".toml", "toml"), ("dockerfile", "dockerfile"))
+
+_BACKTICK_RUN = re.compile(r"`{3,}")
+
+def format_for_path(file_path: str) -> Tuple[str, bool]:
+    """
+    The (format, compress) an output file name asks for: a ".gz" suffix
+    means gzip, ".md" Markdown, ".json" JSON, anything else plain text.
+    """
+    lower = file_path.lower()
+    compress = lower.endswith(GZIP_SUFFIX)
+    if compress:
+        lower = lower[:-len(GZIP_SUFFIX)]
+    for fmt, extension in FORMAT_EXTENSIONS.items():
+        if lower.endswith(extension):
+            return fmt, compress
+    return EXPORT_TEXT, compress
+
+def iter_document(snapshots: Sequence[ScanSnapshot], fmt: str = EXPORT_TEXT) -> Iterator[str]:
+    """
+    Yields the output of one or more scans in chunks. Joined, the text
+    format equals format_output (one root) or format_batch_output.
+    """
+    if fmt == EXPORT_TEXT:
+        return _iter_text(snapshots)
+    if fmt == EXPORT_MARKDOWN:
+        return _iter_markdown(snapshots)
+    if fmt == EXPORT_JSON:
+        return _iter_json(snapshots)
+    raise ValueError(f"Unknown export format: {fmt}")
+
+def render_document(snapshots: Sequence[ScanSnapshot], fmt: str = EXPORT_TEXT) -> str:
+    """The whole document as one string (e.g. for the clipboard)."""
+    return "".join(iter_document(snapshots, fmt))
+
+def write_document(snapshots: Sequence[ScanSnapshot], stream: TextIO, fmt: str = EXPORT_TEXT):
+    """Writes the document chunk by chunk to a text stream."""
+    for chunk in iter_document(snapshots, fmt):
+        stream.write(chunk)
+
+def export(snapshots: Sequence[ScanSnapshot], file_path: str,
+           fmt: Optional[str] = None, compress: Optional[bool] = None):
+    """
+    Writes the document to a file.
+
+    :param fmt: One of EXPORT_FORMATS (default: from the file name, see format_for_path).
+    :param compress: Write gzip (default: if the file name ends with ".gz").
+    """
+    path_fmt, path_compress = format_for_path(file_path)
+    fmt = fmt or path_fmt
+    compress = path_compress if compress is None else compress
+    with open_output(file_path, compress) as f:
+        write_document(snapshots, f, fmt)
+    logger.info(f"Exported {len(snapshots)} result(s) as {fmt} to {file_path}.")
+
+def open_output(file_path: str, compress: bool = False) -> TextIO:
+    """Opens a UTF-8 text file for writing, gzip-compressed if asked to."""
+    if compress:
+        return io.TextIOWrapper(gzip.open(file_path, "wb"), encoding="utf-8", newline="")
+    return open(file_path, "w", encoding="utf-8", newline="")
+
+def _tree_chunks(snapshot: ScanSnapshot) -> Iterator[List[str]]:
+    """The tree lines of a snapshot, EXPORT_BATCH_NODES nodes at a time."""
+    renderer = TreeRenderer(snapshot.tree)
+    while True:
+        lines = renderer.render_new(EXPORT_BATCH_NODES)
+        if not lines and renderer.pending == 0:
+            return
+        yield lines
+
+def _files(snapshot: ScanSnapshot) -> Iterator[Tuple[str, str, Optional[str]]]:
+    """(path, content, first path with the same content or None) of each content block, in tree order."""
+    dedup = ContentDeduplicator() if snapshot.dedup else None
+    contents = snapshot.node_contents
+    for node in sorted(contents):
+        for block in contents[node]:
+            path, content = split_block(block)
+            yield path, content, dedup.first_path(path, content) if dedup else None
+
+def _has_contents(snapshot: ScanSnapshot) -> bool:
+    return bool(snapshot.note) or any(snapshot.node_contents.values())
+
+def _iter_text(snapshots: Sequence[ScanSnapshot]) -> Iterator[str]:
+    batch = len(snapshots) > 1
+    for i, snapshot in enumerate(snapshots):
+        if batch:
+            yield ("\n\n" if i else "") + ROOT_HEADER.format(snapshot.root_folder) + "\n"
+        yield root_name(snapshot.root_folder) + "\n"
+        separator = ""
+        for lines in _tree_chunks(snapshot):
+            if lines:
+                yield separator + "\n".join(lines)
+                separator = "\n"
+        if not _has_contents(snapshot):
+            continue
+        separator = "\n" + CONTENTS_HEADER
+        for path, content, first in _files(snapshot):
+            body = SAME_CONTENT.format(first) if first is not None else content
+            yield f"{separator}File: {path}\n{body}\n------"
+            separator = "\n"
+        if snapshot.note:
+            yield separator + snapshot.note
+
+def _fence(text: str) -> str:
+    """A code fence longer than any run of backticks in the text."""
+    longest = max((len(run) for run in _BACKTICK_RUN.findall(text)), default=2)
+    return "`" * (longest + 1)
+
+def _language(path: str) -> str:
+    lower = path.lower()
+    for ending, language in _LANGUAGES:
+        if lower.endswith(ending):
+            return language
+    return ""
+
+def _iter_markdown(snapshots: Sequence[ScanSnapshot]) -> Iterator[str]:
+    batch = len(snapshots) > 1
+    for i, snapshot in enumerate(snapshots):
+        title = snapshot.root_folder if batch else root_name(snapshot.root_folder)
+        yield ("\n" if i else "") + f"# {title}\n\n"
+        # Only names and link targets can put backticks into the tree lines
+        tree = snapshot.tree
+        fence = _fence("\n".join([name for name in tree.names if "`" in name]
+                                  + list(tree.link_targets.values())))
+        yield f"{fence}text\n"
+        for lines in _tree_chunks(snapshot):
+            if lines:
+                yield "\n".join(lines) + "\n"
+        yield f"{fence}\n"
+        if not _has_contents(snapshot):
+            continue
+        yield "\n## Contents\n"
+        for path, content, first in _files(snapshot):
+            if first is not None:
+                yield f"\n### {path}\n\n{SAME_CONTENT.format(first)}\n"
+                continue
+            fence = _fence(content)
+            body = content.rstrip("\n")
+            yield f"\n### {path}\n\n{fence}{_language(path)}\n{body}\n{fence}\n"
+        if snapshot.note:
+            yield f"\n_{snapshot.note}_\n"
+
+def _iter_json(snapshots: Sequence[ScanSnapshot]) -> Iterator[str]:
+    dumps = json.dumps
+    yield '{"roots": ['
+    for i, snapshot in enumerate(snapshots):
+        yield f'{"," if i else ""}\n{{"root_folder": {dumps(snapshot.root_folder, ensure_ascii=False)},\n"tree": ['
+        separator = ""
+        for lines in _tree_chunks(snapshot):
+            if lines:
+                yield separator + ", ".join(dumps(line, ensure_ascii=False) for line in lines)
+                separator = ", "
+        yield '],\n"files": ['
+        separator = "\n"
+        for path, content, first in _files(snapshot):
+            entry = {"path": path}
+            if first is not None:
+                entry["same_as"] = first
+            else:
+                entry["content"] = content
+            yield separator + dumps(entry, ensure_ascii=False)
+            separator = ",\n"
+        yield f'],\n"note": {dumps(snapshot.note, ensure_ascii=False)}}}'
+    yield "\n]}\n"
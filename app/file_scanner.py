@@ -6,18 +6,56 @@
 # Description:
 # Encapsulates logic for walking directories, building an ASCII tree,
 # and optionally parsing specialized files (.py, Docker, .toml).
+# The walk is a single iterative os.scandir pass that fills a compact
+# ScanTree; the progress total is a running estimate instead of a
+# separate counting walk.
 # ---------------------------------------------------------------------
 
 import os
+import copy
+import time
 import logging
-from typing import Callable, Tuple
-from .parser_services.python_parser import extract_python_classes
-from .parser_services.docker_parser import read_dockerfile_content
-from .parser_services.toml_parser import read_toml_content
-from .config import Settings
+import threading
+from operator import itemgetter
+from typing import Callable, Collection, Dict, List, Optional, Set, Tuple, Union
+from .content_extractor import iter_contents, ParserPools
+from .content_dedup import ContentDeduplicator, content_block
+from .packer import TokenPacker, estimate_tree_tokens, omitted_note
+from .parser_services.registry import ParserTable, enabled_parsers, registered_parsers
+from .parse_cache import ParseCache
+from .cancellation import CancellationToken, ScanCancelled
+from .ignore_rules import IgnoreRules, IgnoreSpec, GITIGNORE_NAME
+from .git_index import (
+    find_git_dir, read_index, GitIndexError, MODE_TYPE_MASK, MODE_DIRECTORY, MODE_SYMLINK, MODE_GITLINK
+)
+from .config import Settings, SYMLINK_POLICIES, SYMLINKS_NO_FOLLOW, SYMLINKS_FOLLOW_ONCE
+from .progress import ProgressReporter, ScanProgress
+from .scan_metrics import ScanMetrics
+from .tree_model import (
+    ScanTree, ScanSnapshot, ScanStamps, TreeRenderer, FLAG_DIR, FLAG_LAST, FLAG_VENV_SKIPPED, FLAG_ACCESS_DENIED,
+    FLAG_SYMLINK, FLAG_LINK_NOT_FOLLOWED, FLAG_ALREADY_LISTED, FLAG_SUBMODULE, FLAG_DEPTH_LIMIT
+)
 
 logger = logging.getLogger(__name__)
 
+# Sections reported to the output callback
+TREE_SECTION = "tree"
+CONTENTS_SECTION = "contents"
+
+# (st_dev, st_ino) of a physical directory
+DirId = Tuple[int, int]
+
+# Tracked paths read from the git index: directory name -> its entries,
+# file name -> index file mode
+TrackedDir = Dict[str, Union["TrackedDir", int]]
+
+# Compiled Python files, left out with settings.skip_python_aux
+PYTHON_AUX_EXTS = (".pyc", ".pyo", ".pyd")
+
+# Streamed output is sent in batches of this many lines/blocks, or after this time
+OUTPUT_BATCH_SIZE = 1000
+OUTPUT_BATCH_SECONDS = 0.1
+
 class FileScanner:
     """
     Responsible for:
@@ -29,116 +67,841 @@ class FileScanner:
     def __init__(self,
                  settings: Settings,
                  root_folder: str,
-                 progress_callback: Callable[[int], None] = None):
+                 progress_callback: Callable[[ScanProgress], None] = None,
+                 output_callback: Callable[[str, str], None] = None,
+                 cancel_token: Optional[CancellationToken] = None,
+                 pools: Optional[ParserPools] = None,
+                 io_slots: Optional[threading.Semaphore] = None,
+                 unchanged: Optional[Callable[[str, Tuple[int, int]], bool]] = None,
+                 parse_contents: bool = True):
         """
         :param settings: Settings object containing user preferences.
         :param root_folder: The folder to be scanned.
-        :param progress_callback: Optional function to call upon processing each item (for UI updates).
+        :param progress_callback: Optional function receiving ScanProgress snapshots
+                                  (for UI updates), rate-limited to a few per second.
+        :param output_callback: Optional function called with (section, text) while scanning,
+                                section being TREE_SECTION or CONTENTS_SECTION. Joining the
+                                chunks of a section with "\n" gives build_tree's result;
+                                at least one (possibly empty) tree chunk is always sent.
+        :param cancel_token: Optional token; once cancelled, scan() stops at the next
+                             entry or parser result and raises ScanCancelled.
+        :param pools: Optional parser pools shared with other scans (see BatchScanner);
+                      by default each scan starts its own.
+        :param io_slots: Optional semaphore shared with other scans; every directory
+                         listing holds one slot, which caps concurrent listings.
+        :param unchanged: Optional predicate called with the path and (mtime_ns, size) of
+                          each candidate file; files for which it returns True are neither
+                          read nor parsed and get no content (used by diff scans).
+        :param parse_contents: False builds the tree only; no file is a candidate for
+                               parsing, whatever the settings enable (used by preview).
         """
         self.settings = settings
         self.root_folder = root_folder
         self.progress_callback = progress_callback
+        self.output_callback = output_callback
+        self.cancel_token = cancel_token or CancellationToken()
+        self.pools = pools
+        self.io_slots = io_slots
+        self.unchanged = unchanged
 
         # Known virtual environment folder names
         self.venv_names = {"venv", ".venv", "env", ".env"}
 
-        # Pre-calculate total entries for progress bar
-        self.total_entries = self.count_entries()
-        self.processed_count = 0
+        # How symlinked folders are walked; the follow policies need the
+        # (st_dev, st_ino) of every listed directory
+        if settings.symlink_policy not in SYMLINK_POLICIES:
+            raise ValueError(f"Unknown symlink policy: {settings.symlink_policy}")
+        self._follow_links = settings.symlink_policy != SYMLINKS_NO_FOLLOW
+        self._real_root = os.path.realpath(root_folder)
+
+        # File name -> parser lookup for the parsers enabled in the settings
+        self.parsers = ParserTable(enabled_parsers(settings) if parse_contents else [])
+
+        # .gitignore files and the user's extra patterns; ignored directories are not listed
+        self.ignore_rules = IgnoreRules(root_folder, settings.use_gitignore, settings.ignore_patterns)
+        self._rules = self.ignore_rules if self.ignore_rules.active else None
+        # With settings.use_git_index only the extra patterns apply (git lists
+        # tracked files even if a .gitignore matches them)
+        self._extra_spec = IgnoreSpec.from_lines(settings.ignore_patterns)
+
+        # Running estimate of the total entry count. It grows while directories
+        # are listed, so no extra counting walk is needed before scanning.
+        self.total_entries = 0
+        self._listed_dirs = 0
+        self._pending_dirs = 0
+
+        # State of streamed output (see output_callback)
+        self._last_output = 0.0
+        self._tree_sent = False
+
+        # Tree of the most recent scan (see scan()) and the content blocks
+        # of every candidate file in it, by node index
+        self.tree: Optional[ScanTree] = None
+        self.node_contents: Dict[int, List[str]] = {}
+        # (mtime_ns, size) of every candidate file node, None if stat failed
+        self.node_stats: Dict[int, Optional[Tuple[int, int]]] = {}
+        # mtime_ns of every listed directory node, taken before listing it (-1 if stat failed)
+        self.dir_mtimes: Dict[int, int] = {}
+        # (mtime_ns, size) of files read besides the tree's files (the git index)
+        self.file_stamps: Dict[str, Optional[Tuple[int, int]]] = {}
+        # What settings.token_budget left out of the last scan ("" = nothing)
+        self.budget_note = ""
+
+        # Phase timers, counters and slowest files of the most recent scan
+        self.metrics = ScanMetrics()
+
+        # Coalesces per-entry progress into a few callbacks per second
+        self._progress: Optional[ProgressReporter] = None
+        if progress_callback:
+            self._progress = ProgressReporter(progress_callback, self._estimate_total)
 
     def count_entries(self) -> int:
         """
         Counts all files/folders under root_folder,
-        skipping venv folders if skip_venv is True.
+        skipping venv folders if skip_venv is True and ignored entries.
+        Not used by build_tree (which estimates the total while walking),
+        but kept for callers that need an exact count up front.
+        Symlinked folders are followed (or not) like scan() does, folders
+        below settings.max_depth are not walked, and with
+        settings.use_git_index the tracked entries are counted.
         """
+        if self.settings.use_git_index:
+            tracked = self._tracked_tree(self.root_folder)
+            if tracked is not None:
+                return self._count_tracked(tracked)
+        rules = self._rules
+        follow = self._follow_links
+        max_depth = self.settings.max_depth
+        root_ids = (self._dir_id(self.root_folder),) if follow else ()
+        visited: Set[DirId] = set(root_ids)
+        # Ignore specs, top-relative path and ancestor directory ids of each
+        # directory still to be walked
+        pending = {self.root_folder: (rules.specs_for(self.root_folder) if rules else (),
+                                      rules.relative(self.root_folder) if rules else "",
+                                      root_ids)}
         total_count = 0
-        for root, dirs, files in os.walk(self.root_folder):
+        for root, dirs, files in os.walk(self.root_folder, followlinks=follow):
+            specs, rel, ancestors = pending.pop(root)
             if self.settings.skip_venv:
                 dirs[:] = [d for d in dirs if d.lower() not in self.venv_names]
+            if specs:
+                prefix = f"{rel}/" if rel else ""
+                dirs[:] = [d for d in dirs if not rules.is_ignored(specs, prefix + d, d, True)]
+                files = [f for f in files if not rules.is_ignored(specs, prefix + f, f, False)]
             total_count += len(dirs) + len(files)
+            if max_depth > 0 and self._depth_of(root) + 1 >= max_depth:
+                dirs[:] = []
+            walked = []
+            for d in dirs:
+                child_path = os.path.join(root, d)
+                child_ancestors = ancestors
+                if follow:
+                    dir_id = self._dir_id(child_path)
+                    if self._already_listed(child_path, os.path.islink(child_path), dir_id,
+                                            ancestors, visited):
+                        continue
+                    child_ancestors = ancestors + (dir_id,)
+                walked.append(d)
+                if rules:
+                    child_rel = f"{rel}/{d}" if rel else d
+                    has_gitignore = os.path.isfile(os.path.join(child_path, GITIGNORE_NAME))
+                    pending[child_path] = (rules.child_specs(specs, child_path, child_rel, has_gitignore),
+                                           child_rel, child_ancestors)
+                else:
+                    pending[child_path] = ((), "", child_ancestors)
+            dirs[:] = walked
         return total_count
 
+    def snapshot(self) -> ScanSnapshot:
+        """The result of the last scan() as a ScanSnapshot."""
+        stamps: Dict[int, Optional[Tuple[int, int]]] = dict(self.node_stats)
+        stamps.update((node, (mtime, 0)) for node, mtime in self.dir_mtimes.items())
+        files = dict(self.file_stamps)
+        if self._rules:
+            files.update(self._rules.loaded_files)
+        return ScanSnapshot(self.tree, self.node_contents, self.settings.dedup_contents, self.budget_note,
+                            ScanStamps.from_nodes(stamps, files))
+
+    def preview(self, depth: int) -> ScanTree:
+        """
+        The top `depth` levels of the tree (within settings.max_depth), without
+        file contents. Only the folders above that depth are listed, so a
+        preview takes about the same time however large the deeper subtrees
+        are; folders at the limit are marked FLAG_DEPTH_LIMIT.
+        """
+        settings = copy.copy(self.settings)
+        if settings.max_depth <= 0 or depth < settings.max_depth:
+            settings.max_depth = depth
+        scanner = FileScanner(settings, self.root_folder, cancel_token=self.cancel_token,
+                              io_slots=self.io_slots, parse_contents=False)
+        tree, _ = scanner.scan()
+        return tree
+
     def build_tree(self, path: str = "", prefix: str = "") -> Tuple[str, str]:
         """
-        Recursively builds an ASCII tree of the directory structure
+        Builds an ASCII tree of the directory structure
         and collects relevant file contents (Python classes, Docker, .toml).
         """
+        tree, file_contents = self.scan(path)
+        start = time.perf_counter()
+        tree_str = tree.render(prefix)
+        self.metrics.add_time("render", time.perf_counter() - start)
+        self.metrics.stop()
+        return tree_str, "\n".join(file_contents)
+
+    def scan(self, path: str = "",
+             descend: Optional[Callable[[str], bool]] = None) -> Tuple[ScanTree, List[str]]:
+        """
+        Walks the directory structure iteratively (depth-first, sorted by name)
+        and fills a compact ScanTree. Each directory is listed once with
+        os.scandir and the cached DirEntry type information is reused instead
+        of extra stat calls.
+        Entries ignored by .gitignore files or the extra ignore patterns are
+        left out; ignored directories are never listed.
+        Symlinked folders are handled by settings.symlink_policy; no physical
+        folder is listed twice on one path (and with "follow-once" at all).
+        Folders below settings.max_depth (counted from root_folder) are added
+        with FLAG_DEPTH_LIMIT but not listed.
+        With settings.use_git_index the tree is built from the paths in the git
+        index instead (see _add_tracked); outside a git working tree, or if the
+        index cannot be read, the folder is walked.
+        Candidate files are only collected during the walk and parsed afterwards
+        by the content extractor, using settings.parser_workers workers.
+        Returns the tree and the collected file content blocks in tree order
+        (with settings.dedup_contents, repeated contents become references;
+        self.node_contents keeps every file's full block).
+        With settings.token_budget, files are parsed in packing order (see
+        TokenPacker) until the budget is spent; contents are then streamed
+        at the end instead of while parsing.
+        Raises ScanCancelled if the cancellation token is triggered meanwhile.
+        Timings and counters are recorded in self.metrics.
+
+        :param path: Folder to scan (defaults to root_folder).
+        :param descend: Optional predicate; subdirectories for which it returns False
+                        are added to the tree but not listed (used for incremental rescans).
+        """
         if not path:
             path = self.root_folder
 
-        try:
-            entries = sorted(os.listdir(path))
-        except PermissionError:
-            logger.warning(f"Permission denied when accessing: {path}")
-            return f"[Access Denied]: {path}\n", ""
+        tree = ScanTree(path)
+        file_contents: List[str] = []
+        # (parser kind, file path) for every file whose content is wanted, in tree order
+        jobs: List[Tuple[str, str]] = []
+        job_nodes: List[int] = []
+        # (mtime_ns, size) of each job's file from the DirEntry, None if stat failed
+        job_stats: List[Optional[Tuple[int, int]]] = []
+        self.tree = tree
+        self.node_contents = {}
+        self.node_stats = {}
+        self.dir_mtimes = {}
+        self.file_stamps = {}
+        self.budget_note = ""
+        metrics = self.metrics = ScanMetrics()
+        walk_start = time.perf_counter()
+
+        token = self.cancel_token
+        renderer = TreeRenderer(tree) if self.output_callback else None
+        self._last_output = time.monotonic()
+        self._tree_sent = False
+
+        if self._rules:
+            self._rules.loaded_files.clear()
+        depth_limit = self._depth_limit(path)
+
+        tracked = self._tracked_tree(path) if self.settings.use_git_index else None
+        if tracked is not None:
+            # The index lists every tracked path, no directory is listed
+            self._add_tracked(tree, path, tracked, descend, jobs, job_nodes, job_stats)
+            stack = []
+        else:
+            rel = self._rules.relative(path) if self._rules else ""
+            listing = self._list_dir(path, rel)
+            if listing is not None:
+                self.dir_mtimes[0] = listing[3]
+            if listing is None:
+                tree.flags[0] |= FLAG_ACCESS_DENIED
+                self._send_tree_lines(renderer)
+                metrics.add_time("walk", time.perf_counter() - walk_start)
+                if self._progress:
+                    self._progress.finish()
+                metrics.stop()
+                return tree, file_contents
+
+            # Each frame: [node index, entries, dir flags, next entry index,
+            #              top-relative path, ignore specs]
+            stack = [[0, listing[0], listing[1], 0, rel, listing[2]]]
+        # (st_dev, st_ino) of the directories on the stack, and of all listed ones
+        follow = self._follow_links
+        ancestors: List[Optional[DirId]] = [self._dir_id(path)] if follow else []
+        visited: Set[DirId] = set(ancestors)
+
+        while stack:
+            if token.cancelled:
+                raise ScanCancelled()
 
-        tree_lines = []
-        file_contents = []
+            # All nodes added so far are complete, so they can be streamed
+            if renderer is not None and self._output_due(renderer.pending):
+                self._send_tree_lines(renderer)
 
-        for i, entry in enumerate(entries):
-            full_path = os.path.join(path, entry)
-            connector = "├── " if i < len(entries) - 1 else "└── "
+            frame = stack[-1]
+            node, entries, dir_flags, i, rel, specs = frame
+            if i >= len(entries):
+                stack.pop()
+                if follow:
+                    ancestors.pop()
+                continue
+            frame[3] = i + 1
+
+            entry = entries[i]
+            name = entry.name
+            full_path = entry.path
+            is_last = i == len(entries) - 1
+            is_dir = dir_flags[i]
+            if is_dir:
+                self._pending_dirs -= 1
 
             # Update progress
-            self.processed_count += 1
-            if self.progress_callback:
-                self.progress_callback(self.processed_count)
+            if self._progress:
+                self._progress.entry()
 
-            lower_entry = entry.lower()
+            lower_entry = name.lower()
 
             # Skip .git (falls eingestellt)
             if self.settings.skip_git and lower_entry.startswith('.git'):
                 continue
 
+            node_flags = FLAG_LAST if is_last else 0
+            if is_dir:
+                node_flags |= FLAG_DIR
+            is_link = entry.is_symlink()
+            if is_link:
+                node_flags |= FLAG_SYMLINK
+
             # Skip venv (falls eingestellt)
-            if self.settings.skip_venv and os.path.isdir(full_path) and lower_entry in self.venv_names:
-                tree_lines.append(f"{prefix}{connector}{entry} [venv skipped]")
+            if self.settings.skip_venv and is_dir and lower_entry in self.venv_names:
+                tree.add(name, node, node_flags | FLAG_VENV_SKIPPED)
                 continue
 
             # Skip Python-Aux-Dateien
             if self.settings.skip_python_aux:
-                # Liste an unerwünschten Endungen
-                python_aux_exts = (".pyc", ".pyo", ".pyd")
-                if lower_entry.endswith(python_aux_exts):
+                if lower_entry.endswith(PYTHON_AUX_EXTS):
+                    continue
+
+            child = tree.add(name, node, node_flags)
+            if is_link:
+                tree.link_targets[child] = self._link_target(full_path)
+
+            # If it's a directory, descend
+            if is_dir:
+                if descend is not None and not descend(full_path):
+                    continue
+                if is_link and not follow:
+                    tree.flags[child] |= FLAG_LINK_NOT_FOLLOWED
                     continue
+                if depth_limit is not None and tree.depths[child] >= depth_limit:
+                    tree.flags[child] |= FLAG_DEPTH_LIMIT
+                    continue
+                dir_id = None
+                if follow:
+                    stat_start = time.perf_counter()
+                    dir_id = self._dir_id(full_path)
+                    metrics.add_time("stat", time.perf_counter() - stat_start)
+                    if self._already_listed(full_path, is_link, dir_id, ancestors, visited):
+                        logger.debug(f"Not listing {full_path} again (already listed).")
+                        tree.flags[child] |= FLAG_ALREADY_LISTED
+                        continue
+                child_rel = (f"{rel}/{name}" if rel else name) if self._rules else ""
+                listing = self._list_dir(full_path, child_rel, specs)
+                if listing is None:
+                    tree.flags[child] |= FLAG_ACCESS_DENIED
+                else:
+                    self.dir_mtimes[child] = listing[3]
+                    stack.append([child, listing[0], listing[1], 0, child_rel, listing[2]])
+                    if follow:
+                        ancestors.append(dir_id)
+            else:
+                # If it's a file, remember which parsers should read it
+                kinds = self.parsers.kinds_for(lower_entry)
+                if kinds:
+                    stat_start = time.perf_counter()
+                    file_stat = self._stat_signature(entry)
+                    metrics.add_time("stat", time.perf_counter() - stat_start)
+                    metrics.count("candidate_files")
+                    for kind in kinds:
+                        jobs.append((kind, full_path))
+                        job_nodes.append(child)
+                        job_stats.append(file_stat)
+
+        self._send_tree_lines(renderer)
+        metrics.add_time("walk", time.perf_counter() - walk_start)
+
+        self.node_stats = dict(zip(job_nodes, job_stats))
+        if self.unchanged is not None and jobs:
+            keep = [i for i, (job, file_stat) in enumerate(zip(jobs, job_stats))
+                    if file_stat is None or not self.unchanged(job[1], file_stat)]
+            metrics.count("unchanged_files", len(set(job_nodes)) - len({job_nodes[i] for i in keep}))
+            jobs = [jobs[i] for i in keep]
+            job_nodes = [job_nodes[i] for i in keep]
+            job_stats = [job_stats[i] for i in keep]
+
+        # Parse all candidate files (in parallel) and merge them back in tree order
+        extract_start = time.perf_counter()
+        output_seconds = 0.0
+        cache = None
+        if jobs and self.settings.use_parse_cache:
+            cache = ParseCache.open(self.settings.parse_cache_path, self.settings.parse_cache_entries,
+                                    {spec.kind: spec.version for spec in registered_parsers()})
+        sent_blocks = 0
+        dedup = ContentDeduplicator() if self.settings.dedup_contents else None
+        packer = TokenPacker.from_settings(self.settings) if jobs else None
+        if packer is not None:
+            # Parse in packing order; the blocks are put back in tree order below
+            order = packer.order(self.root_folder, [job[1] for job in jobs],
+                                 [tree.depths[node] for node in job_nodes], job_stats)
+            jobs = [jobs[i] for i in order]
+            job_nodes = [job_nodes[i] for i in order]
+            job_stats = [job_stats[i] for i in order]
+            packer.spend(estimate_tree_tokens(tree))
+            if packer.exhausted:
+                logger.warning(f"The tree alone uses the token budget of {packer.budget:,}; "
+                               f"no file contents are included.")
+        handled = 0
+        parse_jobs = jobs if packer is None or not packer.exhausted else []
+        contents = iter_contents(parse_jobs, self.settings.parser_workers, cache, job_stats, token,
+                                 self.settings.max_file_bytes, self.settings.max_total_bytes,
+                                 self.settings.python_extractors, metrics, self.pools)
+        try:
+            for i, content in contents:
+                token.raise_if_cancelled()
+                output_start = time.perf_counter()
+                full_path = jobs[i][1]
+                if self._progress:
+                    self._progress.parsed(job_stats[i][1] if job_stats[i] else 0)
+                blocks = self.node_contents.setdefault(job_nodes[i], [])
+                handled += 1
+                if content.strip():
+                    block = content_block(full_path, content)
+                    if packer is None:
+                        blocks.append(block)
+                        # Repeated contents are emitted once, like ScanSnapshot.render does
+                        if dedup is not None:
+                            block = dedup.reference(full_path, content) or block
+                        file_contents.append(block)
+                    elif packer.take(block):
+                        blocks.append(block)
+                if packer is not None and packer.exhausted:
+                    # Closing the generator below drops the parser work not yet started
+                    logger.info(f"Token budget of {packer.budget:,} spent after {handled} of {len(jobs)} files.")
+                    break
+                if self.output_callback and self._output_due(len(file_contents) - sent_blocks):
+                    self._send_output(CONTENTS_SECTION, file_contents[sent_blocks:])
+                    sent_blocks = len(file_contents)
+                output_seconds += time.perf_counter() - output_start
+        finally:
+            # Stops the parser pool right away if the loop was left early
+            contents.close()
+            if cache is not None:
+                cache.close()
+        if packer is not None:
+            contents_by_node = self.node_contents
+            for node in sorted(contents_by_node):
+                for block in contents_by_node[node]:
+                    file_contents.append(dedup.rewrite(block) if dedup else block)
+            omitted = packer.rejected + len(jobs) - handled
+            if omitted:
+                self.budget_note = omitted_note(omitted, packer.budget)
+                file_contents.append(self.budget_note)
+            metrics.count("budget_omitted", omitted)
+        if dedup is not None:
+            metrics.count("duplicate_contents", dedup.duplicates)
+        if self.output_callback and len(file_contents) > sent_blocks:
+            self._send_output(CONTENTS_SECTION, file_contents[sent_blocks:])
+        metrics.add_time("output", output_seconds)
+        metrics.add_time("extract", time.perf_counter() - extract_start)
+        if self._progress:
+            self._progress.finish()
+
+        metrics.stop()
+        return tree, file_contents
 
-            tree_lines.append(f"{prefix}{connector}{entry}")
+    def _output_due(self, pending: int) -> bool:
+        """
+        True if enough streamed output is pending, or it has waited long enough.
+        """
+        if pending >= OUTPUT_BATCH_SIZE:
+            return True
+        return pending > 0 and time.monotonic() - self._last_output >= OUTPUT_BATCH_SECONDS
+
+    def _send_tree_lines(self, renderer: Optional[TreeRenderer]):
+        """
+        Streams the tree lines of all nodes added since the last call.
+        The first call always sends a chunk, even an empty one.
+        """
+        if renderer is None:
+            return
+        start = time.perf_counter()
+        lines = renderer.render_new()
+        if lines or not self._tree_sent:
+            self._tree_sent = True
+            self._send_output(TREE_SECTION, lines)
+        self.metrics.add_time("output", time.perf_counter() - start)
+
+    def _send_output(self, section: str, items: List[str]):
+        self.output_callback(section, "\n".join(items))
+        self._last_output = time.monotonic()
+
+    def _list_dir(self, path: str, rel: str = "", parent_specs: Optional[Tuple[IgnoreSpec, ...]] = None
+                  ) -> Optional[Tuple[List[os.DirEntry], List[bool], Tuple[IgnoreSpec, ...], int]]:
+        """
+        Lists a directory sorted by name, together with the is-directory flag
+        of each entry, the ignore specs that apply inside it and the mtime_ns
+        of the directory (taken before listing it, -1 if stat failed). Ignored
+        entries are dropped right away, so they are neither counted nor
+        descended into. Returns None if access is denied. A subdirectory that
+        was removed or replaced since its parent was listed has no entries.
+
+        :param rel: Path of the directory relative to the ignore rules' top.
+        :param parent_specs: Ignore specs of the parent directory
+                             (None = the directory is where the scan starts).
+        """
+        if self._progress:
+            self._progress.directory(path)
+        metrics = self.metrics
+        slots = self.io_slots
+        if slots is not None:
+            slots.acquire()
+        start = time.perf_counter()
+        try:
+            mtime = self._mtime(path)
+            with os.scandir(path) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except PermissionError:
+            logger.warning(f"Permission denied when accessing: {path}")
+            metrics.count("access_denied")
+            return None
+        except (FileNotFoundError, NotADirectoryError):
+            if parent_specs is None:
+                # The folder the scan starts from does not exist
+                raise
+            logger.info(f"Directory vanished during the scan: {path}")
+            return [], [], parent_specs, -1
+        except OSError as e:
+            logger.warning(f"Cannot list {path}: {e}")
+            metrics.count("access_denied")
+            return None
+        finally:
+            if slots is not None:
+                slots.release()
 
-            # If it's a directory, recurse
-            if os.path.isdir(full_path):
-                sub_prefix = f"{prefix}│   " if i < len(entries) - 1 else f"{prefix}    "
-                sub_tree, sub_content = self.build_tree(full_path, sub_prefix)
-                if sub_tree:
-                    tree_lines.append(sub_tree)
-                if sub_content:
-                    file_contents.append(sub_content)
+        listed = time.perf_counter()
+        dir_flags = [self._is_dir(entry) for entry in entries]
+        checked = time.perf_counter()
+        metrics.add_time("list", listed - start)
+        metrics.add_time("stat", checked - listed)
+        specs: Tuple[IgnoreSpec, ...] = ()
+        rules = self._rules
+        if rules:
+            has_gitignore = any(entry.name == GITIGNORE_NAME for entry in entries)
+            if parent_specs is None:
+                specs = rules.specs_for(path, has_gitignore)
             else:
-                # If it's a file, possibly parse content
-                # Python
-                if lower_entry.endswith(".py") and self.settings.show_py_content:
-                    py_classes = extract_python_classes(full_path)
-                    if py_classes.strip():
-                        file_contents.append(f"File: {full_path}\n{py_classes}\n------")
+                specs = rules.child_specs(parent_specs, path, rel, has_gitignore)
+        if specs:
+            prefix = f"{rel}/" if rel else ""
+            kept = [i for i, entry in enumerate(entries)
+                    if not rules.is_ignored(specs, prefix + entry.name, entry.name, dir_flags[i])]
+            if len(kept) < len(entries):
+                entries = [entries[i] for i in kept]
+                dir_flags = [dir_flags[i] for i in kept]
+        if rules:
+            metrics.add_time("ignore", time.perf_counter() - checked)
 
-                # Docker
-                if self.settings.show_docker_content and self._is_dockerfile(lower_entry):
-                    content = read_dockerfile_content(full_path)
-                    if content.strip():
-                        file_contents.append(f"File: {full_path}\n{content}\n------")
+        metrics.count("dirs")
+        metrics.count("entries", len(entries))
+        self._listed_dirs += 1
+        self._pending_dirs += sum(dir_flags)
+        self.total_entries += len(entries)
+        return entries, dir_flags, specs, mtime
 
-                # TOML
-                if self.settings.show_toml_content and lower_entry.endswith(".toml"):
-                    content = read_toml_content(full_path)
-                    if content.strip():
-                        file_contents.append(f"File: {full_path}\n{content}\n------")
+    def _tracked_tree(self, path: str) -> Optional[TrackedDir]:
+        """
+        The paths git tracks below `path`, read from the index of its working
+        tree, as nested TrackedDir dicts. None if `path` is not in a git working
+        tree or the index cannot be used; the folder is walked then.
+        """
+        found = find_git_dir(path)
+        if found is None:
+            logger.info(f"{path} is not in a git working tree, walking the folder instead.")
+            return None
+        top, git_dir = found
+        start = time.perf_counter()
+        index_path = os.path.join(git_dir, "index")
+        self.file_stamps[index_path] = self._path_signature(index_path)
+        try:
+            entries = read_index(git_dir)
+        except GitIndexError as e:
+            logger.warning(f"Cannot use the git index of {top} ({e}), walking the folder instead.")
+            return None
+        rel = os.path.relpath(os.path.abspath(path), top)
+        prefix = "" if rel == os.curdir else rel.replace(os.sep, "/") + "/"
+
+        root: TrackedDir = {}
+        for tracked_path, mode in entries:
+            if not tracked_path.startswith(prefix):
+                continue
+            parts = tracked_path[len(prefix):].split("/")
+            directory = root
+            for part in parts[:-1]:
+                child = directory.get(part)
+                if not isinstance(child, dict):
+                    child = directory[part] = {}
+                directory = child
+            # Sparse-index directory entries end with "/" and only add the directory
+            if parts[-1] and mode & MODE_TYPE_MASK != MODE_DIRECTORY:
+                directory.setdefault(parts[-1], mode)
+        self.metrics.add_time("list", time.perf_counter() - start)
+        logger.info(f"Read {len(entries):,} entries from the git index of {top}.")
+        return root
+
+    def _tracked_items(self, directory: TrackedDir, rel: str) -> List[Tuple[str, Union[TrackedDir, int]]]:
+        """
+        Entries of a tracked directory sorted by name (like _list_dir), without
+        those matching the extra ignore patterns.
+
+        :param rel: Path of the directory relative to root_folder ("/"-separated).
+        """
+        items = sorted(directory.items(), key=itemgetter(0))
+        spec = self._extra_spec
+        if spec is not None:
+            prefix = f"{rel}/" if rel else ""
+            items = [(name, value) for name, value in items
+                     if not spec.match(prefix + name, name,
+                                       isinstance(value, dict) or value & MODE_TYPE_MASK == MODE_GITLINK)]
+        return items
+
+    def _add_tracked(self, tree: ScanTree, path: str, tracked: TrackedDir,
+                     descend: Optional[Callable[[str], bool]],
+                     jobs: List[Tuple[str, str]], job_nodes: List[int],
+                     job_stats: List[Optional[Tuple[int, int]]]):
+        """
+        Fills the tree from tracked paths (see _tracked_tree) with the same
+        order, skip settings and node flags as the directory walk. Nothing is
+        listed; only candidate files are stat'ed. Submodules are shown but not
+        descended into, tracked symlinks are never followed.
+        """
+        settings = self.settings
+        metrics = self.metrics
+        token = self.cancel_token
+        rel = os.path.relpath(path, self.root_folder)
+        rel = "" if rel == os.curdir else rel.replace(os.sep, "/")
+        depth_limit = self._depth_limit(path)
+        # Each frame: [node index, directory path, root-relative path, entries, next entry index]
+        stack = [[0, path, rel, self._list_tracked(path, tracked, rel), 0]]
+        while stack:
+            if token.cancelled:
+                raise ScanCancelled()
+            frame = stack[-1]
+            node, directory, rel, items, i = frame
+            if i >= len(items):
+                stack.pop()
+                continue
+            frame[4] = i + 1
+
+            name, value = items[i]
+            is_dir = isinstance(value, dict)
+            if is_dir:
+                self._pending_dirs -= 1
+            if self._progress:
+                self._progress.entry()
+            lower_entry = name.lower()
+            if settings.skip_git and lower_entry.startswith('.git'):
+                continue
+
+            full_path = os.path.join(directory, name)
+            node_flags = FLAG_LAST if i == len(items) - 1 else 0
+            mode_type = 0 if is_dir else value & MODE_TYPE_MASK
+            if is_dir:
+                node_flags |= FLAG_DIR
+            elif mode_type == MODE_GITLINK:
+                node_flags |= FLAG_DIR | FLAG_SUBMODULE
+            elif mode_type == MODE_SYMLINK:
+                node_flags |= FLAG_SYMLINK
+                if os.path.isdir(full_path):
+                    # Git tracks the link itself; its target's files are not in this index
+                    node_flags |= FLAG_DIR | FLAG_LINK_NOT_FOLLOWED
+
+            if settings.skip_venv and node_flags & FLAG_DIR and lower_entry in self.venv_names:
+                tree.add(name, node, node_flags | FLAG_VENV_SKIPPED)
+                continue
+            if settings.skip_python_aux and lower_entry.endswith(PYTHON_AUX_EXTS):
+                continue
+
+            child = tree.add(name, node, node_flags)
+            if mode_type == MODE_SYMLINK:
+                tree.link_targets[child] = self._link_target(full_path)
+            if is_dir:
+                if descend is not None and not descend(full_path):
+                    continue
+                if depth_limit is not None and tree.depths[child] >= depth_limit:
+                    tree.flags[child] |= FLAG_DEPTH_LIMIT
+                    continue
+                child_rel = f"{rel}/{name}" if rel else name
+                stack.append([child, full_path, child_rel, self._list_tracked(full_path, value, child_rel), 0])
+            elif not node_flags & FLAG_DIR:
+                kinds = self.parsers.kinds_for(lower_entry)
+                if kinds:
+                    stat_start = time.perf_counter()
+                    file_stat = self._path_signature(full_path)
+                    metrics.add_time("stat", time.perf_counter() - stat_start)
+                    metrics.count("candidate_files")
+                    for kind in kinds:
+                        jobs.append((kind, full_path))
+                        job_nodes.append(child)
+                        job_stats.append(file_stat)
+
+    def _list_tracked(self, path: str, directory: TrackedDir, rel: str
+                      ) -> List[Tuple[str, Union[TrackedDir, int]]]:
+        """
+        _tracked_items with the bookkeeping of _list_dir (progress, counters,
+        running total estimate).
+        """
+        if self._progress:
+            self._progress.directory(path)
+        items = self._tracked_items(directory, rel)
+        self.metrics.count("dirs")
+        self.metrics.count("entries", len(items))
+        self._listed_dirs += 1
+        self._pending_dirs += sum(isinstance(value, dict) for _, value in items)
+        self.total_entries += len(items)
+        return items
+
+    def _count_tracked(self, tracked: TrackedDir) -> int:
+        """Number of entries _add_tracked visits for a tracked tree."""
+        settings = self.settings
+        total_count = 0
+        pending = [(tracked, "")]
+        while pending:
+            directory, rel = pending.pop()
+            items = self._tracked_items(directory, rel)
+            total_count += len(items)
+            if settings.max_depth > 0 and (rel.count("/") + 2 if rel else 1) >= settings.max_depth:
+                continue
+            for name, value in items:
+                lower_entry = name.lower()
+                if not isinstance(value, dict):
+                    continue
+                if settings.skip_git and lower_entry.startswith('.git'):
+                    continue
+                if settings.skip_venv and lower_entry in self.venv_names:
+                    continue
+                pending.append((value, f"{rel}/{name}" if rel else name))
+        return total_count
+
+    def _depth_of(self, path: str) -> int:
+        """Folder level of a path below root_folder (root_folder itself is 0)."""
+        rel = os.path.relpath(path, self.root_folder)
+        return 0 if rel == os.curdir else len(rel.split(os.sep))
+
+    def _depth_limit(self, path: str) -> Optional[int]:
+        """
+        Tree depth, in a scan of `path`, from which folders are not listed
+        because of settings.max_depth; None without a limit.
+        """
+        if self.settings.max_depth <= 0:
+            return None
+        return self.settings.max_depth - self._depth_of(path)
 
-        return "\n".join(tree_lines), "\n".join(file_contents)
+    def _estimate_total(self) -> int:
+        """
+        Estimates the final entry count from what has been seen so far:
+        all listed entries plus, for each discovered directory not yet
+        listed, the average number of entries per listed directory.
+        """
+        if not self._listed_dirs:
+            return self.total_entries
+        average = self.total_entries / self._listed_dirs
+        return int(self.total_entries + self._pending_dirs * average)
 
-    def _is_dockerfile(self, filename: str) -> bool:
+    def _already_listed(self, path: str, is_link: bool, dir_id: Optional[DirId],
+                        ancestors: Collection[Optional[DirId]], visited: Set[DirId]) -> bool:
         """
-        Checks if the file is a Dockerfile variant.
+        Applies the symlink policy to a directory about to be listed: with
+        "follow-once" it is skipped if it was listed anywhere before, and a link
+        into the scanned folder is never followed (its target is listed at its
+        real location); with "follow" it is only skipped if it is one of its own
+        ancestors (a cycle). Records the directory in `visited`.
         """
-        dockerfile_variants = {"dockerfile", "dockerfile.dev", "dockerfile.prod", "dockerfile.test"}
-        if filename in dockerfile_variants or filename.startswith("dockerfile."):
+        if dir_id is None:
+            return False
+        if self.settings.symlink_policy == SYMLINKS_FOLLOW_ONCE:
+            if dir_id in visited or (is_link and self._inside_root(path)):
+                return True
+        if dir_id in ancestors:
             return True
+        visited.add(dir_id)
         return False
+
+    def _inside_root(self, path: str) -> bool:
+        """True if the real location of `path` is the root folder or below it."""
+        real_path = os.path.realpath(path)
+        try:
+            return os.path.commonpath([real_path, self._real_root]) == self._real_root
+        except ValueError:
+            # Different drives on Windows
+            return False
+
+    @staticmethod
+    def _mtime(path: str) -> int:
+        """mtime_ns of a path, following symlinks; -1 on errors."""
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return -1
+
+    @staticmethod
+    def _dir_id(path: str) -> Optional[DirId]:
+        """(st_dev, st_ino) of a directory, following symlinks; None on errors."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return st.st_dev, st.st_ino
+
+    @staticmethod
+    def _link_target(path: str) -> str:
+        """Target of a symlink as stored in the link, "?" if it cannot be read."""
+        try:
+            return os.readlink(path)
+        except OSError:
+            return "?"
+
+    @staticmethod
+    def _is_dir(entry: os.DirEntry) -> bool:
+        """
+        Same semantics as os.path.isdir (follows symlinks, False on errors),
+        but uses the type information cached on the DirEntry.
+        """
+        try:
+            return entry.is_dir()
+        except OSError:
+            return False
+
+    @staticmethod
+    def _path_signature(path: str) -> Optional[Tuple[int, int]]:
+        """(mtime_ns, size) of a file by path, like _stat_signature; None on errors."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    @staticmethod
+    def _stat_signature(entry: os.DirEntry) -> Optional[Tuple[int, int]]:
+        """
+        (mtime_ns, size) of a file, following symlinks like os.stat; None on errors.
+        """
+        try:
+            st = entry.stat()
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
@@ -0,0 +1,155 @@
+# app/folder_watcher.py
+# ---------------------------------------------------------------------
+# Author: Marvin Schubert
+# © 2025, Marvin Schubert. All rights reserved.
+#
+# Description:
+# Watches a scanned folder with QFileSystemWatcher (inotify-backed on
+# Linux) and patches the scan result through an IncrementalScanner.
+# The patching runs in an IncrementalUpdateWorker, so new folders are
+# scanned and changed files parsed off the GUI thread.
+# ---------------------------------------------------------------------
+
+import os
+import logging
+from typing import Optional, Set
+from PySide6.QtCore import QObject, QFileSystemWatcher, QTimer, Signal, Slot
+from .incremental_scanner import IncrementalScanner
+from .worker import IncrementalUpdateWorker
+
+logger = logging.getLogger(__name__)
+
+class FolderWatcher(QObject):
+    """
+    Collects change notifications for a short debounce interval, then lets the
+    IncrementalScanner re-list only the affected directories and emits the
+    updated result.
+
+    Every listed directory is watched; that covers added, removed and renamed
+    entries and files saved via rename. Files with extracted content are also
+    watched (in-place writes do not touch the directory) as long as the total
+    stays within MAX_WATCHES. If the directories alone exceed it, or the system
+    refuses a watch, watching stops and watchingStopped is emitted.
+    """
+    resultsUpdated = Signal(object)  # Emitted with a ScanSnapshot of the patched result
+    watchingStopped = Signal(str)    # Emitted with the reason when changes can no longer be followed
+
+    DEBOUNCE_MS = 150
+
+    # Watches per folder; stays below inotify's default max_user_watches (8192)
+    MAX_WATCHES = 8000
+
+    def __init__(self, incremental: IncrementalScanner, parent=None):
+        super().__init__(parent)
+        self.incremental = incremental
+        self._changed: Set[str] = set()
+        # Update in progress; changes reported meanwhile wait for the next one
+        self._worker: Optional[IncrementalUpdateWorker] = None
+        self.active = True
+
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.directoryChanged.connect(self.on_path_changed)
+        self._watcher.fileChanged.connect(self.on_path_changed)
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(self.DEBOUNCE_MS)
+        self._timer.timeout.connect(self.apply_pending_changes)
+
+        self._sync_watched_paths()
+
+    @property
+    def root_folder(self) -> str:
+        return self.incremental.root_folder
+
+    @Slot(str)
+    def on_path_changed(self, path: str):
+        self._changed.add(path)
+        self._timer.start()
+
+    @Slot()
+    def apply_pending_changes(self):
+        """
+        Starts patching the scan result for all paths reported since the last
+        update, unless an update is still running (it picks them up when done).
+        """
+        if not self._changed or self._worker is not None or not self.active:
+            return
+        changed, self._changed = self._changed, set()
+
+        self._worker = IncrementalUpdateWorker(self.incremental, changed)
+        self._worker.updated.connect(self.on_update_finished)
+        self._worker.failed.connect(self.on_update_failed)
+        self._worker.finished.connect(self._update_done)
+        self._worker.start()
+
+    @Slot(object)
+    def on_update_finished(self, snapshot):
+        """Watches the paths of the patched result and passes it on."""
+        if not self.active:
+            return
+        self._sync_watched_paths()
+        if self.active:
+            self.resultsUpdated.emit(snapshot)
+
+    @Slot(str)
+    def on_update_failed(self, error: str):
+        """The folder could not be scanned any more (e.g. it was removed)."""
+        if self.active:
+            self._give_up(f"the folder could not be scanned ({error})")
+
+    @Slot()
+    def _update_done(self):
+        worker, self._worker = self._worker, None
+        if worker is not None:
+            worker.deleteLater()
+        if self._changed and self.active:
+            self._timer.start()
+
+    def stop(self):
+        """Stops watching all paths and waits for a running update to be cancelled."""
+        self.active = False
+        self._timer.stop()
+        self._changed.clear()
+        watched = self._watcher.directories() + self._watcher.files()
+        if watched:
+            self._watcher.removePaths(watched)
+        if self._worker is not None:
+            for signal in (self._worker.updated, self._worker.failed):
+                try:
+                    signal.disconnect()
+                except (RuntimeError, TypeError):
+                    pass  # Nothing connected
+            self._worker.stop()
+
+    def _sync_watched_paths(self):
+        """
+        Watches every listed directory and, within MAX_WATCHES, the files with
+        extracted content. Editors that save via rename drop the old watch,
+        so files are re-added here.
+        """
+        directories = self.incremental.watched_directories()
+        if len(directories) > self.MAX_WATCHES:
+            self._give_up(f"{len(directories):,} folders are more than the {self.MAX_WATCHES:,} "
+                          f"that can be watched")
+            return
+        files = self.incremental.watched_files()[:self.MAX_WATCHES - len(directories)]
+        wanted = set(directories) | set(files)
+        current = set(self._watcher.directories()) | set(self._watcher.files())
+
+        stale = current - wanted
+        if stale:
+            self._watcher.removePaths(list(stale))
+        missing = [path for path in wanted - current if os.path.exists(path)]
+        if missing:
+            failed = set(self._watcher.addPaths(missing))
+            # Files can vanish between the check and the call; a folder that cannot
+            # be watched means changes below it would go unnoticed
+            if any(os.path.isdir(path) for path in failed):
+                self._give_up("the system watch limit was reached")
+
+    def _give_up(self, reason: str):
+        """Stops watching and reports why, once the caller has connected (see watchingStopped)."""
+        logger.warning(f"Not watching {self.root_folder} for changes: {reason}.")
+        self.stop()
+        QTimer.singleShot(0, self, lambda: self.watchingStopped.emit(reason))
@@ -0,0 +1,197 @@
+# app/git_index.py
+# ---------------------------------------------------------------------
+# Author: Marvin Schubert
+# © 2025, Marvin Schubert. All rights reserved.
+#
+# Description:
+# Reads the paths tracked by git straight from a repository's index
+# file (.git/index, format versions 2 to 4), without a git binary.
+# One sequential read of that file replaces listing every directory
+# of the working tree. Only what the scanner needs is decoded: the
+# path, the file mode and the flags of each entry.
+# ---------------------------------------------------------------------
+
+import os
+import re
+import struct
+import logging
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+INDEX_SIGNATURE = b"DIRC"
+SUPPORTED_VERSIONS = (2, 3, 4)
+
+# File modes of index entries (the object type bits)
+MODE_TYPE_MASK = 0o170000
+MODE_DIRECTORY = 0o040000   # Sparse-index directory entry (sparse checkouts)
+MODE_SYMLINK = 0o120000
+MODE_GITLINK = 0o160000     # Submodule
+
+# Fixed part of an entry: ctime, mtime, dev, ino, mode, uid, gid, size (4 bytes
+# each, the times as seconds and nanoseconds), then the object id and the flags
+_STAT_FIELDS = struct.Struct(">10I")
+_MODE_OFFSET = 24
+_FLAG_EXTENDED = 0x4000
+_NAME_LENGTH_MASK = 0x0FFF
+_EXTENDED_SKIP_WORKTREE = 0x4000
+
+# Index extensions that move entries out of this file
+_SPLIT_INDEX_EXTENSION = b"link"
+
+_OBJECT_FORMAT = re.compile(rb"^\s*objectformat\s*=\s*sha256\s*$", re.IGNORECASE | re.MULTILINE)
+
+class GitIndexError(ValueError):
+    """The index file is missing, malformed or uses an unsupported feature."""
+
+def find_git_dir(path: str) -> Optional[Tuple[str, str]]:
+    """
+    The working tree top at or above `path` and its git directory, or None if
+    `path` is not inside a git working tree. A ".git" file (worktrees,
+    submodules) is followed to the git directory it names.
+    """
+    current = os.path.abspath(path)
+    while True:
+        dot_git = os.path.join(current, ".git")
+        if os.path.isdir(dot_git):
+            return current, dot_git
+        if os.path.isfile(dot_git):
+            try:
+                with open(dot_git, "r", encoding="utf-8") as f:
+                    line = f.readline().strip()
+            except OSError:
+                return None
+            if not line.startswith("gitdir:"):
+                return None
+            return current, os.path.join(current, line[len("gitdir:"):].strip())
+        parent = os.path.dirname(current)
+        if parent == current:
+            return None
+        current = parent
+
+def object_id_size(git_dir: str) -> int:
+    """Bytes per object id: 32 in SHA-256 repositories, else 20 (SHA-1)."""
+    common_dir = git_dir
+    try:
+        # Linked worktrees keep the config in the main git directory
+        with open(os.path.join(git_dir, "commondir"), "r", encoding="utf-8") as f:
+            common_dir = os.path.join(git_dir, f.read().strip())
+    except OSError:
+        pass
+    try:
+        with open(os.path.join(common_dir, "config"), "rb") as f:
+            if _OBJECT_FORMAT.search(f.read()):
+                return 32
+    except OSError:
+        pass
+    return 20
+
+def read_index(git_dir: str) -> List[Tuple[str, int]]:
+    """
+    Returns (path, mode) of every entry of the index in `git_dir`, in index
+    order (sorted by the "/"-separated path bytes). Conflicted paths are
+    listed once; entries marked skip-worktree (not checked out in a sparse
+    checkout) are left out.
+    Raises GitIndexError if the index cannot be used.
+    """
+    index_path = os.path.join(git_dir, "index")
+    try:
+        with open(index_path, "rb") as f:
+            data = f.read()
+    except OSError as e:
+        raise GitIndexError(f"cannot read {index_path}: {e}") from e
+    return parse_index(data, object_id_size(git_dir))
+
+def parse_index(data: bytes, oid_size: int = 20) -> List[Tuple[str, int]]:
+    """
+    Parses the bytes of an index file (see read_index).
+    """
+    if len(data) < 12 or data[:4] != INDEX_SIGNATURE:
+        raise GitIndexError("not a git index file")
+    version, count = struct.unpack_from(">II", data, 4)
+    if version not in SUPPORTED_VERSIONS:
+        raise GitIndexError(f"unsupported index version {version}")
+
+    flags_offset = _STAT_FIELDS.size + oid_size
+    unpack_mode = struct.Struct(">I").unpack_from
+    unpack_flags = struct.Struct(">H").unpack_from
+    fsdecode = os.fsdecode
+    entries: List[Tuple[str, int]] = []
+    previous = b""
+    last_listed = None
+    pos = 12
+    end = len(data)
+    try:
+        for _ in range(count):
+            start = pos
+            mode = unpack_mode(data, start + _MODE_OFFSET)[0]
+            flags = unpack_flags(data, start + flags_offset)[0]
+            pos = start + flags_offset + 2
+            skip = False
+            if flags & _FLAG_EXTENDED:
+                if version < 3:
+                    raise GitIndexError("extended entry flags in a version 2 index")
+                skip = bool(unpack_flags(data, pos)[0] & _EXTENDED_SKIP_WORKTREE)
+                pos += 2
+
+            if version == 4:
+                # Prefix compression: drop N bytes of the previous path, then
+                # append the NUL-terminated rest; no padding
+                strip, pos = _read_offset(data, pos)
+                if strip > len(previous):
+                    raise GitIndexError("invalid path prefix")
+                name_end = data.index(b"\0", pos)
+                name = previous[:len(previous) - strip] + data[pos:name_end]
+                pos = name_end + 1
+            else:
+                length = flags & _NAME_LENGTH_MASK
+                if length == _NAME_LENGTH_MASK:
+                    name_end = data.index(b"\0", pos)
+                else:
+                    name_end = pos + length
+                name = data[pos:name_end]
+                # 1 to 8 NUL bytes pad the entry to a multiple of 8 bytes
+                pos = start + ((name_end - start + 8) & ~7)
+            if pos > end:
+                raise GitIndexError("truncated index entry")
+
+            previous = name
+            if skip or name == last_listed:
+                # Not checked out, or another conflict stage of the same path
+                continue
+            last_listed = name
+            entries.append((fsdecode(name), mode))
+    except (struct.error, IndexError, ValueError) as e:
+        if isinstance(e, GitIndexError):
+            raise
+        raise GitIndexError(f"malformed index: {e}") from e
+
+    _check_extensions(data, pos, oid_size)
+    return entries
+
+def _read_offset(data: bytes, pos: int) -> Tuple[int, int]:
+    """
+    Decodes git's offset varint (used by index version 4) at `pos`.
+    Returns the value and the position after it.
+    """
+    byte = data[pos]
+    pos += 1
+    value = byte & 0x7F
+    while byte & 0x80:
+        byte = data[pos]
+        pos += 1
+        value = ((value + 1) << 7) | (byte & 0x7F)
+    return value, pos
+
+def _check_extensions(data: bytes, pos: int, oid_size: int):
+    """
+    Rejects indexes whose entries are partly stored elsewhere (split index).
+    Other extensions (cached trees, untracked cache, ...) are not needed.
+    """
+    end = len(data) - oid_size
+    while pos + 8 <= end:
+        signature = data[pos:pos + 4]
+        size = struct.unpack_from(">I", data, pos + 4)[0]
+        if signature == _SPLIT_INDEX_EXTENSION:
+            raise GitIndexError("split index files are not supported")
+        pos += 8 + size
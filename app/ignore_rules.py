@@ -0,0 +1,318 @@
+# app/ignore_rules.py
+# ---------------------------------------------------------------------
+# Author: Marvin Schubert
+# © 2025, Marvin Schubert. All rights reserved.
+#
+# Description:
+# .gitignore-aware pruning. Ignore files are read hierarchically (like
+# git does) and each one is compiled into a single regular expression,
+# so checking an entry costs one regex match per active ignore file.
+# Ignored directories are cut before they are listed.
+# ---------------------------------------------------------------------
+
+import os
+import re
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+GITIGNORE_NAME = ".gitignore"
+
+# Windows file systems are case-insensitive, so git matches case-insensitively there
+_REGEX_FLAGS = re.IGNORECASE if os.path.normcase("A") == "a" else 0
+
+class IgnoreSpec:
+    """
+    The compiled patterns of one ignore file. `base` is the directory the
+    patterns are relative to, as a "/"-separated path relative to the top
+    of the rule hierarchy ("" = the top itself).
+    Patterns without a slash only look at the entry name, anchored ones at
+    the path below `base`; each group is combined into one expression.
+    The alternatives are in reverse order, so the first one that matches is
+    the last matching pattern of its group, and the later of the (at most
+    two) matches wins, as in git.
+    """
+    __slots__ = ("base", "_strip", "_dir_matchers", "_file_matchers", "_negated")
+
+    def __init__(self, base: str, patterns: List[Tuple[str, bool, bool, bool]]):
+        """
+        :param base: Directory of the ignore file, relative to the top.
+        :param patterns: (regex, negated, directory only, anchored) per pattern, in file order.
+        """
+        self.base = base
+        # Characters to cut from a top-relative path to make it base-relative
+        self._strip = len(base) + 1 if base else 0
+        self._negated = [p[1] for p in patterns]
+        numbered = list(enumerate(patterns))
+        self._dir_matchers = self._combine(numbered)
+        self._file_matchers = self._combine([(i, p) for i, p in numbered if not p[2]])
+
+    @classmethod
+    def from_lines(cls, lines: Iterable[str], base: str = "") -> Optional["IgnoreSpec"]:
+        """
+        Compiles gitignore-style lines. Returns None if there are no patterns.
+        """
+        patterns = []
+        for line in lines:
+            compiled = compile_pattern(line)
+            if compiled is not None:
+                patterns.append(compiled)
+        return cls(base, patterns) if patterns else None
+
+    @classmethod
+    def from_file(cls, path: str, base: str = "") -> Optional["IgnoreSpec"]:
+        """
+        Reads and compiles an ignore file. Returns None if it is unreadable
+        or has no patterns.
+        """
+        try:
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                return cls.from_lines(f.read().splitlines(), base)
+        except OSError as e:
+            logger.warning(f"Could not read ignore file {path}: {e}")
+            return None
+
+    def match(self, rel_path: str, name: str, is_dir: bool) -> Optional[bool]:
+        """
+        Checks an entry by its top-relative path (below `base`) and its name.
+        Returns True if ignored, False if re-included by a "!" pattern,
+        None if no pattern applies.
+        """
+        name_regex, name_order, path_regex, path_order = (
+            self._dir_matchers if is_dir else self._file_matchers)
+        last = -1
+        if name_regex is not None:
+            m = name_regex.fullmatch(name)
+            if m is not None:
+                last = name_order[m.lastindex]
+        if path_regex is not None:
+            m = path_regex.fullmatch(rel_path, self._strip)
+            if m is not None:
+                last = max(last, path_order[m.lastindex])
+        if last < 0:
+            return None
+        return not self._negated[last]
+
+    @staticmethod
+    def _combine(numbered: List[Tuple[int, Tuple[str, bool, bool, bool]]]):
+        """
+        Builds (name regex, group -> pattern index, path regex, group -> pattern index).
+        """
+        matchers = []
+        for anchored in (False, True):
+            group = [(i, p[0]) for i, p in reversed(numbered) if p[3] == anchored]
+            if not group:
+                matchers += [None, None]
+                continue
+            # Group numbers start at 1
+            order = [-1] + [i for i, _ in group]
+            regex = re.compile("|".join(f"({r})" for _, r in group), _REGEX_FLAGS)
+            matchers += [regex, order]
+        return tuple(matchers)
+
+def compile_pattern(line: str) -> Optional[Tuple[str, bool, bool, bool]]:
+    """
+    Translates one gitignore line into (regex, negated, directory only, anchored),
+    or None for blank lines and comments. Anchored regexes match paths relative
+    to the directory of the ignore file ("/"-separated), the others match entry
+    names. The regex contains no capturing groups.
+    """
+    line = line.rstrip("\r")
+    # Trailing spaces are ignored unless escaped
+    while line.endswith(" ") and not line.endswith("\\ "):
+        line = line[:-1]
+    if not line or line.startswith("#"):
+        return None
+
+    negated = line.startswith("!")
+    if negated:
+        line = line[1:]
+    dir_only = line.endswith("/")
+    line = line.rstrip("/")
+    if not line:
+        return None
+
+    # A slash at the start or in the middle anchors the pattern to the ignore
+    # file's directory, otherwise it matches at any depth
+    anchored = "/" in line
+    line = line.lstrip("/")
+
+    return _translate(line), negated, dir_only, anchored
+
+def _translate(pattern: str) -> str:
+    """
+    Translates the glob part of a gitignore pattern to a regex.
+    """
+    parts = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if c == "*":
+            if pattern.startswith("**", i):
+                at_start = i == 0 or pattern[i - 1] == "/"
+                at_end = i + 2 == n or pattern[i + 2] == "/"
+                if at_start and at_end:
+                    if i + 2 == n:
+                        # "x/**": everything inside x
+                        parts.append(".*")
+                        i += 2
+                    else:
+                        # "**/x" or "x/**/y": zero or more directories
+                        parts.append("(?:.*/)?")
+                        i += 3
+                    continue
+                # Other consecutive asterisks are regular asterisks
+                while i < n and pattern[i] == "*":
+                    i += 1
+                parts.append("[^/]*")
+                continue
+            parts.append("[^/]*")
+        elif c == "?":
+            parts.append("[^/]")
+        elif c == "[":
+            end = _class_end(pattern, i)
+            if end < 0:
+                parts.append(re.escape(c))
+            else:
+                parts.append(_translate_class(pattern[i + 1:end]))
+                i = end
+        elif c == "\\" and i + 1 < n:
+            i += 1
+            parts.append(re.escape(pattern[i]))
+        else:
+            parts.append(re.escape(c))
+        i += 1
+    return "".join(parts)
+
+def _class_end(pattern: str, start: int) -> int:
+    """Index of the "]" closing the character class at `start`, or -1."""
+    j = start + 1
+    if j < len(pattern) and pattern[j] in "!^":
+        j += 1
+    if j < len(pattern) and pattern[j] == "]":
+        j += 1
+    while j < len(pattern) and pattern[j] != "]":
+        if pattern[j] == "\\":
+            j += 1
+        j += 1
+    return j if j < len(pattern) else -1
+
+def _translate_class(body: str) -> str:
+    negated = body[:1] in ("!", "^")
+    if negated:
+        body = body[1:]
+    # Backslash escapes mean the same in both syntaxes and are kept
+    body = body.replace("[", "\\[").replace("^", "\\^")
+    # "/" never matches inside a character class
+    return f"[^{body}/]" if negated else f"(?!/)[{body}]"
+
+def _stamp(path: str) -> Optional[Tuple[int, int]]:
+    """(mtime_ns, size) of a file, None if it cannot be stat'ed."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+class IgnoreRules:
+    """
+    Decides which entries of a scan are ignored. Rules come from .gitignore
+    files (from the enclosing git repository's top down to each directory,
+    plus .git/info/exclude) and from extra patterns given by the user,
+    which are relative to the scanned root folder.
+    All paths handled here are "/"-separated and relative to `top`.
+    """
+
+    def __init__(self, root_folder: str, use_gitignore: bool = True,
+                 extra_patterns: Iterable[str] = ()):
+        self.root_folder = root_folder
+        self.use_gitignore = use_gitignore
+        self.top = self._find_repository_top(root_folder) if use_gitignore else None
+        if self.top is None:
+            self.top = root_folder
+        self.root_rel = self.relative(root_folder)
+        self._extra = IgnoreSpec.from_lines(extra_patterns, self.root_rel)
+        # Ignore files that were read (e.g. for watching them), with their
+        # (mtime_ns, size) from before reading them (None if stat failed)
+        self.loaded_files: Dict[str, Optional[Tuple[int, int]]] = {}
+
+    @property
+    def active(self) -> bool:
+        """False if no rules can ever apply, so callers can skip all checks."""
+        return self.use_gitignore or self._extra is not None
+
+    def relative(self, path: str) -> str:
+        """Path relative to `top`, "/"-separated ("" for top itself)."""
+        rel = os.path.relpath(path, self.top)
+        if rel == os.curdir:
+            return ""
+        return rel.replace(os.sep, "/")
+
+    def specs_for(self, path: str, has_gitignore: Optional[bool] = None) -> Tuple[IgnoreSpec, ...]:
+        """
+        All specs that apply to the entries of directory `path`, reading the
+        ignore files of `path` and of every directory above it up to `top`.
+
+        :param has_gitignore: Whether `path` contains a .gitignore, if already known.
+        """
+        specs: Tuple[IgnoreSpec, ...] = ()
+        exclude_path = os.path.join(self.top, ".git", "info", "exclude")
+        if self.use_gitignore and os.path.isfile(exclude_path):
+            exclude = IgnoreSpec.from_file(exclude_path)
+            if exclude is not None:
+                specs = (exclude,)
+        rel = self.relative(path)
+        parts = rel.split("/") if rel else []
+        directory = self.top
+        for depth in range(len(parts) + 1):
+            if depth:
+                directory = os.path.join(directory, parts[depth - 1])
+            if depth == len(parts) and has_gitignore is not None:
+                found = has_gitignore
+            else:
+                found = os.path.isfile(os.path.join(directory, GITIGNORE_NAME))
+            specs = self.child_specs(specs, directory, "/".join(parts[:depth]), found)
+        return specs
+
+    def child_specs(self, parent_specs: Tuple[IgnoreSpec, ...], path: str, rel: str,
+                    has_gitignore: bool) -> Tuple[IgnoreSpec, ...]:
+        """
+        Specs for the entries of directory `path` (top-relative `rel`), given
+        the specs of its parent directory.
+        """
+        specs = parent_specs
+        if self._extra is not None and rel == self.root_rel:
+            specs = specs + (self._extra,)
+        if has_gitignore and self.use_gitignore:
+            gitignore = os.path.join(path, GITIGNORE_NAME)
+            self.loaded_files[gitignore] = _stamp(gitignore)
+            spec = IgnoreSpec.from_file(gitignore, rel)
+            if spec is not None:
+                specs = specs + (spec,)
+        return specs
+
+    @staticmethod
+    def is_ignored(specs: Tuple[IgnoreSpec, ...], rel_path: str, name: str, is_dir: bool) -> bool:
+        """
+        True if the deepest ignore file with a matching pattern ignores the entry.
+        """
+        for spec in reversed(specs):
+            result = spec.match(rel_path, name, is_dir)
+            if result is not None:
+                return result
+        return False
+
+    @staticmethod
+    def _find_repository_top(path: str) -> Optional[str]:
+        """
+        The closest directory at or above `path` that contains .git, if any.
+        """
+        current = os.path.abspath(path)
+        while True:
+            if os.path.exists(os.path.join(current, ".git")):
+                return current
+            parent = os.path.dirname(current)
+            if parent == current:
+                return None
+            current = parent
@@ -0,0 +1,311 @@
+# app/incremental_scanner.py
+# ---------------------------------------------------------------------
+# Author: Marvin Schubert
+# © 2025, Marvin Schubert. All rights reserved.
+#
+# Description:
+# Keeps the result of a scan up to date after file system changes by
+# re-listing only the affected directories. New subdirectories are
+# scanned fully, unchanged ones keep their subtree, and thanks to the
+# parse cache only modified files are parsed again.
+# ---------------------------------------------------------------------
+
+import os
+import copy
+import logging
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from .config import Settings, SYMLINKS_NO_FOLLOW
+from .file_scanner import FileScanner
+from .cancellation import CancellationToken
+from .tree_model import (
+    ScanTree, ScanSnapshot, ScanStamps, FLAG_DIR, FLAG_ACCESS_DENIED, FLAG_SYMLINK, FLAG_LINK_NOT_FOLLOWED,
+    FLAGS_NOT_DESCENDED
+)
+from .ignore_rules import GITIGNORE_NAME
+
+logger = logging.getLogger(__name__)
+
+class IncrementalScanner:
+    """
+    Holds a scan result per directory so it can be patched:
+      - children: listed directory path -> visible (name, node flags) entries,
+                  or None if access was denied
+      - contents: candidate file path -> its content blocks
+      - links: symlink path -> its target
+      - ignore_files: .gitignore files the result depends on -> (mtime_ns, size)
+      - stamps: listed directory or candidate file path -> (mtime_ns, size) taken
+                when it was scanned (see ScanStamps)
+    """
+
+    def __init__(self, settings: Settings, root_folder: str,
+                 cancel_token: Optional[CancellationToken] = None):
+        """
+        :param settings: Settings of the scan. A copy is kept, so every patch is
+                         built with the settings the result was scanned with.
+        :param cancel_token: Stops a running update with ScanCancelled; the stored
+                             result is incomplete afterwards.
+        """
+        self.settings = copy.copy(settings)
+        self.root_folder = root_folder
+        self.cancel_token = cancel_token or CancellationToken()
+        self.children: Dict[str, Optional[List[Tuple[str, int]]]] = {}
+        self.contents: Dict[str, List[str]] = {}
+        self.links: Dict[str, str] = {}
+        self.ignore_files: Dict[str, Optional[Tuple[int, int]]] = {}
+        self.stamps: Dict[str, Optional[Tuple[int, int]]] = {}
+
+    def adopt(self, scanner: FileScanner):
+        """
+        Takes over the tree and content blocks of a finished FileScanner scan.
+        Subdirectories that were not descended into (see FileScanner.scan's
+        `descend`) keep their existing entries.
+        """
+        tree = scanner.tree
+        top = tree.root_path
+        known = set(self.children)
+        self.ignore_files.update(scanner.ignore_rules.loaded_files)
+        dir_mtimes = scanner.dir_mtimes
+        node_stats = scanner.node_stats
+        # paths[d] is the path of the current ancestor at depth d
+        paths = [top]
+
+        self.children[top] = None if tree.flags[0] & FLAG_ACCESS_DENIED else []
+        if 0 in dir_mtimes:
+            self.stamps[top] = (dir_mtimes[0], 0)
+        for index in range(1, len(tree)):
+            depth = tree.depths[index]
+            del paths[depth:]
+            parent_path = paths[depth - 1]
+            name = tree.names[index]
+            node_flags = tree.flags[index]
+            path = os.path.join(parent_path, name)
+
+            self.children[parent_path].append((name, node_flags))
+            if index in tree.link_targets:
+                self.links[path] = tree.link_targets[index]
+            if node_flags & FLAG_DIR:
+                paths.append(path)
+                if node_flags & FLAGS_NOT_DESCENDED or path in known:
+                    continue
+                self.children[path] = None if node_flags & FLAG_ACCESS_DENIED else []
+                if index in dir_mtimes:
+                    self.stamps[path] = (dir_mtimes[index], 0)
+            else:
+                if index in scanner.node_contents:
+                    self.contents[path] = scanner.node_contents[index]
+                if index in node_stats:
+                    self.stamps[path] = node_stats[index]
+
+    def full_scan(self, scanner: Optional[FileScanner] = None) -> Tuple[str, str]:
+        """
+        Scans the whole root folder (or adopts the given scanner's finished scan).
+        """
+        self._scan_all(scanner)
+        return self.render()
+
+    def _scan_all(self, scanner: Optional[FileScanner] = None):
+        """Replaces the stored result with a scan of the whole root folder."""
+        self.children.clear()
+        self.contents.clear()
+        self.links.clear()
+        self.ignore_files.clear()
+        self.stamps.clear()
+        if scanner is None:
+            scanner = FileScanner(self.settings, self.root_folder, cancel_token=self.cancel_token)
+            scanner.scan()
+        self.adopt(scanner)
+
+    def apply_changes(self, changed_paths: Iterable[str]) -> Tuple[str, str]:
+        """
+        Updates the result for changed files/directories (see update()) and
+        returns the new (tree_str, classes_str).
+        """
+        self.update(changed_paths)
+        return self.render()
+
+    def update(self, changed_paths: Iterable[str]):
+        """
+        Updates the result for changed files/directories without rendering it.
+        A changed file re-lists its parent directory, a changed directory
+        re-lists itself; both only one level deep.
+        If a directory's .gitignore was added, changed or removed, its whole
+        subtree is scanned again.
+        If symlinked folders are followed, the whole root folder is scanned
+        again instead: where a linked folder is listed (and where a cycle
+        stops) depends on the entire walk, not just the changed directories.
+        """
+        if self._has_followed_links():
+            logger.debug(f"Scanning {self.root_folder} again (followed symlinks in the result)")
+            self._scan_all()
+            return
+
+        dirs: Set[str] = set()
+        for path in changed_paths:
+            if path in self.children and os.path.isdir(path):
+                dirs.add(path)
+            else:
+                # Removed directory or changed file: the parent listing changed
+                self._drop_subtree(path)
+                dirs.add(self._parent_key(path))
+
+        for directory in dirs:
+            gitignore = os.path.join(directory, GITIGNORE_NAME)
+            if self.children.get(directory) is None:
+                continue
+            signature = self._signature(gitignore)
+            if signature != self.ignore_files.get(gitignore, None):
+                logger.debug(f"Ignore rules changed below: {directory}")
+                self.ignore_files.pop(gitignore, None)
+                self._drop_subtree(directory)
+                self.children[directory] = []
+
+        for directory in sorted(dirs, key=lambda d: d.count(os.sep)):
+            if directory in self.children:
+                logger.debug(f"Re-listing changed directory: {directory}")
+                self._rescan_directory(directory)
+        if self._has_followed_links():
+            # The changes added a followed link; the patch listed it without the rest of the walk
+            self._scan_all()
+
+    def watched_directories(self) -> List[str]:
+        """Directories whose listing is part of the result."""
+        return [path for path, entries in self.children.items() if entries is not None]
+
+    def watched_files(self) -> List[str]:
+        """Files whose content or ignore rules are part of the result."""
+        return list(self.contents) + list(self.ignore_files)
+
+    def render(self) -> Tuple[str, str]:
+        """
+        Renders (tree_str, classes_str) exactly like FileScanner.build_tree would.
+        """
+        return self.snapshot().render()
+
+    def snapshot(self) -> ScanSnapshot:
+        """
+        Rebuilds the ScanTree and the content blocks per node from the stored listings.
+        """
+        tree = ScanTree(self.root_folder)
+        node_contents: Dict[int, List[str]] = {}
+        stamps = ScanStamps(self.ignore_files)
+        if self.root_folder in self.stamps:
+            stamps.add(0, self.stamps[self.root_folder])
+        root_entries = self.children.get(self.root_folder)
+        if root_entries is None:
+            tree.flags[0] |= FLAG_ACCESS_DENIED
+            return ScanSnapshot(tree, node_contents, self.settings.dedup_contents, stamps=stamps)
+
+        # Each frame: [node index, directory path, entries, next entry index]
+        stack = [[0, self.root_folder, root_entries, 0]]
+        while stack:
+            frame = stack[-1]
+            node, directory, entries, i = frame
+            if i >= len(entries):
+                stack.pop()
+                continue
+            frame[3] = i + 1
+
+            name, node_flags = entries[i]
+            path = os.path.join(directory, name)
+            if node_flags & FLAG_DIR and not node_flags & FLAGS_NOT_DESCENDED:
+                sub_entries = self.children.get(path, [])
+                if sub_entries is None:
+                    node_flags |= FLAG_ACCESS_DENIED
+                else:
+                    node_flags &= ~FLAG_ACCESS_DENIED
+                child = tree.add(name, node, node_flags)
+                if sub_entries:
+                    stack.append([child, path, sub_entries, 0])
+            else:
+                child = tree.add(name, node, node_flags)
+                blocks = self.contents.get(path)
+                if blocks:
+                    node_contents[child] = blocks
+            if path in self.links:
+                tree.link_targets[child] = self.links[path]
+            if path in self.stamps:
+                stamps.add(child, self.stamps[path])
+
+        return ScanSnapshot(tree, node_contents, self.settings.dedup_contents, stamps=stamps)
+
+    def _rescan_directory(self, directory: str):
+        """
+        Re-lists one directory. Known subdirectories keep their subtree,
+        new ones are scanned fully, removed entries are dropped. A directory
+        that no longer exists is dropped and its parent re-listed instead.
+        """
+        old_entries = self.children.get(directory) or []
+        for name, node_flags in old_entries:
+            path = os.path.join(directory, name)
+            self.links.pop(path, None)
+            if node_flags & FLAG_DIR:
+                if not os.path.isdir(path):
+                    self._drop_subtree(path)
+            else:
+                self.contents.pop(path, None)
+                self.stamps.pop(path, None)
+
+        scanner = FileScanner(self.settings, self.root_folder, cancel_token=self.cancel_token)
+        try:
+            scanner.scan(directory, descend=lambda path: path not in self.children)
+        except (FileNotFoundError, NotADirectoryError):
+            if directory == self.root_folder:
+                raise
+            logger.debug(f"Changed directory vanished: {directory}")
+            self._drop_subtree(directory)
+            self._rescan_directory(self._parent_key(directory))
+            return
+        self.adopt(scanner)
+
+    def _has_followed_links(self) -> bool:
+        """
+        True if the symlink policy follows links and the result holds a symlinked
+        folder that was followed or skipped as already listed.
+        """
+        if self.settings.symlink_policy == SYMLINKS_NO_FOLLOW:
+            return False
+        for entries in self.children.values():
+            for _, node_flags in entries or ():
+                if (node_flags & FLAG_DIR and node_flags & FLAG_SYMLINK
+                        and not node_flags & FLAG_LINK_NOT_FOLLOWED):
+                    return True
+        return False
+
+    @staticmethod
+    def _signature(path: str) -> Optional[Tuple[int, int]]:
+        """(mtime_ns, size) of a file, None if it does not exist."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _parent_key(self, path: str) -> str:
+        """
+        Parent directory of a path, spelled like the root folder if it is the root
+        (the root may have been given with a trailing separator).
+        """
+        parent = os.path.dirname(path)
+        if parent not in self.children and os.path.normpath(parent) == os.path.normpath(self.root_folder):
+            return self.root_folder
+        return parent
+
+    def _drop_subtree(self, path: str):
+        """
+        Forgets a directory (including everything below it) or a single file.
+        """
+        self.contents.pop(path, None)
+        self.links.pop(path, None)
+        self.stamps.pop(path, None)
+        stack = [path]
+        while stack:
+            directory = stack.pop()
+            entries = self.children.pop(directory, None)
+            for name, node_flags in entries or ():
+                sub_path = os.path.join(directory, name)
+                self.links.pop(sub_path, None)
+                self.stamps.pop(sub_path, None)
+                if node_flags & FLAG_DIR:
+                    stack.append(sub_path)
+                else:
+                    self.contents.pop(sub_path, None)
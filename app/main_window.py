@@ -5,21 +5,35 @@
 #
 # Description:
 # Main GUI window for the "Prompting Assistant" application.
-# Now includes an expanded cache key to account for .py, Docker, .toml toggles.
+# Finished scans are cached per folder and scan settings (see result_cache.py).
+# "Batch Scan" scans every subfolder of a chosen folder in one batch.
+# Results are rendered for copying and exporting in a RenderWorker.
 # ---------------------------------------------------------------------
 
-import os
 import logging
+from typing import List, Optional
 
 from PySide6.QtWidgets import (
     QMainWindow, QPushButton, QLabel, QProgressBar, QPlainTextEdit,
-    QHBoxLayout, QVBoxLayout, QWidget, QFileDialog, QApplication
+    QHBoxLayout, QVBoxLayout, QWidget, QFileDialog, QApplication, QToolButton,
+    QTreeView, QStackedWidget
 )
-from PySide6.QtCore import Slot
+from PySide6.QtCore import Slot, Qt
+from PySide6.QtGui import QFontDatabase
 
 from .settings_widget import SettingsWidget
-from .worker import ScanWorker
+from .worker import ScanWorker, BatchScanWorker, RenderWorker
+from .batch_scanner import RootResult
+from .file_scanner import CONTENTS_SECTION
+from .progress import ScanProgress
+from .scan_metrics import ScanMetrics
+from .folder_watcher import FolderWatcher
+from .tree_model import ScanSnapshot
+from .result_cache import ResultCache
+from .result_model import ResultTreeModel
 from .config import Settings
+from .api import CONTENTS_HEADER, root_name
+from .exporter import FORMAT_EXTENSIONS, format_for_path
 
 logger = logging.getLogger(__name__)
 
@@ -36,17 +50,51 @@ class MainWindow(QMainWindow):
 
         # UI Elements
         self.select_button = QPushButton("Select Path")
+        self.batch_button = QPushButton("Batch Scan")
+        self.batch_button.setToolTip("Scan every subfolder of a folder (e.g. a folder of repositories) as one batch")
         self.path_label = QLabel("/... ")
         self.progress_bar = QProgressBar()
         self.progress_bar.setValue(0)
+        self.progress_label = QLabel("")
+        # Plain text is only used for streamed output while a scan runs;
+        # finished results are shown in the lazy tree view
         self.output_text = QPlainTextEdit()
         self.output_text.setReadOnly(True)
+        self.result_view = QTreeView()
+        self.result_view.setHeaderHidden(True)
+        self.result_view.setUniformRowHeights(True)
+        self.result_view.setFont(QFontDatabase.systemFont(QFontDatabase.FixedFont))
+        self.result_model = None
+        # False while result_model is a preview of a scan still running
+        self.result_final = False
+        self.output_stack = QStackedWidget()
+        self.output_stack.addWidget(self.output_text)
+        self.output_stack.addWidget(self.result_view)
         self.copy_button = QPushButton("Copy Output")
+        self.export_button = QPushButton("Export")
+        self.export_button.setToolTip("Write the result to a .txt, .md or .json file (add .gz to compress it)")
+
+        # Collapsible panel with the timings and counters of the last scan
+        self.stats_toggle = QToolButton()
+        self.stats_toggle.setText("Scan statistics")
+        self.stats_toggle.setCheckable(True)
+        self.stats_toggle.setToolButtonStyle(Qt.ToolButtonTextBesideIcon)
+        self.stats_toggle.setArrowType(Qt.RightArrow)
+        self.stats_text = QPlainTextEdit()
+        self.stats_text.setReadOnly(True)
+        self.stats_text.setLineWrapMode(QPlainTextEdit.NoWrap)
+        self.stats_text.setFont(QFontDatabase.systemFont(QFontDatabase.FixedFont))
+        self.stats_text.setMaximumHeight(180)
+        self.stats_text.setVisible(False)
 
         # Layout for output
         output_layout = QHBoxLayout()
-        output_layout.addWidget(self.output_text)
-        output_layout.addWidget(self.copy_button)
+        output_layout.addWidget(self.output_stack)
+        output_buttons = QVBoxLayout()
+        output_buttons.addWidget(self.copy_button)
+        output_buttons.addWidget(self.export_button)
+        output_buttons.addStretch()
+        output_layout.addLayout(output_buttons)
 
         # Settings widget
         self.settings_widget = SettingsWidget(self.settings)
@@ -55,28 +103,49 @@ class MainWindow(QMainWindow):
         central_widget = QWidget()
         self.setCentralWidget(central_widget)
         layout = QVBoxLayout(central_widget)
-        layout.addWidget(self.select_button)
+        select_layout = QHBoxLayout()
+        select_layout.addWidget(self.select_button)
+        select_layout.addWidget(self.batch_button)
+        layout.addLayout(select_layout)
         layout.addWidget(self.path_label)
         layout.addWidget(self.progress_bar)
+        layout.addWidget(self.progress_label)
+        layout.addWidget(self.stats_toggle)
+        layout.addWidget(self.stats_text)
         layout.addWidget(self.settings_widget)
         layout.addLayout(output_layout)
 
         # Connect signals
         self.select_button.clicked.connect(self.open_folder_dialog)
+        self.batch_button.clicked.connect(self.open_batch_dialog)
         self.copy_button.clicked.connect(self.copy_output)
+        self.export_button.clicked.connect(self.export_output)
+        self.stats_toggle.toggled.connect(self.on_stats_toggled)
         self.settings_widget.theme_changed.connect(self.apply_theme)
 
-        # For caching scan results:
-        # Key = (folder_path, skip_venv, show_py_content, show_docker, show_toml)
-        self._scan_cache = {}
+        # Finished scans per folder and scan settings, within a memory budget
+        self.result_cache = ResultCache(self.settings.result_cache_bytes)
 
         # Current folder path
         self.current_folder_path = None
 
+        # Keeps the shown result current after file changes (if enabled in the settings)
+        self.folder_watcher = None
+
+        # Whether the contents header was already appended to the streamed output
+        self._streamed_contents = False
+
+        # Worker of the scan in progress; superseded workers are kept alive
+        # in _retired_workers until their thread has wound down
+        self.worker = None
+        self._retired_workers = []
+        # Running RenderWorkers (copy and export), kept alive until they finish
+        self._render_workers = []
+
     def open_folder_dialog(self):
         """
-        Lets user select a folder. Then starts a background scan if 
-        we have not cached the result yet (or if relevant settings changed).
+        Lets user select a folder. Then starts a background scan, which uses
+        the cached result instead if it is still current.
         """
         folder_path = QFileDialog.getExistingDirectory(self, "Select Folder")
         if not folder_path:
@@ -84,80 +153,350 @@ class MainWindow(QMainWindow):
 
         self.path_label.setText(folder_path)
         self.current_folder_path = folder_path
+        self.stop_watching()
+        self.cancel_scan()
 
-        # Build an expanded cache key that accounts for all relevant toggles.
-        cache_key = (
-            folder_path,
-            self.settings.skip_venv,
-            self.settings.show_py_content,
-            self.settings.show_docker_content,
-            self.settings.show_toml_content
-        )
-
-        if cache_key in self._scan_cache:
-            logger.info("Cache hit! Using cached results.")
-            tree_str, classes_str = self._scan_cache[cache_key]
-            self.show_scan_results(folder_path, tree_str, classes_str)
-        else:
-            logger.info("Cache miss. Starting background scan.")
-            # Clear UI
-            self.output_text.clear()
-            self.progress_bar.setValue(0)
+        # The worker checks whether a cached result is still current before
+        # using it, so the file system is not touched on the GUI thread
+        cached = self.result_cache.get(folder_path, self.settings, check=False)
+        logger.info("Cache hit, checking the cached result." if cached is not None
+                    else "Cache miss. Starting background scan.")
+        # Clear UI
+        self.output_text.clear()
+        self.output_stack.setCurrentWidget(self.output_text)
+        self.progress_bar.setValue(0)
+        self.progress_label.clear()
+        self.stats_text.clear()
 
-            # Start background worker
-            self.worker = ScanWorker(folder_path, self.settings)
-            self.worker.progressUpdated.connect(self.on_progress_updated)
-            self.worker.scanningFinished.connect(self.on_scanning_finished)
-            self.worker.start()
+        # Start background worker
+        self.worker = ScanWorker(folder_path, self.settings, cached)
+        self.worker.progressUpdated.connect(self.on_progress_updated)
+        self.worker.scanningFinished.connect(self.on_scanning_finished)
+        self.worker.previewReady.connect(self.on_preview_ready)
+        self.worker.scanningFailed.connect(self.on_scanning_failed)
+        self.worker.scanningCancelled.connect(self.on_scanning_cancelled)
+        if self.worker.streaming:
+            # The root name comes first; tree and contents are appended as they arrive
+            self.output_text.setPlainText(root_name(folder_path))
+            self._streamed_contents = False
+            self.worker.outputChunk.connect(self.on_output_chunk)
+        self.worker.start()
+        self.set_output_actions_enabled(False)
 
-    @Slot(int)
-    def on_progress_updated(self, value: int):
+    def open_batch_dialog(self):
         """
-        Updates progress bar from worker signals.
+        Lets the user select a folder and scans all of its non-hidden
+        subfolders as one batch. Batch results are not watched for changes.
         """
-        self.progress_bar.setValue(value)
+        folder_path = QFileDialog.getExistingDirectory(self, "Select Folder With Repositories")
+        if not folder_path:
+            return
+        self.start_batch_scan(folder_path)
 
-    @Slot(str, str)
-    def on_scanning_finished(self, tree_str: str, classes_str: str):
+    def start_batch_scan(self, folder_path: str, roots: Optional[List[str]] = None):
+        """
+        Scans the given roots in the background; the result shows one
+        top-level node per root. Without roots, the worker lists the
+        subfolders of folder_path (see batch_roots), off the GUI thread.
+        """
+        self.current_folder_path = None
+        self.stop_watching()
+        self.cancel_scan()
+
+        self.path_label.setText(folder_path)
+        self.output_text.clear()
+        self.output_stack.setCurrentWidget(self.output_text)
+        self.progress_bar.setValue(0)
+        self.progress_label.clear()
+        self.stats_text.clear()
+
+        self.worker = BatchScanWorker(folder_path, roots, self.settings)
+        self.worker.progressUpdated.connect(self.on_progress_updated)
+        self.worker.scanningFinished.connect(self.on_batch_finished)
+        self.worker.scanningFailed.connect(self.on_scanning_failed)
+        self.worker.scanningCancelled.connect(self.on_scanning_cancelled)
+        self.worker.start()
+        self.set_output_actions_enabled(False)
+
+    def cancel_scan(self):
+        """
+        Cancels the scan in progress, if any, without blocking the UI.
+        Its signals are disconnected, so late results cannot overwrite the
+        output of the next scan; scanningCancelled stays connected to enable
+        the output actions again if no other scan was started.
+        """
+        worker = self.worker
+        self.worker = None
+        if worker is None or not worker.isRunning():
+            return
+
+        logger.info(f"Cancelling running scan of {worker.folder_path}.")
+        worker.cancel()
+        signals = [worker.progressUpdated, worker.scanningFinished, worker.scanningFailed]
+        if isinstance(worker, ScanWorker):
+            signals += [worker.outputChunk, worker.previewReady]
+        for signal in signals:
+            try:
+                signal.disconnect()
+            except (RuntimeError, TypeError):
+                pass  # Nothing connected
+        self._retired_workers.append(worker)
+        worker.finished.connect(lambda: self._retire_worker(worker))
+        if worker.isFinished():
+            self._retire_worker(worker)
+
+    def _retire_worker(self, worker):
+        if worker in self._retired_workers:
+            self._retired_workers.remove(worker)
+        worker.deleteLater()
+
+    def closeEvent(self, event):
+        """
+        Stops watching and waits for running scans so no thread outlives the window.
+        """
+        self.stop_watching()
+        self.cancel_scan()
+        for worker in list(self._retired_workers):
+            worker.stop()
+        for worker in list(self._render_workers):
+            worker.wait()
+        super().closeEvent(event)
+
+    @Slot(object)
+    def on_progress_updated(self, progress: ScanProgress):
+        """
+        Updates progress bar and statistics from worker signals.
+        The total is a running estimate, so the maximum is adjusted as well.
+        """
+        if self._is_stale_sender():
+            return
+        self.progress_bar.setMaximum(max(progress.estimated_total, 1))
+        self.progress_bar.setValue(progress.processed)
+        self.progress_label.setText(progress.summary())
+
+    @Slot(object)
+    def on_scanning_finished(self, snapshot: ScanSnapshot):
         """
         Called when the background thread finishes scanning.
+        A streamed preview is replaced by the tree view of the result.
         """
-        if not self.current_folder_path:
+        if not self.current_folder_path or self.worker is None or self._is_stale_sender():
+            return
+        self.set_output_actions_enabled(True)
+
+        if self.worker.from_cache:
+            self.show_scan_results(snapshot)
+            self.stats_text.setPlainText("Result taken from the cache, no scan was run.")
             return
 
-        cache_key = (
-            self.current_folder_path,
-            self.settings.skip_venv,
-            self.settings.show_py_content,
-            self.settings.show_docker_content,
-            self.settings.show_toml_content
-        )
+        # Cache the results under the settings they were scanned with
+        self.result_cache.put(self.current_folder_path, self.worker.settings, snapshot)
+        if self.worker.metrics is not None:
+            self.show_scan_metrics(self.worker.metrics)
 
-        # Cache the results
-        self._scan_cache[cache_key] = (tree_str, classes_str)
+        self.show_scan_results(snapshot)
 
-        self.show_scan_results(self.current_folder_path, tree_str, classes_str)
+        # Keep the result current while this folder is shown
+        if self.worker.incremental is not None:
+            self.folder_watcher = FolderWatcher(self.worker.incremental, self)
+            self.folder_watcher.resultsUpdated.connect(self.on_watched_results_updated)
+            self.folder_watcher.watchingStopped.connect(self.on_watching_stopped)
 
-    def show_scan_results(self, folder_path: str, tree_str: str, classes_str: str):
+    @Slot(str)
+    def on_scanning_failed(self, error: str):
         """
-        Shows the final results (directory tree + class/file content) in the UI.
+        Called when a scan or batch failed. The output actions are enabled
+        again; a preview shown meanwhile is still neither copied nor exported.
         """
-        root_name = os.path.basename(folder_path.rstrip(os.sep))
-        output_lines = [root_name, tree_str]
+        if self.worker is None or self._is_stale_sender():
+            return
+        self.set_output_actions_enabled(True)
+        self.progress_label.setText(f"Scan failed: {error}")
+
+    @Slot()
+    def on_scanning_cancelled(self):
+        """
+        Called when a cancelled scan or batch stopped; the output actions are
+        enabled again unless another scan runs by now.
+        """
+        if self.worker is not None and self._is_stale_sender():
+            return
+        self.set_output_actions_enabled(True)
 
-        if classes_str.strip():
-            output_lines.append("\n----- Python / Additional Contents -----\n" + classes_str)
+    @Slot(object)
+    def on_preview_ready(self, snapshot: ScanSnapshot):
+        """
+        Shows the top levels of the tree while the full scan continues
+        (settings.preview_depth); the final result replaces it.
+        """
+        if self.worker is None or self._is_stale_sender():
+            return
+        self.show_batch_results([snapshot], final=False)
 
-        final_text = "\n".join(output_lines)
-        self.output_text.setPlainText(final_text)
+    @Slot(object)
+    def on_batch_finished(self, results: List[RootResult]):
+        """
+        Called when a batch scan finished. Every root is cached like a single
+        scan, so selecting one of them later is served from the cache.
+        """
+        if self.worker is None or self._is_stale_sender():
+            return
+        self.set_output_actions_enabled(True)
+        if not results:
+            self.progress_label.setText("No subfolders to scan.")
+            return
+        self.path_label.setText(f"{self.worker.folder_path} ({len(results)} folders)")
+        for result in results:
+            self.result_cache.put(result.root_folder, self.worker.settings, result.snapshot)
+        if self.worker.metrics is not None:
+            self.show_scan_metrics(self.worker.metrics)
+        self.show_batch_results([result.snapshot for result in results])
+
+    @Slot(str, str)
+    def on_output_chunk(self, section: str, text: str):
+        """
+        Appends a chunk of streamed output. The resulting text is the same
+        as show_scan_results would produce for the final result.
+        """
+        if self._is_stale_sender():
+            return
+        if section == CONTENTS_SECTION and not self._streamed_contents:
+            self._streamed_contents = True
+            text = CONTENTS_HEADER + text
+        self.output_text.appendPlainText(text)
+
+    @Slot(object)
+    def on_watched_results_updated(self, snapshot: ScanSnapshot):
+        """
+        Called when the folder watcher patched the result after file changes.
+        """
+        incremental = self.folder_watcher.incremental
+        # The patches are built with the settings of the original scan
+        self.result_cache.put(incremental.root_folder, incremental.settings, snapshot)
+        if incremental.root_folder == self.current_folder_path:
+            self.show_scan_results(snapshot)
+
+    @Slot(str)
+    def on_watching_stopped(self, reason: str):
+        """
+        Called when the folder watcher gave up (too many folders to watch);
+        the shown result is no longer kept current.
+        """
+        self.stop_watching()
+        self.progress_label.setText(f"Not watching for changes: {reason}. Rescan to update the result.")
+
+    def stop_watching(self):
+        """
+        Stops the folder watcher of the previously shown folder, if any.
+        """
+        if self.folder_watcher is not None:
+            self.folder_watcher.stop()
+            self.folder_watcher.deleteLater()
+            self.folder_watcher = None
+
+    def _is_stale_sender(self) -> bool:
+        """
+        True if the current slot was triggered by a superseded worker whose
+        queued signals were delivered after it was cancelled.
+        """
+        sender = self.sender()
+        return isinstance(sender, (ScanWorker, BatchScanWorker)) and sender is not self.worker
+
+    def show_scan_results(self, snapshot: ScanSnapshot):
+        """
+        Shows the final results (directory tree + class/file content) in the tree view.
+        Rows are created as nodes are expanded, so large results show instantly.
+        """
+        self.show_batch_results([snapshot])
+
+    def show_batch_results(self, snapshots: List[ScanSnapshot], final: bool = True):
+        """
+        Shows the results of several roots in the tree view, one top-level
+        node each. A single root is expanded.
+
+        :param final: False for a preview shown while the scan is still running.
+        """
+        old_model = self.result_model
+        self.result_model = ResultTreeModel(snapshots, self)
+        self.result_final = final
+        self.result_view.setModel(self.result_model)
+        if len(snapshots) == 1:
+            self.result_view.expand(self.result_model.index(0, 0))
+        if old_model is not None:
+            old_model.deleteLater()
+        self.output_stack.setCurrentWidget(self.result_view)
+        self.output_text.clear()
         # Optionally set the progress bar to full
-        self.progress_bar.setValue(self.progress_bar.maximum())
+        if final:
+            self.progress_bar.setValue(self.progress_bar.maximum())
+
+    def show_scan_metrics(self, metrics: ScanMetrics):
+        """
+        Shows the timings, counters and slowest files of a scan in the stats panel.
+        """
+        self.stats_text.setPlainText(metrics.summary())
+
+    def on_stats_toggled(self, expanded: bool):
+        """Expands or collapses the stats panel."""
+        self.stats_toggle.setArrowType(Qt.DownArrow if expanded else Qt.RightArrow)
+        self.stats_text.setVisible(expanded)
+
+    def set_output_actions_enabled(self, enabled: bool):
+        """
+        Enables "Copy Output" and "Export"; they are disabled while a scan runs,
+        since only a preview or a partial streamed output is shown until it ends.
+        """
+        self.copy_button.setEnabled(enabled)
+        self.export_button.setEnabled(enabled)
 
     def copy_output(self):
         """
-        Copy the displayed text to the system clipboard.
+        Copy the displayed result to the system clipboard. For a finished scan
+        the full output text is rendered in a RenderWorker first; a preview
+        is not copied.
+        """
+        if self.output_stack.currentWidget() is self.result_view and self.result_model is not None:
+            if not self.result_final:
+                self.progress_label.setText("Only a preview is shown; wait for the scan to finish.")
+                return
+            worker = RenderWorker(self.result_model.snapshots)
+            worker.rendered.connect(QApplication.clipboard().setText)
+            self._start_render(worker)
+        else:
+            QApplication.clipboard().setText(self.output_text.toPlainText())
+
+    def export_output(self):
+        """
+        Lets the user choose a file and streams the shown result into it,
+        in the format its name asks for (see exporter.format_for_path).
         """
-        QApplication.clipboard().setText(self.output_text.toPlainText())
+        if (self.output_stack.currentWidget() is not self.result_view or self.result_model is None
+                or not self.result_final):
+            self.progress_label.setText("Nothing to export yet; wait for the scan to finish.")
+            return
+        snapshots = self.result_model.snapshots
+        name = root_name(snapshots[0].root_folder) if len(snapshots) == 1 else "batch"
+        filters = ";;".join(f"{fmt.title()} (*{extension} *{extension}.gz)"
+                            for fmt, extension in FORMAT_EXTENSIONS.items())
+        file_path, _ = QFileDialog.getSaveFileName(self, "Export Output", f"{name}.txt", filters)
+        if not file_path:
+            return
+        fmt, compress = format_for_path(file_path)
+        worker = RenderWorker(snapshots, fmt, file_path, compress)
+        worker.exported.connect(lambda path: self.progress_label.setText(f"Exported to {path}"))
+        worker.failed.connect(lambda error: self.progress_label.setText(f"Export failed: {error}"))
+        self._start_render(worker)
+
+    def _start_render(self, worker: RenderWorker):
+        """Starts a RenderWorker and keeps it alive while it runs."""
+        self._render_workers.append(worker)
+        worker.finished.connect(lambda: self._render_done(worker))
+        worker.start()
+
+    def _render_done(self, worker: RenderWorker):
+        if worker in self._render_workers:
+            self._render_workers.remove(worker)
+        worker.deleteLater()
 
     def apply_theme(self, theme: str):
         """
@@ -172,7 +511,7 @@ class MainWindow(QMainWindow):
                 QLabel, QCheckBox, QPushButton, QComboBox {
                     color: #ffffff;
                 }
-                QPlainTextEdit {
+                QPlainTextEdit, QTreeView {
                     background-color: #3c3c3c;
                     color: #ffffff;
                 }
@@ -194,7 +533,7 @@ class MainWindow(QMainWindow):
                 QLabel, QCheckBox, QPushButton, QComboBox {
                     color: #000000;
                 }
-                QPlainTextEdit {
+                QPlainTextEdit, QTreeView {
                     background-color: #f0f0f0;
                     color: #000000;
                 }
@@ -0,0 +1,133 @@
+# app/packer.py
+# ---------------------------------------------------------------------
+# Author: Marvin Schubert
+# © 2025, Marvin Schubert. All rights reserved.
+#
+# Description:
+# Fits the output of a scan into a token budget (settings.token_budget).
+# The tree is always kept; content blocks are taken in priority order
+# (pinned paths first, then by depth, size or recency) while they fit.
+# The scanner parses files in that order and stops once the budget is
+# spent, so files that would not make it into the output are never
+# read. Token counts are estimated from the text length, which is cheap
+# enough to update after every block.
+# ---------------------------------------------------------------------
+
+import os
+import logging
+from typing import List, Optional, Sequence, Tuple
+from .config import Settings, BUDGET_PRIORITIES, BUDGET_BY_SIZE, BUDGET_BY_RECENCY
+from .tree_model import ScanTree
+
+logger = logging.getLogger(__name__)
+
+# Average characters per token of source code and English text
+CHARS_PER_TOKEN = 4
+
+# Packing stops once less than this is left; no useful block is smaller
+MIN_BLOCK_TOKENS = 16
+
+# Packing also stops after this many blocks in a row did not fit: the files
+# further down the order are rarely smaller, and parsing them costs the most
+MAX_MISSES_IN_ROW = 8
+
+# Sort key of files whose size or mtime is unknown (stat failed): last
+_UNKNOWN = float("inf")
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count of a text (length / CHARS_PER_TOKEN, rounded up)."""
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+def estimate_tree_tokens(tree: ScanTree) -> int:
+    """
+    Approximate token count of the rendered tree, without rendering it:
+    each line holds the name and four characters of indentation per level.
+    """
+    chars = sum(map(len, tree.names)) + 4 * sum(tree.depths) + len(tree)
+    return -(-chars // CHARS_PER_TOKEN)
+
+def omitted_note(count: int, budget: int) -> str:
+    """Last line of a packed output that left out file contents."""
+    return f"[{count:,} more files left out to fit the token budget of {budget:,}]"
+
+class TokenPacker:
+    """
+    Accepts content blocks while they fit into the budget and decides the
+    order in which candidate files are parsed.
+    """
+
+    def __init__(self, budget: int, priority: str, pinned_paths: Sequence[str] = ()):
+        """
+        :param budget: Token limit for the whole output.
+        :param priority: One of BUDGET_PRIORITIES.
+        :param pinned_paths: "/"-separated files or folders, relative to the scanned folder,
+                             whose contents are taken before all others.
+        """
+        if priority not in BUDGET_PRIORITIES:
+            raise ValueError(f"Unknown budget priority: {priority}")
+        self.budget = budget
+        self.priority = priority
+        self.pinned = tuple(path.strip().strip("/") for path in pinned_paths if path.strip().strip("/"))
+        self.used = 0
+        # Parsed blocks that did not fit (in total, and since the last that did)
+        self.rejected = 0
+        self._misses = 0
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> Optional["TokenPacker"]:
+        """A packer for settings.token_budget, or None if there is no budget."""
+        if settings.token_budget <= 0:
+            return None
+        return cls(settings.token_budget, settings.budget_priority, settings.pinned_paths)
+
+    @property
+    def remaining(self) -> int:
+        return max(0, self.budget - self.used)
+
+    @property
+    def exhausted(self) -> bool:
+        """True once no further block is expected to fit."""
+        return self.remaining < MIN_BLOCK_TOKENS or self._misses >= MAX_MISSES_IN_ROW
+
+    def spend(self, tokens: int):
+        """Reserves tokens for output that is always kept (the tree)."""
+        self.used += tokens
+
+    def take(self, block: str) -> bool:
+        """Accepts the block if it fits into what is left of the budget."""
+        tokens = estimate_tokens(block) + 1  # and the line break joining it
+        if tokens > self.remaining:
+            self.rejected += 1
+            self._misses += 1
+            return False
+        self.used += tokens
+        self._misses = 0
+        return True
+
+    def order(self, root_folder: str, paths: Sequence[str], depths: Sequence[int],
+              stats: Sequence[Optional[Tuple[int, int]]]) -> List[int]:
+        """
+        Indices of the candidate files in the order their contents are packed:
+        pinned paths first, then by the priority. Ties keep tree order.
+
+        :param paths: Full path of each candidate file.
+        :param depths: Tree depth of each file.
+        :param stats: (mtime_ns, size) of each file, None if unknown.
+        """
+        keys = []
+        for path, depth, stat in zip(paths, depths, stats):
+            size = stat[1] if stat else _UNKNOWN
+            if self.priority == BUDGET_BY_SIZE:
+                rank = (size,)
+            elif self.priority == BUDGET_BY_RECENCY:
+                rank = (-stat[0] if stat else _UNKNOWN,)
+            else:
+                rank = (depth, size)
+            keys.append((not self._is_pinned(root_folder, path),) + rank)
+        return sorted(range(len(keys)), key=keys.__getitem__)
+
+    def _is_pinned(self, root_folder: str, path: str) -> bool:
+        if not self.pinned:
+            return False
+        rel = os.path.relpath(path, root_folder).replace(os.sep, "/")
+        return any(rel == pinned or rel.startswith(pinned + "/") for pinned in self.pinned)
@@ -0,0 +1,210 @@
+# app/parse_cache.py
+# ---------------------------------------------------------------------
+# Author: Marvin Schubert
+# © 2025, Marvin Schubert. All rights reserved.
+#
+# Description:
+# Persistent per-file cache of parser output, stored in SQLite under
+# the user cache directory. Entries are keyed by (absolute path, parser
+# kind) and only valid for the same mtime_ns, size and parser version.
+# The first time a process opens a cache file, entries of outdated
+# parser versions and, past max_entries, the least recently used ones
+# are deleted, so the file stays bounded.
+# ---------------------------------------------------------------------
+
+import os
+import sys
+import time
+import sqlite3
+import logging
+import threading
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+APP_CACHE_DIR_NAME = "prompting-assistant"
+CACHE_FILE_NAME = "parse_cache.sqlite3"
+
+# Rows written to each cache file since this process last pruned it; files
+# not listed here were not pruned yet
+_writes_since_prune: Dict[str, int] = {}
+_prune_lock = threading.Lock()
+
+# Closing a cache prunes it again once this many rows were written since the
+# last pruning, so long sessions exceed max_entries by at most this much
+PRUNE_AFTER_WRITES = 1_000
+
+# SQLite limits the number of bound parameters per statement
+_QUERY_CHUNK = 500
+
+# (absolute path, kind) -> (mtime_ns, size, parser version)
+CacheKey = Tuple[str, str]
+Signature = Tuple[int, int, int]
+
+def user_cache_dir() -> str:
+    """
+    Returns the per-user cache directory of the application
+    (XDG_CACHE_HOME on Linux, LOCALAPPDATA on Windows, ~/Library/Caches on macOS).
+    """
+    if sys.platform.startswith("win"):
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~\\AppData\\Local")
+    elif sys.platform == "darwin":
+        base = os.path.expanduser("~/Library/Caches")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, APP_CACHE_DIR_NAME)
+
+def default_cache_path() -> str:
+    return os.path.join(user_cache_dir(), CACHE_FILE_NAME)
+
+class ParseCache:
+    """
+    SQLite-backed cache of parser results.
+    A connection is bound to the thread that opened it, so each scan opens its own.
+    """
+
+    def __init__(self, db_path: str = "", max_entries: int = 0,
+                 versions: Optional[Mapping[str, int]] = None):
+        """
+        :param db_path: Location of the SQLite file ("" = default user cache location).
+        :param max_entries: Entries kept, the least recently used beyond it are deleted (0 = no limit).
+        :param versions: Current version per parser kind; entries of other versions are deleted.
+        Both are applied on the first open per process and cache file; the
+        entry limit again on close() after PRUNE_AFTER_WRITES written rows.
+        """
+        self.db_path = db_path or default_cache_path()
+        self.max_entries = max_entries
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path, timeout=10)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS parse_cache (
+                path TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                version INTEGER NOT NULL,
+                content TEXT NOT NULL,
+                last_used INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (path, kind)
+            ) WITHOUT ROWID
+        """)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(parse_cache)")}
+        if "last_used" not in columns:
+            # Cache file of an earlier version; its entries count as least recently used
+            self._conn.execute("ALTER TABLE parse_cache ADD COLUMN last_used INTEGER NOT NULL DEFAULT 0")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS parse_cache_last_used ON parse_cache (last_used)")
+        self._conn.commit()
+        with _prune_lock:
+            first_open = self.db_path not in _writes_since_prune
+            _writes_since_prune.setdefault(self.db_path, 0)
+        if first_open:
+            self.prune(max_entries, versions)
+
+    @classmethod
+    def open(cls, db_path: str = "", max_entries: int = 0,
+             versions: Optional[Mapping[str, int]] = None) -> Optional["ParseCache"]:
+        """
+        Opens (and prunes) the cache, or returns None (scanning then runs
+        uncached) if the cache file cannot be created or read.
+        """
+        try:
+            return cls(db_path, max_entries, versions)
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"Parse cache unavailable, continuing without it: {e}")
+            return None
+
+    def get_many(self, signatures: Dict[CacheKey, Signature]) -> Dict[CacheKey, str]:
+        """
+        Returns the cached content for every key whose stored signature
+        (mtime_ns, size, parser version) matches the given one.
+        Hits are marked as used now (see prune).
+        """
+        hits: Dict[CacheKey, str] = {}
+        paths = list({path for path, _ in signatures})
+        try:
+            for start in range(0, len(paths), _QUERY_CHUNK):
+                chunk = paths[start:start + _QUERY_CHUNK]
+                rows = self._conn.execute(
+                    "SELECT path, kind, mtime_ns, size, version, content FROM parse_cache "
+                    f"WHERE path IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                )
+                for path, kind, mtime_ns, size, version, content in rows:
+                    if signatures.get((path, kind)) == (mtime_ns, size, version):
+                        hits[(path, kind)] = content
+            if hits:
+                with self._conn:
+                    now = int(time.time())
+                    self._conn.executemany("UPDATE parse_cache SET last_used = ? WHERE path = ? AND kind = ?",
+                                           [(now, path, kind) for path, kind in hits])
+        except sqlite3.Error as e:
+            logger.warning(f"Parse cache lookup failed: {e}")
+        return hits
+
+    def put_many(self, entries: Iterable[Tuple[CacheKey, Signature, str]]):
+        """
+        Stores (key, signature, content) entries, replacing older versions of the same file.
+        """
+        now = int(time.time())
+        rows: List[tuple] = [
+            (path, kind, mtime_ns, size, version, content, now)
+            for (path, kind), (mtime_ns, size, version), content in entries
+        ]
+        if not rows:
+            return
+        try:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO parse_cache "
+                    "(path, kind, mtime_ns, size, version, content, last_used) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"Parse cache update failed: {e}")
+            return
+        with _prune_lock:
+            _writes_since_prune[self.db_path] = _writes_since_prune.get(self.db_path, 0) + len(rows)
+
+    def prune(self, max_entries: int = 0, versions: Optional[Mapping[str, int]] = None):
+        """
+        Deletes entries of parser versions other than `versions` (per kind) and,
+        beyond max_entries, the least recently used entries (0 = no limit).
+        """
+        try:
+            with self._conn:
+                deleted = 0
+                for kind, version in (versions or {}).items():
+                    # Python entries with non-default extractors are stored as "python:<extractors>"
+                    deleted += self._conn.execute(
+                        "DELETE FROM parse_cache WHERE (kind = ? OR kind LIKE ? || ':%') AND version != ?",
+                        (kind, kind, version)).rowcount
+                if max_entries > 0:
+                    excess = self._conn.execute("SELECT COUNT(*) FROM parse_cache").fetchone()[0] - max_entries
+                    if excess > 0:
+                        deleted += self._conn.execute(
+                            "DELETE FROM parse_cache WHERE (path, kind) IN (SELECT path, kind FROM parse_cache "
+                            "ORDER BY last_used LIMIT ?)", (excess,)).rowcount
+        except sqlite3.Error as e:
+            logger.warning(f"Parse cache pruning failed: {e}")
+            return
+        if deleted:
+            logger.info(f"Pruned {deleted:,} entries from the parse cache.")
+
+    def clear(self):
+        """Removes all cached entries."""
+        with self._conn:
+            self._conn.execute("DELETE FROM parse_cache")
+
+    def close(self):
+        """Closes the connection, pruning first if many rows were written (see PRUNE_AFTER_WRITES)."""
+        with _prune_lock:
+            due = _writes_since_prune.get(self.db_path, 0) >= PRUNE_AFTER_WRITES
+            if due:
+                _writes_since_prune[self.db_path] = 0
+        if due:
+            self.prune(self.max_entries)
+        self._conn.close()
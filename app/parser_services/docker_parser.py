@@ -8,16 +8,26 @@
 # ---------------------------------------------------------------------
 
 import logging
+from .file_reader import read_text, DEFAULT_MAX_FILE_BYTES
+from .parser_spec import ParserSpec
 
 logger = logging.getLogger(__name__)
 
-def read_dockerfile_content(file_path: str) -> str:
+# Bump when the output format changes, so cached results are re-parsed
+PARSER_VERSION = 2
+
+def read_dockerfile_content(file_path: str, max_bytes: int = DEFAULT_MAX_FILE_BYTES) -> str:
     """
     Reads the full content of a Dockerfile or one of its variants.
+    Binary files are skipped and files over `max_bytes` are truncated (with a marker line).
     """
     try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            return f.read()
+        return read_text(file_path, max_bytes).display()
     except Exception as e:
         logger.error(f"Error reading Dockerfile {file_path}: {e}")
         return f"Error reading {file_path}: {e}"
+
+# Dockerfile, Dockerfile.dev, Dockerfile.prod, ...
+PARSER = ParserSpec("docker", read_dockerfile_content, PARSER_VERSION,
+                    enabled_by="show_docker_content",
+                    filenames=("dockerfile",), globs=("dockerfile.*",))
@@ -0,0 +1,146 @@
+# app/parser_services/file_reader.py
+# ---------------------------------------------------------------------
+# Author: Marvin Schubert
+# © 2025, Marvin Schubert. All rights reserved.
+#
+# Description:
+# Shared, bounded file reading for the parser services. Files are
+# sniffed for binary content, read only up to a byte cap (cut at a line
+# boundary, with a truncation marker) and decoded with a graceful
+# fallback instead of failing on bad encodings.
+# ---------------------------------------------------------------------
+
+import io
+import os
+import time
+import logging
+import tokenize
+from typing import Callable, Optional
+from . import instrumentation
+
+logger = logging.getLogger(__name__)
+
+# Default per-file cap in bytes (0 = no limit)
+DEFAULT_MAX_FILE_BYTES = 2_000_000
+
+# Bytes inspected to decide whether a file is binary
+BINARY_SNIFF_BYTES = 8192
+
+class FileText:
+    """
+    Result of read_text: the decoded (possibly truncated) text and what happened while reading.
+    """
+    __slots__ = ("text", "size", "bytes_read", "truncated", "binary", "rejected")
+
+    def __init__(self, text: str, size: int, bytes_read: int, truncated: bool, binary: bool,
+                 rejected: bool = False):
+        self.text = text
+        self.size = size
+        self.bytes_read = bytes_read
+        self.truncated = truncated
+        self.binary = binary
+        # The prefilter found nothing of interest, so the text was not decoded
+        self.rejected = rejected
+
+    @property
+    def marker(self) -> str:
+        """Line describing a skipped or truncated file ("" if read completely)."""
+        if self.binary:
+            return binary_marker(self.size)
+        if self.truncated:
+            return truncation_marker(self.bytes_read, self.size)
+        return ""
+
+    def display(self) -> str:
+        """The text as shown in the output, with the marker appended if any."""
+        if self.binary:
+            return self.marker
+        if self.truncated:
+            separator = "" if self.text.endswith("\n") or not self.text else "\n"
+            return f"{self.text}{separator}{self.marker}"
+        return self.text
+
+def binary_marker(size: int) -> str:
+    return f"[Binary file skipped: {size:,} bytes]"
+
+def truncation_marker(shown: int, size: int) -> str:
+    return f"[... truncated: {shown:,} of {size:,} bytes shown]"
+
+def is_binary(head: bytes) -> bool:
+    """
+    Same heuristic as git: a NUL byte in the first block means binary.
+    """
+    return b"\0" in head
+
+def read_text(file_path: str, max_bytes: int = DEFAULT_MAX_FILE_BYTES,
+              python_source: bool = False,
+              prefilter: Optional[Callable[[bytes], bool]] = None) -> FileText:
+    """
+    Reads a text file, at most `max_bytes` of it (0 = no limit).
+    Truncated text ends at the last complete line within the cap. Line endings
+    are normalized to "\n" like files opened in text mode. OSErrors propagate.
+
+    :param python_source: Decode with the encoding declared in the file (PEP 263)
+                          instead of UTF-8.
+    :param prefilter: Optional check on the raw bytes; if it returns False the
+                      text is not decoded and the result is marked as rejected.
+    """
+    start = time.perf_counter()
+    try:
+        result = _read_text(file_path, max_bytes, python_source, prefilter)
+    finally:
+        instrumentation.record("read", time.perf_counter() - start)
+    instrumentation.record("bytes_read", result.bytes_read)
+    return result
+
+def _read_text(file_path: str, max_bytes: int, python_source: bool,
+               prefilter: Optional[Callable[[bytes], bool]]) -> FileText:
+    with open(file_path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        head = f.read(BINARY_SNIFF_BYTES)
+        if is_binary(head):
+            return FileText("", size, len(head), truncated=False, binary=True)
+        if max_bytes > 0:
+            # One byte more than allowed tells whether the file goes on
+            data = head + f.read(max(max_bytes + 1 - len(head), 0))
+        else:
+            data = head + f.read()
+
+    truncated = max_bytes > 0 and len(data) > max_bytes
+    if truncated:
+        data = data[:max_bytes]
+        cut = data.rfind(b"\n")
+        if cut >= 0:
+            data = data[:cut + 1]
+        size = max(size, max_bytes + 1)
+
+    if prefilter is not None and not prefilter(data):
+        return FileText("", size, len(data), truncated, binary=False, rejected=True)
+
+    encoding = _python_encoding(head) if python_source else "utf-8"
+    text = decode(data, encoding, file_path)
+    return FileText(_normalize_newlines(text), size, len(data), truncated, binary=False)
+
+def decode(data: bytes, encoding: str, file_path: str = "") -> str:
+    """
+    Decodes strictly with `encoding`; undecodable bytes fall back to UTF-8
+    with replacement characters instead of failing the whole file.
+    """
+    try:
+        return data.decode(encoding)
+    except (UnicodeDecodeError, LookupError) as e:
+        logger.debug(f"Decoding {file_path} as {encoding} failed ({e}), replacing invalid bytes.")
+        return data.decode("utf-8", errors="replace")
+
+def _python_encoding(head: bytes) -> str:
+    """Encoding declared by a coding cookie or BOM, UTF-8 otherwise."""
+    try:
+        encoding, _ = tokenize.detect_encoding(io.BytesIO(head).readline)
+        return encoding
+    except SyntaxError:
+        return "utf-8"
+
+def _normalize_newlines(text: str) -> str:
+    if "\r" not in text:
+        return text
+    return text.replace("\r\n", "\n").replace("\r", "\n")
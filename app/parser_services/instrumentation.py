@@ -0,0 +1,30 @@
+# app/parser_services/instrumentation.py
+# ---------------------------------------------------------------------
+# Author: Marvin Schubert
+# © 2025, Marvin Schubert. All rights reserved.
+#
+# Description:
+# Cheap per-thread accumulators for timings and counters inside the
+# parser services (file reads, AST parsing, bytes read). Parsers record
+# into the current thread; the content extractor takes the totals after
+# each file, also inside worker processes, and sends them back with
+# the result.
+# ---------------------------------------------------------------------
+
+import threading
+from typing import Dict
+
+_local = threading.local()
+
+def record(name: str, amount: float):
+    """Adds `amount` (seconds or a count) to the current thread's total for `name`."""
+    totals = getattr(_local, "totals", None)
+    if totals is None:
+        totals = _local.totals = {}
+    totals[name] = totals.get(name, 0) + amount
+
+def take() -> Dict[str, float]:
+    """Returns the current thread's totals and starts new ones."""
+    totals = getattr(_local, "totals", None)
+    _local.totals = {}
+    return totals or {}
@@ -0,0 +1,50 @@
+# app/parser_services/parser_spec.py
+# ---------------------------------------------------------------------
+# Author: Marvin Schubert
+# © 2025, Marvin Schubert. All rights reserved.
+#
+# Description:
+# Declaration of a parser service: which files it handles, the setting
+# that enables it, its cost class and its cache version. Every parser
+# module defines one as PARSER; see registry.py.
+# ---------------------------------------------------------------------
+
+from typing import Callable, Iterable, Optional
+
+class ParserSpec:
+    """
+    Declaration of one parser service. File names are matched lower-cased.
+    """
+    __slots__ = ("kind", "parse", "version", "cpu_bound", "enabled_by",
+                 "filenames", "suffixes", "globs")
+
+    def __init__(self, kind: str, parse: Callable[[str, int], str], version: int,
+                 cpu_bound: bool = False, enabled_by: Optional[str] = None,
+                 filenames: Iterable[str] = (), suffixes: Iterable[str] = (),
+                 globs: Iterable[str] = ()):
+        """
+        :param kind: Name of the parser, used in jobs and cache keys.
+        :param parse: Called as parse(file_path, max_bytes), returns the content block.
+        :param version: Bumped whenever the output changes (invalidates cached results).
+        :param cpu_bound: True for parsers worth running in separate processes;
+                          False for plain reads, which run in threads.
+        :param enabled_by: Name of the boolean Settings attribute that enables the
+                           parser (None = always enabled).
+        :param filenames: Exact file names, e.g. "dockerfile".
+        :param suffixes: Name endings starting with a dot, e.g. ".py" or ".tar.gz".
+        :param globs: fnmatch-style patterns for anything else, e.g. "dockerfile.*".
+        """
+        self.kind = kind
+        self.parse = parse
+        self.version = version
+        self.cpu_bound = cpu_bound
+        self.enabled_by = enabled_by
+        self.filenames = tuple(name.lower() for name in filenames)
+        self.suffixes = tuple(suffix.lower() for suffix in suffixes)
+        self.globs = tuple(pattern.lower() for pattern in globs)
+        for suffix in self.suffixes:
+            if not suffix.startswith("."):
+                raise ValueError(f"Suffix of parser {kind} must start with a dot: {suffix}")
+
+    def is_enabled(self, settings) -> bool:
+        return self.enabled_by is None or bool(getattr(settings, self.enabled_by))
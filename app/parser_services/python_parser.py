@@ -4,33 +4,203 @@
 # © 2025, Marvin Schubert. All rights reserved.
 #
 # Description:
-# Extract classes from Python files using the ast library.
+# Extracts structure from Python files using the ast library. A cheap
+# byte-level pre-filter skips files that cannot contain anything the
+# selected extractors look for; the others are parsed once and all
+# selected extractors (classes, functions, docstrings, imports) run
+# on the same tree.
 # ---------------------------------------------------------------------
 
 import ast
+import re
+import time
 import logging
+from typing import Callable, Dict, List, Sequence, Tuple
+from .file_reader import read_text, DEFAULT_MAX_FILE_BYTES
+from .parser_spec import ParserSpec
+from . import instrumentation
 
 logger = logging.getLogger(__name__)
 
-def extract_python_classes(file_path: str) -> str:
+# Bump when the output format changes, so cached results are re-parsed
+PARSER_VERSION = 3
+
+# Start of a top-level statement (not indented, not a comment or closing bracket)
+_TOP_LEVEL_LINE = re.compile(r"^[^\s#)\]}]", re.MULTILINE)
+
+# How many trailing statements may be dropped to parse a truncated file
+_MAX_TRUNCATION_RETRIES = 8
+
+# Extractor names, in the order their output appears
+IMPORTS = "imports"
+DOCSTRINGS = "docstrings"
+CLASSES = "classes"
+FUNCTIONS = "functions"
+EXTRACTORS = (IMPORTS, DOCSTRINGS, CLASSES, FUNCTIONS)
+DEFAULT_EXTRACTORS = (CLASSES,)
+
+# Byte patterns a file must contain for an extractor to find anything. All of
+# them look for a keyword at the start of a line (only top-level statements
+# are extracted), so a file without any match is not parsed at all.
+_LINE_START = rb"(?<![^\r\n])"
+_PREFILTERS = {
+    IMPORTS: _LINE_START + rb"(?:import|from)\b",
+    # Module docstring (a string before any other statement) or class/function docstrings
+    DOCSTRINGS: rb"\A(?:\xef\xbb\xbf)?(?:[ \t]*(?:#[^\r\n]*)?\r?\n)*[ \t]*[rRuU]?['\"]|"
+                + _LINE_START + rb"(?:class|def|async[ \t]+def)\b",
+    CLASSES: _LINE_START + rb"class\b",
+    # Top-level functions and methods of top-level classes
+    FUNCTIONS: _LINE_START + rb"(?:class|def|async[ \t]+def)\b",
+}
+
+_compiled_prefilters: Dict[Tuple[str, ...], Callable[[bytes], bool]] = {}
+
+def normalize_extractors(extractors: Sequence[str]) -> Tuple[str, ...]:
+    """
+    Validates extractor names and returns them in canonical order.
+    """
+    unknown = set(extractors) - set(EXTRACTORS)
+    if unknown:
+        raise ValueError(f"Unknown Python extractors: {', '.join(sorted(unknown))}")
+    return tuple(name for name in EXTRACTORS if name in extractors)
+
+def extract_python_classes(file_path: str, max_bytes: int = DEFAULT_MAX_FILE_BYTES) -> str:
     """
     Reads a Python file, parses the AST, and returns a string
     listing class definitions found in the file, including the lines of code.
     """
+    return extract_python(file_path, max_bytes, DEFAULT_EXTRACTORS)
+
+def extract_python(file_path: str, max_bytes: int = DEFAULT_MAX_FILE_BYTES,
+                   extractors: Sequence[str] = DEFAULT_EXTRACTORS) -> str:
+    """
+    Reads a Python file and returns the output of the selected extractors,
+    from a single parse. Files without any candidate keyword are not parsed.
+    Binary files are skipped. Of files over `max_bytes` only the statements
+    that fit completely are used, followed by a marker line.
+    """
+    extractors = normalize_extractors(extractors)
     try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            source = f.read()
-        tree = ast.parse(source)
-        lines = []
+        file_text = read_text(file_path, max_bytes, python_source=True,
+                              prefilter=_prefilter(extractors))
+        if file_text.binary or file_text.rejected:
+            return file_text.marker
+        source = file_text.text
+        start = time.perf_counter()
+        try:
+            if file_text.truncated:
+                source, tree = _parse_complete_prefix(source)
+            else:
+                tree = ast.parse(source)
+        finally:
+            instrumentation.record("parse", time.perf_counter() - start)
         file_lines = source.splitlines()
-        for node in tree.body:
-            if isinstance(node, ast.ClassDef):
-                lines.append(f"Class: {node.name}")
-                start = node.lineno - 1
-                end = node.end_lineno
-                class_body = "\n".join(file_lines[start:end])
-                lines.append(class_body)
+        lines = []
+        for name in extractors:
+            lines.extend(_EXTRACTOR_FUNCTIONS[name](tree, source, file_lines))
+        if file_text.truncated:
+            lines.append(file_text.marker)
         return "\n".join(lines)
     except Exception as e:
         logger.error(f"Error reading Python file {file_path}: {e}")
         return f"Error reading {file_path}: {e}"
+
+# AST parsing is CPU-bound, so .py files are worth sending to worker processes
+PARSER = ParserSpec("python", extract_python, PARSER_VERSION, cpu_bound=True,
+                    enabled_by="show_py_content", suffixes=(".py",))
+
+def _prefilter(extractors: Tuple[str, ...]) -> Callable[[bytes], bool]:
+    """
+    Returns a check on the raw bytes that is True if any extractor may find something.
+    """
+    check = _compiled_prefilters.get(extractors)
+    if check is None:
+        if extractors:
+            regex = re.compile(b"|".join(_PREFILTERS[name] for name in extractors))
+            check = lambda data: regex.search(data) is not None
+        else:
+            check = lambda data: False
+        _compiled_prefilters[extractors] = check
+    return check
+
+def _extract_classes(tree: ast.Module, source: str, file_lines: List[str]) -> List[str]:
+    lines = []
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef):
+            lines.append(f"Class: {node.name}")
+            start = node.lineno - 1
+            end = node.end_lineno
+            class_body = "\n".join(file_lines[start:end])
+            lines.append(class_body)
+    return lines
+
+def _extract_functions(tree: ast.Module, source: str, file_lines: List[str]) -> List[str]:
+    """Signatures of top-level functions and of the methods of top-level classes."""
+    lines = []
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            lines.append(f"Function: {_signature(node, file_lines)}")
+        elif isinstance(node, ast.ClassDef):
+            for child in node.body:
+                if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                    lines.append(f"Function: {_signature(child, file_lines, node.name)}")
+    return lines
+
+def _extract_docstrings(tree: ast.Module, source: str, file_lines: List[str]) -> List[str]:
+    """Docstrings of the module and of its top-level classes and functions."""
+    lines = []
+    docstring = ast.get_docstring(tree)
+    if docstring:
+        lines.append(f"Docstring (module):\n{docstring}")
+    for node in tree.body:
+        if isinstance(node, (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+            docstring = ast.get_docstring(node)
+            if docstring:
+                lines.append(f"Docstring ({node.name}):\n{docstring}")
+    return lines
+
+def _extract_imports(tree: ast.Module, source: str, file_lines: List[str]) -> List[str]:
+    """Top-level import statements, as written."""
+    lines = []
+    for node in tree.body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            statement = "\n".join(file_lines[node.lineno - 1:node.end_lineno]).strip()
+            lines.append(f"Import: {statement}")
+    return lines
+
+_EXTRACTOR_FUNCTIONS = {
+    IMPORTS: _extract_imports,
+    DOCSTRINGS: _extract_docstrings,
+    CLASSES: _extract_classes,
+    FUNCTIONS: _extract_functions,
+}
+
+def _signature(node, file_lines: List[str], owner: str = "") -> str:
+    """
+    "def name(args) -> returns" of a function, prefixed with its class for methods.
+    """
+    prefix = "async def" if isinstance(node, ast.AsyncFunctionDef) else "def"
+    name = f"{owner}.{node.name}" if owner else node.name
+    if not hasattr(ast, "unparse"):
+        # Python 3.8: fall back to the source line of the definition
+        return file_lines[node.lineno - 1].strip().rstrip(":")
+    signature = f"{prefix} {name}({ast.unparse(node.args)})"
+    if node.returns is not None:
+        signature += f" -> {ast.unparse(node.returns)}"
+    return signature
+
+def _parse_complete_prefix(source: str):
+    """
+    Parses a truncated source. The last top-level statement may be cut off,
+    so trailing statements are dropped until the rest parses.
+    Returns the parsed source and its AST.
+    """
+    for _ in range(_MAX_TRUNCATION_RETRIES):
+        try:
+            return source, ast.parse(source)
+        except SyntaxError:
+            starts = [m.start() for m in _TOP_LEVEL_LINE.finditer(source)]
+            if len(starts) < 2:
+                break
+            source = source[:starts[-1]]
+    return source, ast.parse(source)
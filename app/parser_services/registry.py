@@ -0,0 +1,110 @@
+# app/parser_services/registry.py
+# ---------------------------------------------------------------------
+# Author: Marvin Schubert
+# © 2025, Marvin Schubert. All rights reserved.
+#
+# Description:
+# Registry of the parser services. Each parser module declares a
+# ParserSpec (see parser_spec.py); a ParserTable turns the enabled
+# parsers into lookup tables, so finding the parsers of a file costs a
+# few dict lookups instead of one check per parser.
+# ---------------------------------------------------------------------
+
+import re
+import fnmatch
+import logging
+from typing import Dict, Iterable, List, Tuple
+from .parser_spec import ParserSpec
+from . import python_parser, docker_parser, toml_parser
+
+logger = logging.getLogger(__name__)
+
+# Registered parsers by kind, in registration order (= order of their blocks per file)
+_REGISTRY: Dict[str, ParserSpec] = {}
+
+def register(spec: ParserSpec) -> ParserSpec:
+    """
+    Adds a parser to the registry. Raises ValueError if the kind is taken.
+    """
+    if spec.kind in _REGISTRY:
+        raise ValueError(f"Parser already registered: {spec.kind}")
+    _REGISTRY[spec.kind] = spec
+    return spec
+
+def get_parser(kind: str) -> ParserSpec:
+    return _REGISTRY[kind]
+
+def registered_parsers() -> List[ParserSpec]:
+    return list(_REGISTRY.values())
+
+def enabled_parsers(settings) -> List[ParserSpec]:
+    return [spec for spec in _REGISTRY.values() if spec.is_enabled(settings)]
+
+class ParserTable:
+    """
+    Lookup tables for a set of parsers. Exact names and suffixes go into
+    dicts; globs of the form "*.ext" and "name.*" are turned into suffix and
+    prefix entries, so only the dots of a name have to be looked at. Other
+    globs are combined into one regular expression.
+    """
+
+    def __init__(self, specs: Iterable[ParserSpec]):
+        self.specs = list(specs)
+        self._order = {spec.kind: i for i, spec in enumerate(self.specs)}
+        self._names: Dict[str, List[str]] = {}
+        self._suffixes: Dict[str, List[str]] = {}
+        self._prefixes: Dict[str, List[str]] = {}
+        other_globs: List[Tuple[str, str]] = []
+        for spec in self.specs:
+            for name in spec.filenames:
+                self._add(self._names, name, spec.kind)
+            for suffix in spec.suffixes:
+                self._add(self._suffixes, suffix, spec.kind)
+            for pattern in spec.globs:
+                if pattern.startswith("*.") and not _has_wildcard(pattern[1:]):
+                    self._add(self._suffixes, pattern[1:], spec.kind)
+                elif pattern.endswith(".*") and not _has_wildcard(pattern[:-1]):
+                    self._add(self._prefixes, pattern[:-1], spec.kind)
+                else:
+                    other_globs.append((pattern, spec.kind))
+
+        # Remaining globs; the combined expression rejects most names in one match
+        self._globs = [(re.compile(fnmatch.translate(pattern)), kind) for pattern, kind in other_globs]
+        self._any_glob = None
+        if other_globs:
+            self._any_glob = re.compile("|".join(fnmatch.translate(pattern) for pattern, _ in other_globs))
+
+    @staticmethod
+    def _add(table: Dict[str, List[str]], key: str, kind: str):
+        kinds = table.setdefault(key, [])
+        if kind not in kinds:
+            kinds.append(kind)
+
+    def kinds_for(self, lower_name: str) -> Tuple[str, ...]:
+        """
+        Kinds of the parsers that handle a file, given its lower-cased name,
+        in registration order.
+        """
+        kinds = self._names.get(lower_name)
+        found = list(kinds) if kinds else []
+        dot = lower_name.find(".")
+        while dot >= 0:
+            kinds = self._suffixes.get(lower_name[dot:])
+            if kinds:
+                found.extend(kinds)
+            kinds = self._prefixes.get(lower_name[:dot + 1])
+            if kinds:
+                found.extend(kinds)
+            dot = lower_name.find(".", dot + 1)
+        if self._any_glob is not None and self._any_glob.match(lower_name):
+            found.extend(kind for regex, kind in self._globs if regex.match(lower_name))
+        if len(found) > 1:
+            found = sorted(set(found), key=self._order.__getitem__)
+        return tuple(found)
+
+def _has_wildcard(pattern: str) -> bool:
+    return any(c in pattern for c in "*?[")
+
+# Built-in parsers; their order is the order of the blocks of a file matched by several
+for _module in (python_parser, docker_parser, toml_parser):
+    register(_module.PARSER)
@@ -8,16 +8,24 @@
 # ---------------------------------------------------------------------
 
 import logging
+from .file_reader import read_text, DEFAULT_MAX_FILE_BYTES
+from .parser_spec import ParserSpec
 
 logger = logging.getLogger(__name__)
 
-def read_toml_content(file_path: str) -> str:
+# Bump when the output format changes, so cached results are re-parsed
+PARSER_VERSION = 2
+
+def read_toml_content(file_path: str, max_bytes: int = DEFAULT_MAX_FILE_BYTES) -> str:
     """
     Reads the full content of a .toml file.
+    Binary files are skipped and files over `max_bytes` are truncated (with a marker line).
     """
     try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            return f.read()
+        return read_text(file_path, max_bytes).display()
     except Exception as e:
         logger.error(f"Error reading .toml file {file_path}: {e}")
         return f"Error reading {file_path}: {e}"
+
+PARSER = ParserSpec("toml", read_toml_content, PARSER_VERSION,
+                    enabled_by="show_toml_content", suffixes=(".toml",))
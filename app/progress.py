@@ -0,0 +1,169 @@
+# app/progress.py
+# ---------------------------------------------------------------------
+# Author: Marvin Schubert
+# © 2025, Marvin Schubert. All rights reserved.
+#
+# Description:
+# Rate-limited progress reporting for scans. Per-entry updates are
+# coalesced so the UI receives a few snapshots per second instead of
+# one cross-thread signal per file. Batch scans combine the progress of
+# their roots into one snapshot.
+# ---------------------------------------------------------------------
+
+import time
+import threading
+from typing import Callable, List, Optional
+
+# Upper bound for progress callbacks per second
+DEFAULT_MAX_UPDATES_PER_SECOND = 10
+
+# Number of entries between two clock reads
+CHECK_EVERY_ENTRIES = 64
+
+class ScanProgress:
+    """
+    Snapshot of a running scan, as passed to progress callbacks.
+    """
+    __slots__ = ("processed", "estimated_total", "elapsed", "files_parsed",
+                 "bytes_parsed", "current_dir", "finished", "roots_done", "roots_total")
+
+    def __init__(self, processed: int, estimated_total: int, elapsed: float,
+                 files_parsed: int, bytes_parsed: int, current_dir: str, finished: bool,
+                 roots_done: int = 0, roots_total: int = 1):
+        self.processed = processed
+        self.estimated_total = estimated_total
+        self.elapsed = elapsed
+        self.files_parsed = files_parsed
+        self.bytes_parsed = bytes_parsed
+        self.current_dir = current_dir
+        self.finished = finished
+        # Finished and total scanned folders (more than one in a batch scan)
+        self.roots_done = roots_done
+        self.roots_total = roots_total
+
+    @property
+    def entries_per_second(self) -> float:
+        return self.processed / self.elapsed if self.elapsed > 0 else 0.0
+
+    def summary(self) -> str:
+        """
+        One-line, human-readable description (e.g. for a status label).
+        """
+        text = (f"{self.processed:,} / ~{self.estimated_total:,} entries, "
+                f"{self.entries_per_second:,.0f} entries/s, "
+                f"{self.files_parsed:,} files ({self.bytes_parsed / 1_000_000:,.1f} MB) parsed")
+        if self.roots_total > 1:
+            text = f"{self.roots_done} of {self.roots_total} folders - " + text
+        if not self.finished and self.current_dir:
+            text += f" - {self.current_dir}"
+        return text
+
+class ProgressReporter:
+    """
+    Counts scan progress and calls `callback` with a ScanProgress at most
+    `max_updates_per_second` times per second, plus once when the scan finishes.
+    """
+
+    def __init__(self, callback: Callable[[ScanProgress], None],
+                 estimate_total: Callable[[], int],
+                 max_updates_per_second: float = DEFAULT_MAX_UPDATES_PER_SECOND):
+        """
+        :param callback: Receives the progress snapshots.
+        :param estimate_total: Returns the current estimate of the total entry count.
+        :param max_updates_per_second: Time budget for callbacks.
+        """
+        self.callback = callback
+        self.estimate_total = estimate_total
+        self.interval = 1.0 / max_updates_per_second
+
+        self.processed = 0
+        self.files_parsed = 0
+        self.bytes_parsed = 0
+        self.current_dir = ""
+
+        self._start = time.monotonic()
+        # Report the first entry right away
+        self._last_report = self._start - self.interval
+        self._checked_at = -CHECK_EVERY_ENTRIES
+
+    def entry(self):
+        """Called for every processed file/directory entry."""
+        self.processed += 1
+        if self.processed - self._checked_at >= CHECK_EVERY_ENTRIES:
+            self._checked_at = self.processed
+            self._maybe_report()
+
+    def directory(self, path: str):
+        """Called when a directory is listed."""
+        self.current_dir = path
+
+    def parsed(self, size: int):
+        """Called for every file whose content was extracted."""
+        self.files_parsed += 1
+        self.bytes_parsed += size
+        self._maybe_report()
+
+    def finish(self):
+        """Sends the final snapshot, regardless of the time budget."""
+        self._report(finished=True)
+
+    def _maybe_report(self):
+        if time.monotonic() - self._last_report >= self.interval:
+            self._report(finished=False)
+
+    def _report(self, finished: bool):
+        now = time.monotonic()
+        self._last_report = now
+        total = max(self.estimate_total(), self.processed)
+        self.callback(ScanProgress(self.processed, total, now - self._start,
+                                   self.files_parsed, self.bytes_parsed,
+                                   self.current_dir, finished))
+
+class BatchProgressReporter:
+    """
+    Combines the progress of the roots of a batch scan, reported from several
+    threads, into one ScanProgress for `callback` (rate-limited like
+    ProgressReporter). Roots that have not reported yet are estimated with
+    the average total of those that have.
+    """
+
+    def __init__(self, callback: Callable[[ScanProgress], None], root_count: int,
+                 max_updates_per_second: float = DEFAULT_MAX_UPDATES_PER_SECOND):
+        self.callback = callback
+        self.interval = 1.0 / max_updates_per_second
+        self._latest: List[Optional[ScanProgress]] = [None] * root_count
+        self._lock = threading.Lock()
+        self._start = time.monotonic()
+        self._last_report = self._start - self.interval
+
+    def root_callback(self, index: int) -> Callable[[ScanProgress], None]:
+        """Progress callback for the scanner of root `index`."""
+        return lambda progress: self.update(index, progress)
+
+    def update(self, index: int, progress: ScanProgress):
+        with self._lock:
+            self._latest[index] = progress
+            now = time.monotonic()
+            if now - self._last_report < self.interval:
+                return
+            self._last_report = now
+            snapshot = self._combine(progress.current_dir, False)
+        self.callback(snapshot)
+
+    def finish(self):
+        """Sends the final snapshot, regardless of the time budget."""
+        with self._lock:
+            snapshot = self._combine("", True)
+        self.callback(snapshot)
+
+    def _combine(self, current_dir: str, finished: bool) -> ScanProgress:
+        reported = [progress for progress in self._latest if progress is not None]
+        processed = sum(progress.processed for progress in reported)
+        total = sum(progress.estimated_total for progress in reported)
+        if reported:
+            total += (len(self._latest) - len(reported)) * total // len(reported)
+        done = sum(1 for progress in reported if progress.finished)
+        return ScanProgress(processed, max(total, processed), time.monotonic() - self._start,
+                            sum(progress.files_parsed for progress in reported),
+                            sum(progress.bytes_parsed for progress in reported),
+                            current_dir, finished, done, len(self._latest))
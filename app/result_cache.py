@@ -0,0 +1,185 @@
+# app/result_cache.py
+# ---------------------------------------------------------------------
+# Author: Marvin Schubert
+# © 2025, Marvin Schubert. All rights reserved.
+#
+# Description:
+# In-memory LRU cache of finished scans for the GUI. Entries are keyed
+# by the folder and every setting that changes the scan result, the
+# cache is bounded by the estimated size of the stored results, and a
+# hit is only served while the mtimes the scan recorded (ScanStamps,
+# taken when each folder was listed and each file read) still match
+# the file system.
+# ---------------------------------------------------------------------
+
+import os
+import logging
+from collections import OrderedDict
+from typing import Optional
+from .config import Settings
+from .tree_model import ScanSnapshot, FLAG_DIR, MISSING_STAMP
+
+logger = logging.getLogger(__name__)
+
+# Settings that change what a scan returns. UI, worker-count and cache
+# location settings are left out, they do not change the result.
+SCAN_SETTINGS = (
+    "skip_git",
+    "skip_venv",
+    "skip_python_aux",
+    "show_py_content",
+    "show_docker_content",
+    "show_toml_content",
+    "use_gitignore",
+    "ignore_patterns",
+    "max_file_bytes",
+    "max_total_bytes",
+    "python_extractors",
+    "symlink_policy",
+    "dedup_contents",
+    "use_git_index",
+    "token_budget",
+    "budget_priority",
+    "pinned_paths",
+    "max_depth",
+)
+
+# Rough per-object overheads used by estimate_bytes (CPython, 64-bit)
+_NODE_OVERHEAD = 64      # str object header plus the array/list slots of a node
+_BLOCK_OVERHEAD = 80     # str object header and list slot of a content block
+
+def cache_key(folder_path: str, settings: Settings) -> tuple:
+    """
+    Key of a scan: the normalized folder and the values of all SCAN_SETTINGS.
+    """
+    values = []
+    for name in SCAN_SETTINGS:
+        value = getattr(settings, name)
+        values.append(tuple(value) if isinstance(value, list) else value)
+    return (os.path.normcase(os.path.abspath(folder_path)),) + tuple(values)
+
+def estimate_bytes(snapshot: ScanSnapshot) -> int:
+    """Approximate memory held by a snapshot (names, node arrays, content blocks)."""
+    tree = snapshot.tree
+    size = sum(map(len, tree.names)) + _NODE_OVERHEAD * len(tree)
+    for blocks in snapshot.node_contents.values():
+        size += sum(map(len, blocks)) + _BLOCK_OVERHEAD * len(blocks)
+    if snapshot.stamps is not None:
+        stamps = snapshot.stamps
+        size += stamps.nodes.itemsize * len(stamps.nodes) + stamps.values.itemsize * len(stamps.values)
+    return size
+
+def is_current(snapshot: ScanSnapshot) -> bool:
+    """
+    True if every path the snapshot's stamps cover still has the recorded
+    (mtime_ns, size): no folder was added to, removed from or renamed in,
+    and no parsed file or ignore file was edited since it was scanned.
+    Stats one path per stamp, so for large trees call it off the GUI thread.
+    """
+    stamps = snapshot.stamps
+    if stamps is None:
+        return False
+    for path, stamp in stamps.files.items():
+        if _stamp(path, False) != stamp:
+            return False
+    tree = snapshot.tree
+    names = tree.names
+    depths = tree.depths
+    flags = tree.flags
+    values = stamps.values
+    # paths[d] is the path of the current ancestor at depth d
+    paths = [tree.root_path]
+    next_node = 0
+    for position, node in enumerate(stamps.nodes):
+        # Follow the tree up to the stamped node, keeping the ancestor paths
+        for index in range(next_node, node + 1):
+            if index:
+                depth = depths[index]
+                del paths[depth:]
+                paths.append(os.path.join(paths[depth - 1], names[index]))
+        next_node = node + 1
+        if _stamp(paths[-1], bool(flags[node] & FLAG_DIR)) != (values[2 * position], values[2 * position + 1]):
+            return False
+    return True
+
+def _stamp(path: str, is_dir: bool) -> tuple:
+    """(mtime_ns, size) like the scanner records it: directories have size 0."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return MISSING_STAMP
+    return st.st_mtime_ns, 0 if is_dir else st.st_size
+
+class _Entry:
+    __slots__ = ("snapshot", "size")
+
+    def __init__(self, snapshot: ScanSnapshot, size: int):
+        self.snapshot = snapshot
+        self.size = size
+
+class ResultCache:
+    """
+    LRU cache of ScanSnapshots with a memory budget. Storing a result evicts
+    the least recently used ones until the estimated total fits max_bytes.
+    """
+
+    def __init__(self, max_bytes: int):
+        """
+        :param max_bytes: Budget for all cached results (0 = do not cache).
+        """
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._entries: "OrderedDict[tuple, _Entry]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, folder_path: str, settings: Settings, check: bool = True) -> Optional[ScanSnapshot]:
+        """
+        Returns the cached result for the folder and settings, or None if there
+        is none or the folder changed since it was scanned (the entry is dropped).
+
+        :param check: Compare the stamps with the file system (see is_current). The
+                      GUI passes False and lets the scan worker check the result.
+        """
+        key = cache_key(folder_path, settings)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if check and not is_current(entry.snapshot):
+            logger.info(f"Cached result of {folder_path} is outdated, dropping it.")
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry.snapshot
+
+    def put(self, folder_path: str, settings: Settings, snapshot: ScanSnapshot):
+        """
+        Stores a result (replacing an older one for the same key) and evicts
+        least recently used results beyond the budget. Results larger than the
+        whole budget, or without stamps to check them by, are not stored.
+        """
+        key = cache_key(folder_path, settings)
+        self._remove(key)
+        if snapshot.stamps is None:
+            logger.debug(f"Result of {folder_path} has no file stamps, not cached.")
+            return
+        size = estimate_bytes(snapshot)
+        if size > self.max_bytes:
+            logger.debug(f"Result of {folder_path} ({size:,} bytes) exceeds the cache budget, not cached.")
+            return
+        self._entries[key] = _Entry(snapshot, size)
+        self.total_bytes += size
+        while self.total_bytes > self.max_bytes:
+            evicted = next(iter(self._entries))
+            logger.debug(f"Evicting cached result {evicted[0]}.")
+            self._remove(evicted)
+
+    def clear(self):
+        self._entries.clear()
+        self.total_bytes = 0
+
+    def _remove(self, key: tuple):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.total_bytes -= entry.size
@@ -0,0 +1,208 @@
+# app/result_model.py
+# ---------------------------------------------------------------------
+# Author: Marvin Schubert
+# © 2025, Marvin Schubert. All rights reserved.
+#
+# Description:
+# Lazy item model over finished scans for the result tree view.
+# Rows only exist below expanded nodes and are added in batches via
+# canFetchMore/fetchMore; a file's content lines are split when it is
+# first expanded. The full output text is only built for copying
+# (see exporter.py).
+# A batch scan shows one top-level row per root.
+# ---------------------------------------------------------------------
+
+from array import array
+from typing import Dict, List, Sequence, Tuple
+from PySide6.QtCore import QAbstractItemModel, QModelIndex, Qt
+from PySide6.QtWidgets import QApplication, QStyle
+
+from .tree_model import ScanSnapshot, FLAG_DIR, FLAG_ACCESS_DENIED
+from .api import root_name
+from .exporter import render_document
+
+# Rows added per fetchMore call
+FETCH_BATCH_SIZE = 256
+
+# A node key combines the position of its root and its node index:
+# (root << NODE_BITS) | node
+NODE_BITS = 32
+_NODE_MASK = (1 << NODE_BITS) - 1
+
+class ResultTreeModel(QAbstractItemModel):
+    """
+    Shows ScanSnapshots as a tree: per snapshot the root folder, its entries
+    and, below each file with extracted content, the content lines.
+    The internal id of an index is `key << 1` for tree nodes and
+    `(key << 1) | 1` for the content lines of file `key` (row = line number),
+    where key is a node key (see NODE_BITS).
+    """
+
+    def __init__(self, snapshots: Sequence[ScanSnapshot], parent=None):
+        super().__init__(parent)
+        self.snapshots = list(snapshots)
+        # Child node indices per directory node key, computed when first needed
+        self._children: Dict[int, array] = {}
+        # Row of each node key within its parent (known once the parent's children are)
+        self._rows: Dict[int, int] = {root << NODE_BITS: root for root in range(len(self.snapshots))}
+        # Content lines per file node key, split when first needed
+        self._lines: Dict[int, List[str]] = {}
+        # Number of rows made visible per node key so far
+        self._fetched: Dict[int, int] = {}
+        style = QApplication.style()
+        self._dir_icon = style.standardIcon(QStyle.SP_DirIcon)
+        self._file_icon = style.standardIcon(QStyle.SP_FileIcon)
+
+    def to_text(self) -> str:
+        """
+        Renders the complete output text (root name, tree and file contents),
+        with one section per root if there are several. The GUI renders it
+        in a RenderWorker instead, off the GUI thread.
+        """
+        return render_document(self.snapshots)
+
+    # -- QAbstractItemModel ------------------------------------------------
+
+    def index(self, row: int, column: int = 0, parent: QModelIndex = QModelIndex()) -> QModelIndex:
+        if column != 0 or row < 0:
+            return QModelIndex()
+        if not parent.isValid():
+            return self.createIndex(row, 0, row << NODE_BITS << 1) if row < len(self.snapshots) else QModelIndex()
+        parent_id = parent.internalId()
+        key = parent_id >> 1
+        if parent_id & 1 or row >= self._fetched.get(key, 0):
+            return QModelIndex()
+        snapshot, node = self._split(key)
+        if snapshot.tree.flags[node] & FLAG_DIR:
+            child_key = (key & ~_NODE_MASK) | self._children[key][row]
+            return self.createIndex(row, 0, child_key << 1)
+        return self.createIndex(row, 0, (key << 1) | 1)
+
+    def parent(self, index: QModelIndex = None):
+        if index is None:
+            # QObject.parent()
+            return super().parent()
+        if not index.isValid():
+            return QModelIndex()
+        item_id = index.internalId()
+        key = item_id >> 1
+        if not item_id & 1:
+            snapshot, node = self._split(key)
+            if node == 0:
+                return QModelIndex()
+            key = (key & ~_NODE_MASK) | snapshot.tree.parents[node]
+        return self.createIndex(self._rows[key], 0, key << 1)
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        if not parent.isValid():
+            return len(self.snapshots)
+        parent_id = parent.internalId()
+        if parent_id & 1:
+            return 0
+        return self._fetched.get(parent_id >> 1, 0)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 1
+
+    def hasChildren(self, parent: QModelIndex = QModelIndex()) -> bool:
+        if not parent.isValid():
+            return bool(self.snapshots)
+        parent_id = parent.internalId()
+        if parent_id & 1:
+            return False
+        snapshot, node = self._split(parent_id >> 1)
+        tree = snapshot.tree
+        if tree.flags[node] & FLAG_DIR:
+            # Pre-order: a directory has children if the next node is deeper
+            return node + 1 < len(tree) and tree.depths[node + 1] > tree.depths[node]
+        return bool(snapshot.node_contents.get(node))
+
+    def canFetchMore(self, parent: QModelIndex) -> bool:
+        if not parent.isValid() or parent.internalId() & 1:
+            return False
+        key = parent.internalId() >> 1
+        return self._fetched.get(key, 0) < self._child_count(key)
+
+    def fetchMore(self, parent: QModelIndex):
+        if not parent.isValid() or parent.internalId() & 1:
+            return
+        key = parent.internalId() >> 1
+        start = self._fetched.get(key, 0)
+        count = min(FETCH_BATCH_SIZE, self._child_count(key) - start)
+        if count <= 0:
+            return
+        self.beginInsertRows(parent, start, start + count - 1)
+        self._fetched[key] = start + count
+        self.endInsertRows()
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        item_id = index.internalId()
+        key = item_id >> 1
+        if item_id & 1:
+            return self._lines[key][index.row()] if role == Qt.DisplayRole else None
+
+        snapshot, node = self._split(key)
+        tree = snapshot.tree
+        node_flags = tree.flags[node]
+        if role == Qt.DisplayRole:
+            name = root_name(tree.root_path) if node == 0 else tree.label(node)
+            if node_flags & FLAG_ACCESS_DENIED:
+                return f"{name} [Access Denied]"
+            return name
+        if role == Qt.DecorationRole:
+            return self._dir_icon if node_flags & FLAG_DIR else self._file_icon
+        if role == Qt.ToolTipRole:
+            return tree.path_of(node)
+        return None
+
+    # -- Lazy structure ----------------------------------------------------
+
+    def _split(self, key: int) -> Tuple[ScanSnapshot, int]:
+        """The snapshot and node index of a node key."""
+        return self.snapshots[key >> NODE_BITS], key & _NODE_MASK
+
+    def _child_count(self, key: int) -> int:
+        snapshot, node = self._split(key)
+        if snapshot.tree.flags[node] & FLAG_DIR:
+            return len(self._children_of(key))
+        return len(self._lines_of(key))
+
+    def _children_of(self, key: int) -> array:
+        """
+        Child node indices of a directory node: the nodes one level deeper
+        within its pre-order subtree.
+        """
+        children = self._children.get(key)
+        if children is None:
+            snapshot, node = self._split(key)
+            tree = snapshot.tree
+            depths = tree.depths
+            child_depth = depths[node] + 1
+            children = array("i")
+            rows = self._rows
+            root_key = key & ~_NODE_MASK
+            end = len(tree)
+            i = node + 1
+            while i < end and depths[i] >= child_depth:
+                if depths[i] == child_depth:
+                    rows[root_key | i] = len(children)
+                    children.append(i)
+                i += 1
+            self._children[key] = children
+        return children
+
+    def _lines_of(self, key: int) -> List[str]:
+        """
+        Content lines of a file node, without the "File:" header and the
+        separator line of each block.
+        """
+        lines = self._lines.get(key)
+        if lines is None:
+            snapshot, node = self._split(key)
+            lines = []
+            for block in snapshot.node_contents.get(node, ()):
+                lines.extend(block.split("\n")[1:-1])
+            self._lines[key] = lines
+        return lines
@@ -0,0 +1,264 @@
+# app/scan_diff.py
+# ---------------------------------------------------------------------
+# Author: Marvin Schubert
+# © 2025, Marvin Schubert. All rights reserved.
+#
+# Description:
+# Diff scans. A ScanRecord is a compact file with every entry of a
+# scanned tree and, for each file with extracted content, its mtime,
+# size and a digest of that content. A later diff scan of the same
+# folder compares against it: files whose mtime and size still match
+# are neither read nor parsed, and the output only lists the added,
+# removed and modified entries and the content blocks that changed.
+# ---------------------------------------------------------------------
+
+import os
+import json
+import logging
+from typing import Callable, Dict, List, Optional, Tuple
+from .config import Settings
+from .file_scanner import FileScanner
+from .content_dedup import ContentDeduplicator, content_digest
+from .cancellation import CancellationToken
+from .progress import ScanProgress
+from .result_cache import SCAN_SETTINGS
+from .tree_model import ScanTree, FLAG_DIR
+
+logger = logging.getLogger(__name__)
+
+RECORD_FORMAT = 1
+
+# Line prefixes of the change list
+ADDED = "+ "
+REMOVED = "- "
+MODIFIED = "~ "
+NO_CHANGES = "No changes."
+
+# Record value of a file with extracted content: (mtime_ns, size, content digest
+# in hex, "" if the file has no content); other entries are recorded as None
+FileStamp = Tuple[int, int, str]
+
+class ScanRecordError(ValueError):
+    """The record file is unreadable or was taken of another folder or with other settings."""
+
+def relative_paths(tree: ScanTree) -> List[str]:
+    """
+    "/"-separated path of every node but the root, relative to the root,
+    in tree order. Directories end with "/".
+    """
+    names = tree.names
+    depths = tree.depths
+    flags = tree.flags
+    paths = []
+    # parents[d] is the path prefix of the current ancestor at depth d
+    parents = [""]
+    for index in range(1, len(tree)):
+        depth = depths[index]
+        del parents[depth:]
+        path = parents[depth - 1] + names[index]
+        if flags[index] & FLAG_DIR:
+            path += "/"
+            parents.append(path)
+        paths.append(path)
+    return paths
+
+def settings_values(settings: Settings) -> list:
+    """The values of all SCAN_SETTINGS, as stored in a record."""
+    # The JSON round trip turns tuples into lists, like loading a record does
+    return json.loads(json.dumps([getattr(settings, name) for name in SCAN_SETTINGS]))
+
+def _same_folder(a: str, b: str) -> bool:
+    return os.path.normcase(os.path.abspath(a)) == os.path.normcase(os.path.abspath(b))
+
+class ScanRecord:
+    """
+    Every entry of a scan, by relative path (see relative_paths), with the
+    FileStamp of each file with extracted content, in tree order.
+    """
+    __slots__ = ("root_folder", "settings", "entries")
+
+    def __init__(self, root_folder: str, settings: list, entries: Dict[str, Optional[FileStamp]]):
+        """
+        :param settings: settings_values() of the scan.
+        """
+        self.root_folder = root_folder
+        self.settings = settings
+        self.entries = entries
+
+    @classmethod
+    def from_scan(cls, scanner: FileScanner, previous: Optional["ScanRecord"] = None) -> "ScanRecord":
+        """
+        The record of the scanner's last scan. Files the scan did not parse
+        because they were unchanged take their digest from `previous`.
+        """
+        if scanner.settings.token_budget:
+            raise ValueError("scan records cannot be taken with a token budget")
+        tree = scanner.tree
+        stats = scanner.node_stats
+        contents = scanner.node_contents
+        old = previous.entries if previous is not None else {}
+        entries: Dict[str, Optional[FileStamp]] = {}
+        for index, path in enumerate(relative_paths(tree), 1):
+            file_stat = stats.get(index)
+            if file_stat is None:
+                entries[path] = None
+            elif index in contents:
+                blocks = contents[index]
+                digest = content_digest("\n".join(blocks)).hex() if blocks else ""
+                entries[path] = (file_stat[0], file_stat[1], digest)
+            else:
+                entries[path] = (file_stat[0], file_stat[1], old[path][2])
+        return cls(tree.root_path, settings_values(scanner.settings), entries)
+
+    def unchanged(self, path: str, file_stat: Tuple[int, int]) -> bool:
+        """True if the file has the recorded mtime and size."""
+        stamp = self.entries.get(path)
+        return stamp is not None and stamp[0] == file_stat[0] and stamp[1] == file_stat[1]
+
+    def check(self, root_folder: str, settings: Settings):
+        """Raises ScanRecordError unless the record is of this folder and these settings."""
+        if not _same_folder(self.root_folder, root_folder):
+            raise ScanRecordError(f"the snapshot was taken of {self.root_folder}, not {root_folder}")
+        if self.settings != settings_values(settings):
+            raise ScanRecordError("the snapshot was taken with other scan settings")
+
+    def save(self, file_path: str):
+        data = {"format": RECORD_FORMAT, "root_folder": self.root_folder,
+                "settings": self.settings, "entries": self.entries}
+        with open(file_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+
+    @classmethod
+    def load(cls, file_path: str) -> "ScanRecord":
+        try:
+            with open(file_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            raise ScanRecordError(f"cannot read snapshot {file_path}: {e}") from e
+        if not isinstance(data, dict) or data.get("format") != RECORD_FORMAT:
+            raise ScanRecordError(f"{file_path} is not a snapshot of this version")
+        entries = {path: tuple(stamp) if stamp is not None else None
+                   for path, stamp in data["entries"].items()}
+        return cls(data["root_folder"], data["settings"], entries)
+
+class ScanDiff:
+    """
+    Changes of a folder since a ScanRecord: the added, removed and modified
+    paths (an added or removed folder stands for everything in it) and the
+    content blocks of the added and modified files, all in tree order.
+    """
+    __slots__ = ("root_folder", "added", "removed", "modified", "blocks", "record", "dedup")
+
+    def __init__(self, root_folder: str, added: List[str], removed: List[str], modified: List[str],
+                 blocks: List[str], record: ScanRecord, dedup: bool = False):
+        """
+        :param record: Record of the new state, to diff the next scan against.
+        :param dedup: Render repeated contents once (see settings.dedup_contents).
+        """
+        self.root_folder = root_folder
+        self.added = added
+        self.removed = removed
+        self.modified = modified
+        self.blocks = blocks
+        self.record = record
+        self.dedup = dedup
+
+    def render(self) -> Tuple[str, str]:
+        """
+        Renders (changes_str, classes_str): one line per change, prefixed
+        with ADDED, REMOVED or MODIFIED, and the changed content blocks.
+        """
+        lines = ([ADDED + path for path in self.added] + [REMOVED + path for path in self.removed]
+                 + [MODIFIED + path for path in self.modified])
+        blocks = self.blocks
+        if self.dedup:
+            blocks = map(ContentDeduplicator().rewrite, blocks)
+        return "\n".join(lines) or NO_CHANGES, "\n".join(blocks)
+
+def diff_records(old: ScanRecord, new: ScanRecord) -> Tuple[List[str], List[str], List[str]]:
+    """
+    (added, removed, modified) paths between two records. Entries inside an
+    added or removed folder are not listed separately; a file is modified if
+    its extracted content changed.
+    """
+    old_entries = old.entries
+    new_entries = new.entries
+    added = _outermost(path for path in new_entries if path not in old_entries)
+    removed = _outermost(path for path in old_entries if path not in new_entries)
+    modified = []
+    for path, stamp in new_entries.items():
+        old_stamp = old_entries.get(path)
+        if stamp is not None and old_stamp is not None and stamp[2] != old_stamp[2]:
+            modified.append(path)
+    return added, removed, modified
+
+def _outermost(paths) -> List[str]:
+    """Drops the paths (in tree order) that lie inside a folder listed before them."""
+    result = []
+    folder = None
+    for path in paths:
+        if folder is not None and path.startswith(folder):
+            continue
+        folder = path if path.endswith("/") else None
+        result.append(path)
+    return result
+
+class DiffScanner:
+    """
+    Scans a folder and compares it with a ScanRecord of an earlier scan.
+    Files unchanged since the record are not read or parsed.
+    """
+
+    def __init__(self,
+                 settings: Settings,
+                 root_folder: str,
+                 record: ScanRecord,
+                 progress_callback: Callable[[ScanProgress], None] = None,
+                 cancel_token: Optional[CancellationToken] = None):
+        """
+        :param settings: Scan settings; they must match the record's and have no token budget
+                         (a diff needs the content of every changed file).
+        :param root_folder: The folder to scan, the one the record was taken of.
+        :param record: The earlier state to compare against.
+        """
+        if settings.token_budget:
+            raise ValueError("diff scans cannot be combined with a token budget")
+        record.check(root_folder, settings)
+        self.settings = settings
+        self.root_folder = root_folder
+        self.record = record
+        self.scanner = FileScanner(settings, root_folder, progress_callback=progress_callback,
+                                   cancel_token=cancel_token, unchanged=self._unchanged)
+        self._prefix_length = len(os.path.join(root_folder, ""))
+
+    @property
+    def metrics(self):
+        return self.scanner.metrics
+
+    def scan(self) -> ScanDiff:
+        """
+        Scans the folder and returns its changes since the record.
+        Raises ScanCancelled if the cancellation token is triggered meanwhile.
+        """
+        scanner = self.scanner
+        scanner.scan()
+        record = ScanRecord.from_scan(scanner, self.record)
+        added, removed, modified = diff_records(self.record, record)
+
+        changed = set(modified)
+        changed.update(path for path in record.entries if path not in self.record.entries)
+        contents = scanner.node_contents
+        blocks = []
+        for index, path in enumerate(relative_paths(scanner.tree), 1):
+            if path in changed and index in contents:
+                blocks.extend(contents[index])
+        logger.info(f"{len(added)} added, {len(removed)} removed and {len(modified)} modified entries "
+                    f"in {self.root_folder}.")
+        return ScanDiff(self.root_folder, added, removed, modified, blocks, record,
+                        self.settings.dedup_contents)
+
+    def _unchanged(self, full_path: str, file_stat: Tuple[int, int]) -> bool:
+        path = full_path[self._prefix_length:]
+        if os.sep != "/":
+            path = path.replace(os.sep, "/")
+        return self.record.unchanged(path, file_stat)
@@ -0,0 +1,158 @@
+# app/scan_metrics.py
+# ---------------------------------------------------------------------
+# Author: Marvin Schubert
+# © 2025, Marvin Schubert. All rights reserved.
+#
+# Description:
+# Per-phase instrumentation of a scan: wall time per phase (listing,
+# stat calls, ignore matching, parsing, output building, ...), counters
+# and the slowest files. Recording costs a few clock reads per
+# directory and per parsed file, so it is always on.
+# ---------------------------------------------------------------------
+
+import heapq
+import json
+import time
+from typing import Dict, List, Optional, Tuple
+
+# Phases in report order. Walk phases are wall time in the scanning thread;
+# "read" and "parse" are summed over all parser workers, so with several
+# workers they can exceed the wall time of "extract".
+PHASES = (
+    "list",     # os.scandir and sorting
+    "stat",     # is-directory checks and file stats
+    "ignore",   # .gitignore loading and matching
+    "walk",     # the whole directory walk (includes list, stat, ignore)
+    "cache",    # parse cache lookups and writes
+    "read",     # file reads and decoding in the parser services
+    "parse",    # ast.parse in the Python parser
+    "extract",  # the whole content extraction stage (includes cache, read, parse)
+    "output",   # building content blocks and streaming output
+    "render",   # rendering the final tree text
+)
+
+COUNTERS = (
+    "dirs", "entries", "candidate_files", "files_parsed", "bytes_read",
+    "parse_failures", "cache_hits", "cache_misses", "access_denied",
+    "duplicate_contents", "budget_omitted", "unchanged_files",
+)
+
+# Number of slowest files kept
+DEFAULT_SLOWEST_FILES = 10
+
+class FileTiming:
+    """
+    Time spent on one parsed file, split into the phases the parser recorded.
+    """
+    __slots__ = ("path", "kind", "seconds", "phases")
+
+    def __init__(self, path: str, kind: str, seconds: float, phases: Dict[str, float]):
+        self.path = path
+        self.kind = kind
+        self.seconds = seconds
+        self.phases = phases
+
+    def to_dict(self) -> dict:
+        return {"path": self.path, "kind": self.kind, "seconds": self.seconds,
+                "phases": {name: self.phases[name] for name in ("read", "parse") if name in self.phases}}
+
+class ScanMetrics:
+    """
+    Timers and counters of one scan (see PHASES and COUNTERS).
+    """
+
+    def __init__(self, slowest_files: int = DEFAULT_SLOWEST_FILES):
+        self.phases: Dict[str, float] = dict.fromkeys(PHASES, 0.0)
+        self.counters: Dict[str, int] = dict.fromkeys(COUNTERS, 0)
+        self.total_seconds = 0.0
+        self._keep = slowest_files
+        # Min-heap of (seconds, sequence number, FileTiming); the sequence breaks ties
+        self._slowest: List[Tuple[float, int, FileTiming]] = []
+        self._files_seen = 0
+        self._start = time.perf_counter()
+
+    def add_time(self, phase: str, seconds: float):
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def count(self, counter: str, amount: int = 1):
+        self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    def file_parsed(self, kind: str, path: str, seconds: float,
+                    phases: Optional[Dict[str, float]] = None, failed: bool = False):
+        """
+        Records a parsed file with its total time and the totals its parser
+        recorded (see parser_services.instrumentation).
+        """
+        phases = phases or {}
+        self.counters["files_parsed"] += 1
+        if failed:
+            self.counters["parse_failures"] += 1
+        self.counters["bytes_read"] += int(phases.get("bytes_read", 0))
+        for phase in ("read", "parse"):
+            if phase in phases:
+                self.phases[phase] += phases[phase]
+
+        self._keep_if_slow(seconds, path, kind, phases)
+
+    def merge(self, other: "ScanMetrics"):
+        """
+        Adds the phase times, counters and slowest files of another scan
+        (e.g. one root of a batch scan). The total time is not changed.
+        """
+        for phase, seconds in other.phases.items():
+            self.add_time(phase, seconds)
+        for counter, amount in other.counters.items():
+            self.count(counter, amount)
+        for timing in other.slowest_files:
+            self._keep_if_slow(timing.seconds, timing.path, timing.kind, timing.phases)
+
+    def _keep_if_slow(self, seconds: float, path: str, kind: str, phases: Dict[str, float]):
+        """Adds a file to the slowest files if it is slower than the fastest kept one."""
+        self._files_seen += 1
+        if len(self._slowest) < self._keep:
+            heapq.heappush(self._slowest, (seconds, self._files_seen, FileTiming(path, kind, seconds, phases)))
+        elif self._keep and seconds > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, (seconds, self._files_seen, FileTiming(path, kind, seconds, phases)))
+
+    def stop(self):
+        """Sets the total time to the time since the metrics were created."""
+        self.total_seconds = time.perf_counter() - self._start
+
+    @property
+    def slowest_files(self) -> List[FileTiming]:
+        """The slowest parsed files, slowest first."""
+        return [timing for _, _, timing in sorted(self._slowest, key=lambda item: -item[0])]
+
+    def to_dict(self) -> dict:
+        return {
+            "total_seconds": self.total_seconds,
+            "phases": dict(self.phases),
+            "counters": dict(self.counters),
+            "slowest_files": [timing.to_dict() for timing in self.slowest_files],
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), indent=2)
+
+    def summary(self) -> str:
+        """
+        Multi-line, human-readable report (e.g. for the stats panel).
+        """
+        c = self.counters
+        lines = [
+            f"Total: {self.total_seconds:.3f} s - {c['dirs']:,} folders, {c['entries']:,} entries, "
+            f"{c['files_parsed']:,} of {c['candidate_files']:,} candidate files parsed "
+            f"({c['bytes_read'] / 1_000_000:,.1f} MB read)",
+            f"Parse cache: {c['cache_hits']:,} hits, {c['cache_misses']:,} misses - "
+            f"parse failures: {c['parse_failures']:,} - access denied: {c['access_denied']:,}",
+            "Phases (s): " + ", ".join(f"{name} {seconds:.3f}" for name, seconds in self.phases.items()),
+        ]
+        slowest = self.slowest_files
+        if slowest:
+            lines.append("Slowest files:")
+            for timing in slowest:
+                parts = ", ".join(f"{name} {timing.phases[name]:.3f}"
+                                  for name in ("read", "parse") if name in timing.phases)
+                lines.append(f"  {timing.seconds:.3f} s  {timing.kind:<7} {timing.path}"
+                             + (f" ({parts})" if parts else ""))
+        return "\n".join(lines)
@@ -12,8 +12,10 @@ from PySide6.QtCore import Signal, Qt
 from PySide6 import QtWidgets
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QLabel, QHBoxLayout, QComboBox,
-    QGridLayout, QCheckBox, QPushButton
+    QGridLayout, QCheckBox, QPushButton, QSpinBox, QLineEdit
 )
+from .parser_services.python_parser import EXTRACTORS
+from .config import SYMLINK_POLICIES, BUDGET_PRIORITIES
 
 class SettingsWidget(QWidget):
     """
@@ -77,15 +79,145 @@ class SettingsWidget(QWidget):
         self.skip_python_aux_checkbox = QCheckBox("Skip .pyc etc.")  # <--- NEU
         self.skip_python_aux_checkbox.setChecked(self.settings.skip_python_aux)
 
+        self.watch_changes_checkbox = QCheckBox("Watch for changes")
+        self.watch_changes_checkbox.setChecked(self.settings.watch_changes)
+
+        self.stream_results_checkbox = QCheckBox("Stream output while scanning")
+        self.stream_results_checkbox.setChecked(self.settings.stream_results)
+
+        self.use_gitignore_checkbox = QCheckBox("Respect .gitignore")
+        self.use_gitignore_checkbox.setChecked(self.settings.use_gitignore)
+
+        self.dedup_contents_checkbox = QCheckBox("Show repeated contents once")
+        self.dedup_contents_checkbox.setChecked(self.settings.dedup_contents)
+
+        self.use_git_index_checkbox = QCheckBox("Only files tracked by git")
+        self.use_git_index_checkbox.setToolTip("Read the file list from .git/index instead of walking the folder")
+        self.use_git_index_checkbox.setChecked(self.settings.use_git_index)
+
         checkbox_layout.addWidget(self.show_py_content_checkbox, 0, 0)
         checkbox_layout.addWidget(self.skip_venv_checkbox, 0, 1)
         checkbox_layout.addWidget(self.show_docker_content_checkbox, 1, 0)
         checkbox_layout.addWidget(self.show_toml_content_checkbox, 1, 1)
         checkbox_layout.addWidget(self.skip_git_checkbox, 2, 0)
         checkbox_layout.addWidget(self.skip_python_aux_checkbox, 2, 1)
+        checkbox_layout.addWidget(self.watch_changes_checkbox, 3, 0)
+        checkbox_layout.addWidget(self.stream_results_checkbox, 3, 1)
+        checkbox_layout.addWidget(self.use_gitignore_checkbox, 4, 0)
+        checkbox_layout.addWidget(self.dedup_contents_checkbox, 4, 1)
+        checkbox_layout.addWidget(self.use_git_index_checkbox, 5, 0)
 
         main_layout.addLayout(checkbox_layout)
 
+        # What is extracted from .py files (all in a single parse)
+        extractors_layout = QHBoxLayout()
+        self.python_extractors_label = QLabel("Extract from .py:")
+        extractors_layout.addWidget(self.python_extractors_label)
+        self.python_extractor_checkboxes = {}
+        for name in EXTRACTORS:
+            checkbox = QCheckBox(name.capitalize())
+            checkbox.setChecked(name in self.settings.python_extractors)
+            checkbox.stateChanged.connect(self.on_python_extractors_toggled)
+            self.python_extractor_checkboxes[name] = checkbox
+            extractors_layout.addWidget(checkbox)
+        extractors_layout.addStretch()
+        main_layout.addLayout(extractors_layout)
+
+        # How symlinked folders are walked
+        symlink_layout = QHBoxLayout()
+        self.symlink_policy_label = QLabel("Symlinked folders:")
+        self.symlink_policy_combobox = QComboBox()
+        self.symlink_policy_combobox.addItems(list(SYMLINK_POLICIES))
+        self.symlink_policy_combobox.setCurrentText(self.settings.symlink_policy)
+        self.symlink_policy_combobox.setFixedWidth(100)
+        symlink_layout.addWidget(self.symlink_policy_label)
+        symlink_layout.addWidget(self.symlink_policy_combobox)
+        symlink_layout.addStretch()
+        main_layout.addLayout(symlink_layout)
+
+        # Parser worker count (0 = one per CPU core)
+        workers_layout = QHBoxLayout()
+        self.parser_workers_label = QLabel("Parser workers (0 = auto):")
+        self.parser_workers_spinbox = QSpinBox()
+        self.parser_workers_spinbox.setRange(0, 64)
+        self.parser_workers_spinbox.setValue(self.settings.parser_workers)
+        self.parser_workers_spinbox.setFixedWidth(100)
+        workers_layout.addWidget(self.parser_workers_label)
+        workers_layout.addWidget(self.parser_workers_spinbox)
+        workers_layout.addStretch()
+        main_layout.addLayout(workers_layout)
+
+        # Folder levels listed (0 = no limit) and shown as a preview first (0 = off)
+        depth_layout = QHBoxLayout()
+        self.max_depth_label = QLabel("Max. depth (0 = no limit):")
+        self.max_depth_spinbox = QSpinBox()
+        self.max_depth_spinbox.setRange(0, 1000)
+        self.max_depth_spinbox.setValue(self.settings.max_depth)
+        self.max_depth_spinbox.setFixedWidth(100)
+        self.preview_depth_label = QLabel("Preview levels (0 = off):")
+        self.preview_depth_spinbox = QSpinBox()
+        self.preview_depth_spinbox.setRange(0, 10)
+        self.preview_depth_spinbox.setValue(self.settings.preview_depth)
+        self.preview_depth_spinbox.setToolTip("Show the top levels of the tree right away, "
+                                              "then the full result")
+        self.preview_depth_spinbox.setFixedWidth(100)
+        depth_layout.addWidget(self.max_depth_label)
+        depth_layout.addWidget(self.max_depth_spinbox)
+        depth_layout.addWidget(self.preview_depth_label)
+        depth_layout.addWidget(self.preview_depth_spinbox)
+        depth_layout.addStretch()
+        main_layout.addLayout(depth_layout)
+
+        # Per-file read cap (0 = no limit)
+        max_file_layout = QHBoxLayout()
+        self.max_file_kb_label = QLabel("Max. file size in KB (0 = no limit):")
+        self.max_file_kb_spinbox = QSpinBox()
+        self.max_file_kb_spinbox.setRange(0, 1_000_000)
+        self.max_file_kb_spinbox.setValue(self.settings.max_file_bytes // 1000)
+        self.max_file_kb_spinbox.setFixedWidth(100)
+        max_file_layout.addWidget(self.max_file_kb_label)
+        max_file_layout.addWidget(self.max_file_kb_spinbox)
+        max_file_layout.addStretch()
+        main_layout.addLayout(max_file_layout)
+
+        # Extra ignore patterns (gitignore syntax, comma-separated)
+        ignore_layout = QHBoxLayout()
+        self.ignore_patterns_label = QLabel("Ignore patterns:")
+        self.ignore_patterns_edit = QLineEdit(", ".join(self.settings.ignore_patterns))
+        self.ignore_patterns_edit.setPlaceholderText("e.g. node_modules/, *.csv, /data/")
+        ignore_layout.addWidget(self.ignore_patterns_label)
+        ignore_layout.addWidget(self.ignore_patterns_edit)
+        main_layout.addLayout(ignore_layout)
+
+        # Token budget of the output (0 = no limit) and what is packed first
+        budget_layout = QHBoxLayout()
+        self.token_budget_label = QLabel("Token budget (0 = no limit):")
+        self.token_budget_spinbox = QSpinBox()
+        self.token_budget_spinbox.setRange(0, 10_000_000)
+        self.token_budget_spinbox.setSingleStep(1000)
+        self.token_budget_spinbox.setValue(self.settings.token_budget)
+        self.token_budget_spinbox.setFixedWidth(100)
+        self.budget_priority_combobox = QComboBox()
+        self.budget_priority_combobox.addItems(list(BUDGET_PRIORITIES))
+        self.budget_priority_combobox.setCurrentText(self.settings.budget_priority)
+        self.budget_priority_combobox.setToolTip("Which file contents come first: shallowest, "
+                                                 "smallest or most recently modified")
+        self.budget_priority_combobox.setFixedWidth(100)
+        budget_layout.addWidget(self.token_budget_label)
+        budget_layout.addWidget(self.token_budget_spinbox)
+        budget_layout.addWidget(self.budget_priority_combobox)
+        budget_layout.addStretch()
+        main_layout.addLayout(budget_layout)
+
+        # Paths whose contents are packed first (comma-separated)
+        pinned_layout = QHBoxLayout()
+        self.pinned_paths_label = QLabel("Pinned paths:")
+        self.pinned_paths_edit = QLineEdit(", ".join(self.settings.pinned_paths))
+        self.pinned_paths_edit.setPlaceholderText("e.g. app/main.py, app/core")
+        pinned_layout.addWidget(self.pinned_paths_label)
+        pinned_layout.addWidget(self.pinned_paths_edit)
+        main_layout.addLayout(pinned_layout)
+
         # Save button
         self.save_button = QPushButton("Save")
         self.save_button.setFixedWidth(100)
@@ -101,6 +233,20 @@ class SettingsWidget(QWidget):
         self.show_toml_content_checkbox.stateChanged.connect(self.on_show_toml_toggled)
         self.skip_git_checkbox.stateChanged.connect(self.on_skip_git_toggled)
         self.skip_python_aux_checkbox.stateChanged.connect(self.on_skip_python_aux_toggled)  # <--- NEU
+        self.watch_changes_checkbox.stateChanged.connect(self.on_watch_changes_toggled)
+        self.stream_results_checkbox.stateChanged.connect(self.on_stream_results_toggled)
+        self.parser_workers_spinbox.valueChanged.connect(self.on_parser_workers_changed)
+        self.use_gitignore_checkbox.stateChanged.connect(self.on_use_gitignore_toggled)
+        self.dedup_contents_checkbox.stateChanged.connect(self.on_dedup_contents_toggled)
+        self.use_git_index_checkbox.stateChanged.connect(self.on_use_git_index_toggled)
+        self.symlink_policy_combobox.currentTextChanged.connect(self.on_symlink_policy_changed)
+        self.max_file_kb_spinbox.valueChanged.connect(self.on_max_file_kb_changed)
+        self.max_depth_spinbox.valueChanged.connect(self.on_max_depth_changed)
+        self.preview_depth_spinbox.valueChanged.connect(self.on_preview_depth_changed)
+        self.ignore_patterns_edit.editingFinished.connect(self.on_ignore_patterns_edited)
+        self.token_budget_spinbox.valueChanged.connect(self.on_token_budget_changed)
+        self.budget_priority_combobox.currentTextChanged.connect(self.on_budget_priority_changed)
+        self.pinned_paths_edit.editingFinished.connect(self.on_pinned_paths_edited)
         self.save_button.clicked.connect(self.on_save_clicked)
 
         # Rahmen um das gesamte Widget (optional)
@@ -128,6 +274,59 @@ class SettingsWidget(QWidget):
     def on_skip_python_aux_toggled(self, state: int):  # <--- NEU
         self.settings.skip_python_aux = bool(state)
 
+    def on_watch_changes_toggled(self, state: int):
+        self.settings.watch_changes = bool(state)
+
+    def on_stream_results_toggled(self, state: int):
+        self.settings.stream_results = bool(state)
+
+    def on_parser_workers_changed(self, value: int):
+        self.settings.parser_workers = value
+
+    def on_max_file_kb_changed(self, value: int):
+        self.settings.max_file_bytes = value * 1000
+
+    def on_max_depth_changed(self, value: int):
+        self.settings.max_depth = value
+
+    def on_preview_depth_changed(self, value: int):
+        self.settings.preview_depth = value
+
+    def on_use_gitignore_toggled(self, state: int):
+        self.settings.use_gitignore = bool(state)
+
+    def on_dedup_contents_toggled(self, state: int):
+        self.settings.dedup_contents = bool(state)
+
+    def on_use_git_index_toggled(self, state: int):
+        self.settings.use_git_index = bool(state)
+
+    def on_symlink_policy_changed(self, policy: str):
+        self.settings.symlink_policy = policy
+
+    def on_python_extractors_toggled(self, state: int):
+        self.settings.python_extractors = self._checked_extractors()
+
+    def _checked_extractors(self):
+        return [name for name, checkbox in self.python_extractor_checkboxes.items()
+                if checkbox.isChecked()]
+
+    def on_ignore_patterns_edited(self):
+        self.settings.ignore_patterns = self._parse_patterns(self.ignore_patterns_edit.text())
+
+    def on_token_budget_changed(self, value: int):
+        self.settings.token_budget = value
+
+    def on_budget_priority_changed(self, priority: str):
+        self.settings.budget_priority = priority
+
+    def on_pinned_paths_edited(self):
+        self.settings.pinned_paths = self._parse_patterns(self.pinned_paths_edit.text())
+
+    @staticmethod
+    def _parse_patterns(text: str):
+        return [pattern.strip() for pattern in text.split(",") if pattern.strip()]
+
     def on_save_clicked(self):
         # Placeholder for saving settings to a file, DB, etc.
         print("Settings saved (placeholder).")
@@ -135,3 +334,18 @@ class SettingsWidget(QWidget):
         self.settings.skip_venv = self.skip_venv_checkbox.isChecked()
         self.settings.show_py_content = self.show_py_content_checkbox.isChecked()
         self.settings.skip_python_aux = self.skip_python_aux_checkbox.isChecked()  # <--- NEU
+        self.settings.parser_workers = self.parser_workers_spinbox.value()
+        self.settings.max_file_bytes = self.max_file_kb_spinbox.value() * 1000
+        self.settings.max_depth = self.max_depth_spinbox.value()
+        self.settings.preview_depth = self.preview_depth_spinbox.value()
+        self.settings.watch_changes = self.watch_changes_checkbox.isChecked()
+        self.settings.stream_results = self.stream_results_checkbox.isChecked()
+        self.settings.use_gitignore = self.use_gitignore_checkbox.isChecked()
+        self.settings.dedup_contents = self.dedup_contents_checkbox.isChecked()
+        self.settings.use_git_index = self.use_git_index_checkbox.isChecked()
+        self.settings.symlink_policy = self.symlink_policy_combobox.currentText()
+        self.settings.ignore_patterns = self._parse_patterns(self.ignore_patterns_edit.text())
+        self.settings.token_budget = self.token_budget_spinbox.value()
+        self.settings.budget_priority = self.budget_priority_combobox.currentText()
+        self.settings.pinned_paths = self._parse_patterns(self.pinned_paths_edit.text())
+        self.settings.python_extractors = self._checked_extractors()
@@ -0,0 +1,242 @@
+# app/tree_model.py
+# ---------------------------------------------------------------------
+# Author: Marvin Schubert
+# © 2025, Marvin Schubert. All rights reserved.
+#
+# Description:
+# Compact in-memory model of a scanned directory tree and the
+# renderer that turns it into the ASCII tree shown in the UI.
+# ---------------------------------------------------------------------
+
+import os
+from array import array
+from typing import Dict, List, Optional, Tuple
+from .content_dedup import ContentDeduplicator
+
+# Node flags (bit mask stored per node)
+FLAG_DIR = 1             # Entry is a directory
+FLAG_LAST = 2            # Entry is the last one in its parent's listing
+FLAG_VENV_SKIPPED = 4    # Directory is a venv and was not descended into
+FLAG_ACCESS_DENIED = 8   # Directory could not be listed
+FLAG_SYMLINK = 16        # Entry is a symbolic link (target in ScanTree.link_targets)
+FLAG_LINK_NOT_FOLLOWED = 32  # Symlinked directory that was not descended into (symlink policy)
+FLAG_ALREADY_LISTED = 64     # Directory whose physical folder is listed elsewhere in the tree
+FLAG_SUBMODULE = 128         # Git submodule, listed from the git index but not descended into
+FLAG_DEPTH_LIMIT = 256       # Directory below settings.max_depth (or a preview's depth), not listed
+
+# Directories that are in the tree but were not listed on purpose
+FLAGS_NOT_DESCENDED = (FLAG_VENV_SKIPPED | FLAG_LINK_NOT_FOLLOWED | FLAG_ALREADY_LISTED | FLAG_SUBMODULE
+                       | FLAG_DEPTH_LIMIT)
+# Entries whose label has more than the name (see ScanTree.label)
+_ANNOTATED = (FLAG_VENV_SKIPPED | FLAG_SYMLINK | FLAG_LINK_NOT_FOLLOWED | FLAG_ALREADY_LISTED
+              | FLAG_SUBMODULE | FLAG_DEPTH_LIMIT)
+
+class ScanTree:
+    """
+    Stores a directory tree as parallel arrays in pre-order (depth-first) order.
+    Node 0 is the scanned root itself; every other node has a name, a parent index,
+    a depth (root = 0) and a flag mask. Memory use is linear in the number of entries
+    and rendering is a single pass over the arrays. The few symlink nodes keep
+    their target in a separate dict.
+    """
+    __slots__ = ("root_path", "names", "parents", "depths", "flags", "link_targets")
+
+    def __init__(self, root_path: str):
+        self.root_path = root_path
+        self.names: List[str] = [""]
+        self.parents = array("i", [-1])
+        self.depths = array("i", [0])
+        self.flags = array("H", [FLAG_DIR])
+        self.link_targets: Dict[int, str] = {}
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def add(self, name: str, parent: int, flags: int = 0) -> int:
+        """
+        Appends a child node of `parent` and returns its index.
+        Nodes must be added in pre-order for render() to work.
+        """
+        self.names.append(name)
+        self.parents.append(parent)
+        self.depths.append(self.depths[parent] + 1)
+        self.flags.append(flags)
+        return len(self.names) - 1
+
+    def path_of(self, index: int) -> str:
+        """
+        Reconstructs the full path of a node by joining the names up to the root.
+        """
+        parts = []
+        while index > 0:
+            parts.append(self.names[index])
+            index = self.parents[index]
+        return os.path.join(self.root_path, *reversed(parts))
+
+    def label(self, index: int) -> str:
+        """
+        Name of a node as shown in the tree, with its link target and markers.
+        """
+        label = self.names[index]
+        node_flags = self.flags[index]
+        if node_flags & FLAG_SYMLINK:
+            label += f" -> {self.link_targets.get(index, '?')}"
+        if node_flags & FLAG_VENV_SKIPPED:
+            label += " [venv skipped]"
+        if node_flags & FLAG_LINK_NOT_FOLLOWED:
+            label += " [link not followed]"
+        if node_flags & FLAG_ALREADY_LISTED:
+            label += " [already listed]"
+        if node_flags & FLAG_SUBMODULE:
+            label += " [submodule]"
+        if node_flags & FLAG_DEPTH_LIMIT:
+            label += " [depth limit]"
+        return label
+
+    def render(self, prefix: str = "") -> str:
+        """
+        Renders the ASCII tree (without the root name) in one pass.
+        """
+        return "\n".join(TreeRenderer(self, prefix).render_new())
+
+# (mtime_ns, size) of a path; MISSING_STAMP if it could not be stat'ed
+Stamp = Tuple[int, int]
+MISSING_STAMP = (-1, -1)
+
+class ScanStamps:
+    """
+    (mtime_ns, size) of the paths a scan result was built from, taken while
+    scanning: each listed directory before it was listed (size 0) and each
+    candidate file before it was read, by node in ascending order, and files
+    outside the tree (.gitignore files, the git index) by path. A result is
+    outdated once any of them differs from the file system.
+    """
+    __slots__ = ("nodes", "values", "files")
+
+    def __init__(self, files: Optional[Dict[str, Optional[Stamp]]] = None):
+        """
+        :param files: Stamps of files outside the tree by path (None = MISSING_STAMP).
+        """
+        self.nodes = array("I")
+        self.values = array("q")
+        self.files: Dict[str, Stamp] = {path: stamp or MISSING_STAMP for path, stamp in (files or {}).items()}
+
+    @classmethod
+    def from_nodes(cls, stamps: Dict[int, Optional[Stamp]],
+                   files: Optional[Dict[str, Optional[Stamp]]] = None) -> "ScanStamps":
+        """Stamps of the given nodes and files; None stands for MISSING_STAMP."""
+        result = cls(files)
+        for node in sorted(stamps):
+            result.add(node, stamps[node])
+        return result
+
+    def add(self, node: int, stamp: Optional[Stamp]):
+        """Appends the stamp of a node; nodes must be added in ascending order."""
+        self.nodes.append(node)
+        self.values.extend(stamp or MISSING_STAMP)
+
+    def __len__(self) -> int:
+        return len(self.nodes) + len(self.files)
+
+class ScanSnapshot:
+    """
+    A finished scan: its ScanTree and the content blocks of each file node.
+    Nothing is rendered until render() is called (e.g. for copying), so the
+    UI can show large results without building the whole output text.
+    """
+    __slots__ = ("tree", "node_contents", "dedup", "note", "stamps")
+
+    def __init__(self, tree: ScanTree, node_contents: Optional[Dict[int, List[str]]] = None,
+                 dedup: bool = False, note: str = "", stamps: Optional[ScanStamps] = None):
+        """
+        :param dedup: Render repeated contents once (see settings.dedup_contents);
+                      node_contents always holds every file's full block.
+        :param note: Line rendered after the content blocks (e.g. what a token budget left out).
+        :param stamps: File system state the result was built from (None = unknown,
+                       e.g. for previews; such results are not cached).
+        """
+        self.tree = tree
+        self.node_contents = node_contents if node_contents is not None else {}
+        self.dedup = dedup
+        self.note = note
+        self.stamps = stamps
+
+    @property
+    def root_folder(self) -> str:
+        return self.tree.root_path
+
+    def render(self) -> Tuple[str, str]:
+        """
+        Renders (tree_str, classes_str) like FileScanner.build_tree.
+        Node indices follow tree order, so do the content blocks.
+        """
+        contents = self.node_contents
+        blocks = (block for node in sorted(contents) for block in contents[node])
+        if self.dedup:
+            blocks = map(ContentDeduplicator().rewrite, blocks)
+        classes_str = "\n".join(blocks)
+        if self.note:
+            classes_str = f"{classes_str}\n{self.note}" if classes_str else self.note
+        return self.tree.render(), classes_str
+
+class TreeRenderer:
+    """
+    Renders the nodes of a ScanTree to ASCII tree lines incrementally,
+    so lines can be streamed while the tree is still being filled.
+    A node may only be rendered once its flags are final.
+    """
+
+    def __init__(self, tree: ScanTree, prefix: str = ""):
+        self.tree = tree
+        # Index of the next node to render
+        self.next_index = 1
+        # prefixes[d] is the line prefix for children of the current node at depth d
+        self._prefixes = [prefix]
+        self._root_done = False
+
+    @property
+    def pending(self) -> int:
+        """Number of nodes added to the tree but not rendered yet."""
+        return len(self.tree) - self.next_index
+
+    def render_new(self, max_nodes: int = 0) -> List[str]:
+        """
+        Renders all nodes added since the last call and returns their lines.
+
+        :param max_nodes: Render at most this many nodes (0 = all); the rest
+                          follow with the next call.
+        """
+        tree = self.tree
+        names = tree.names
+        depths = tree.depths
+        flags = tree.flags
+        prefixes = self._prefixes
+        lines = []
+
+        if not self._root_done:
+            self._root_done = True
+            if flags[0] & FLAG_ACCESS_DENIED:
+                lines.append(f"[Access Denied]: {tree.root_path}\n")
+
+        end = len(names)
+        if max_nodes > 0:
+            end = min(end, self.next_index + max_nodes)
+        for index in range(self.next_index, end):
+            depth = depths[index]
+            del prefixes[depth:]
+            node_prefix = prefixes[depth - 1]
+            node_flags = flags[index]
+            is_last = node_flags & FLAG_LAST
+            connector = "└── " if is_last else "├── "
+
+            name = tree.label(index) if node_flags & _ANNOTATED else names[index]
+            lines.append(f"{node_prefix}{connector}{name}")
+            if node_flags & FLAG_VENV_SKIPPED:
+                continue
+            if node_flags & FLAG_DIR:
+                prefixes.append(f"{node_prefix}    " if is_last else f"{node_prefix}│   ")
+                if node_flags & FLAG_ACCESS_DENIED:
+                    lines.append(f"[Access Denied]: {tree.path_of(index)}\n")
+
+        self.next_index = end
+        return lines
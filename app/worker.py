@@ -4,13 +4,26 @@
 # © 2025, Marvin Schubert. All rights reserved.
 #
 # Description:
-# A QThread-based worker that handles directory scanning in the background.
+# QThread-based workers that handle directory scanning in the background:
+# ScanWorker for one folder, BatchScanWorker for a batch of folders.
+# IncrementalUpdateWorker patches a watched result after file changes.
+# RenderWorker renders finished results for copying or exporting.
 # ---------------------------------------------------------------------
 
+import copy
+import time
 import logging
-from typing import Optional
+from typing import Collection, List, Optional
 from PySide6.QtCore import QThread, Signal
 from .file_scanner import FileScanner
+from .batch_scanner import BatchScanner, RootResult, batch_roots
+from .incremental_scanner import IncrementalScanner
+from .cancellation import CancellationToken, ScanCancelled
+from .progress import ScanProgress
+from .scan_metrics import ScanMetrics
+from .tree_model import ScanSnapshot
+from .result_cache import is_current
+from .exporter import EXPORT_TEXT, export, render_document
 from .config import Settings
 
 logger = logging.getLogger(__name__)
@@ -20,18 +33,38 @@ class ScanWorker(QThread):
     Performs file scanning in a separate thread.
     Emits signals to update the UI with progress and results.
     """
-    progressUpdated = Signal(int)        # Emitted when a single file/directory is processed
-    scanningFinished = Signal(str, str)  # Emitted when scanning is complete, with the tree and file content
+    progressUpdated = Signal(object)     # Emitted a few times per second with a ScanProgress snapshot
+    scanningFinished = Signal(object)    # Emitted when scanning is complete, with a ScanSnapshot
+    outputChunk = Signal(str, str)       # Emitted while streaming, with the section (tree/contents) and a text chunk
+    previewReady = Signal(object)        # Emitted before the full scan with a ScanSnapshot of the top levels (settings.preview_depth)
+    scanningCancelled = Signal()         # Emitted instead of scanningFinished when the scan was cancelled
+    scanningFailed = Signal(str)         # Emitted instead of scanningFinished with the error if the scan failed
 
-    def __init__(self, folder_path: str, settings: Settings, parent=None):
+    def __init__(self, folder_path: str, settings: Settings,
+                 cached: Optional[ScanSnapshot] = None, parent=None):
+        """
+        :param cached: Earlier result of this folder and settings (from the result
+                       cache). It is emitted instead of scanning if it is still current.
+        """
         super().__init__(parent)
         self.folder_path = folder_path
-        self.settings = settings
-        self._stop_requested = False
+        self.cached = cached
+        # A copy, so changes in the settings panel do not reach the running scan
+        self.settings = copy.copy(settings)
+        # Polled by the scanner and the parser pool, see cancel()
+        self.cancel_token = CancellationToken()
+        # Whether results are sent via outputChunk while scanning; a preview
+        # (previewReady) takes the place of the streamed output
+        self.streaming = settings.stream_results and settings.preview_depth <= 0
 
-        # Results
-        self.tree_str: Optional[str] = None
-        self.classes_str: Optional[str] = None
+        # Result (the output text is only rendered on demand, see ScanSnapshot)
+        self.snapshot: Optional[ScanSnapshot] = None
+        # Timings and counters of the scan, set before scanningFinished is emitted
+        self.metrics: Optional[ScanMetrics] = None
+        # Per-directory state for incremental updates (if settings.watch_changes)
+        self.incremental: Optional[IncrementalScanner] = None
+        # Whether the result is the cached one (no scan was run)
+        self.from_cache = False
 
     def run(self):
         """
@@ -39,24 +72,218 @@ class ScanWorker(QThread):
         in the background.
         """
         logger.info("Background scanning thread started.")
-        scanner = FileScanner(self.settings, self.folder_path,
-                              progress_callback=self.on_progress_callback)
-        tree_str, classes_str = scanner.build_tree()
-        self.tree_str = tree_str
-        self.classes_str = classes_str
+        try:
+            self.snapshot = self._scan()
+        except ScanCancelled:
+            logger.info(f"Scan of {self.folder_path} was cancelled.")
+            self.scanningCancelled.emit()
+            return
+        except Exception as e:
+            logger.error(f"Scan of {self.folder_path} failed: {e}")
+            self.scanningFailed.emit(str(e))
+            return
 
         # Emit the final result
-        self.scanningFinished.emit(tree_str, classes_str)
+        self.scanningFinished.emit(self.snapshot)
         logger.info("Background scanning thread finished.")
 
-    def on_progress_callback(self, count: int):
+    def _scan(self) -> ScanSnapshot:
+        """
+        Returns the cached result if it is still current, else scans the folder
+        (setting metrics and, if watched, incremental).
+        """
+        if self.cached is not None:
+            # Checking the stamps stats every listed folder and parsed file
+            if is_current(self.cached):
+                logger.info("Cached result is current, no scan needed.")
+                self.from_cache = True
+                return self.cached
+            logger.info(f"Cached result of {self.folder_path} is outdated, scanning again.")
+        scanner = FileScanner(self.settings, self.folder_path,
+                              progress_callback=self.on_progress_callback,
+                              output_callback=self.on_output_callback if self.streaming else None,
+                              cancel_token=self.cancel_token)
+        if self.settings.preview_depth > 0:
+            self.previewReady.emit(ScanSnapshot(scanner.preview(self.settings.preview_depth)))
+        scanner.scan()
+        self.metrics = scanner.metrics
+
+        # A change could shift which contents fit a token budget, so budgeted
+        # results are not patched incrementally
+        if self.settings.watch_changes and not self.settings.token_budget:
+            self.incremental = IncrementalScanner(self.settings, self.folder_path)
+            self.incremental.adopt(scanner)
+        return scanner.snapshot()
+
+    def on_progress_callback(self, progress: ScanProgress):
         """Updates the progress in the UI thread by emitting a signal."""
-        self.progressUpdated.emit(count)
+        self.progressUpdated.emit(progress)
+
+    def on_output_callback(self, section: str, text: str):
+        """Streams a chunk of output to the UI thread."""
+        self.outputChunk.emit(section, text)
+
+    def cancel(self):
+        """
+        Asks the running scan to stop, without waiting for it. The scanner checks
+        the token between entries, so the thread ends shortly afterwards.
+        """
+        self.cancel_token.cancel()
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_token.cancelled
 
     def stop(self):
         """
-        If you want to gracefully stop the thread in a more advanced scenario.
+        Cancels the scan and blocks until the thread has finished.
         """
-        self._stop_requested = True
+        self.cancel()
         self.quit()
         self.wait()
+
+class BatchScanWorker(QThread):
+    """
+    Scans several folders as one batch (see BatchScanner) in a separate thread.
+    """
+    progressUpdated = Signal(object)     # Emitted a few times per second with a ScanProgress of the whole batch
+    scanningFinished = Signal(object)    # Emitted when all folders are scanned, with a list of RootResults
+    scanningCancelled = Signal()         # Emitted instead of scanningFinished when the batch was cancelled
+    scanningFailed = Signal(str)         # Emitted instead of scanningFinished with the error if the batch failed
+
+    def __init__(self, folder_path: str, roots: Optional[List[str]], settings: Settings, parent=None):
+        """
+        :param folder_path: Folder the roots were chosen from.
+        :param roots: Folders to scan; None scans the non-hidden subfolders of
+                      folder_path (see batch_roots), listed in the worker thread.
+        """
+        super().__init__(parent)
+        self.folder_path = folder_path
+        self.roots = roots
+        self.settings = copy.copy(settings)
+        self.cancel_token = CancellationToken()
+
+        # Results in the order of roots, and the combined timings and counters
+        self.results: Optional[List[RootResult]] = None
+        self.metrics: Optional[ScanMetrics] = None
+
+    def run(self):
+        try:
+            if self.roots is None:
+                self.roots = batch_roots(self.folder_path)
+            logger.info(f"Batch scan of {len(self.roots)} folders started.")
+            scanner = BatchScanner(self.settings, self.roots,
+                                   progress_callback=self.progressUpdated.emit,
+                                   cancel_token=self.cancel_token)
+            self.results = scanner.scan()
+        except ScanCancelled:
+            logger.info(f"Batch scan of {self.folder_path} was cancelled.")
+            self.scanningCancelled.emit()
+            return
+        except Exception as e:
+            logger.error(f"Batch scan of {self.folder_path} failed: {e}")
+            self.scanningFailed.emit(str(e))
+            return
+        self.metrics = scanner.metrics
+        self.scanningFinished.emit(self.results)
+        logger.info("Batch scan finished.")
+
+    def cancel(self):
+        """Asks the running batch to stop, without waiting for it."""
+        self.cancel_token.cancel()
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_token.cancelled
+
+    def stop(self):
+        """
+        Cancels the batch and blocks until the thread has finished.
+        """
+        self.cancel()
+        self.quit()
+        self.wait()
+
+class IncrementalUpdateWorker(QThread):
+    """
+    Applies a set of changed paths to an IncrementalScanner in a separate
+    thread; new folders are scanned and changed files parsed there.
+    """
+    updated = Signal(object)     # Emitted with a ScanSnapshot of the patched result
+    failed = Signal(str)         # Emitted with the error if neither the patch nor a full rescan worked
+
+    def __init__(self, incremental: IncrementalScanner, changed_paths: Collection[str], parent=None):
+        super().__init__(parent)
+        self.incremental = incremental
+        self.changed_paths = changed_paths
+
+    def run(self):
+        start = time.perf_counter()
+        try:
+            try:
+                self.incremental.update(self.changed_paths)
+            except ScanCancelled:
+                raise
+            except Exception as e:
+                # The stored result may be partly patched; start over from a full scan
+                logger.warning(f"Incremental update of {self.incremental.root_folder} failed ({e}), "
+                               f"scanning the whole folder again.")
+                self.incremental.full_scan()
+        except ScanCancelled:
+            logger.info(f"Incremental update of {self.incremental.root_folder} was cancelled.")
+            return
+        except Exception as e:
+            logger.error(f"Rescan of {self.incremental.root_folder} failed: {e}")
+            self.failed.emit(str(e))
+            return
+        snapshot = self.incremental.snapshot()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        logger.info(f"Incremental update of {len(self.changed_paths)} changed paths took {elapsed_ms:.1f} ms.")
+        self.updated.emit(snapshot)
+
+    def cancel(self):
+        """Asks the running update to stop, without waiting for it."""
+        self.incremental.cancel_token.cancel()
+
+    def stop(self):
+        """
+        Cancels the update and blocks until the thread has finished.
+        """
+        self.cancel()
+        self.quit()
+        self.wait()
+
+class RenderWorker(QThread):
+    """
+    Renders finished results off the GUI thread: into a string (for the
+    clipboard) or, given a file path, chunk by chunk straight into that file.
+    """
+    rendered = Signal(object)    # Emitted with the document (a str) if no file was given
+    exported = Signal(str)       # Emitted with the file path once the export is written
+    failed = Signal(str)         # Emitted with the error message if the file could not be written
+
+    def __init__(self, snapshots: List[ScanSnapshot], fmt: str = EXPORT_TEXT,
+                 file_path: str = "", compress: bool = False, parent=None):
+        """
+        :param snapshots: Results to render, one section each if there are several.
+        :param fmt: One of exporter.EXPORT_FORMATS.
+        :param file_path: File to export to ("" = render into a string).
+        :param compress: Write the file gzip-compressed.
+        """
+        super().__init__(parent)
+        self.snapshots = snapshots
+        self.fmt = fmt
+        self.file_path = file_path
+        self.compress = compress
+
+    def run(self):
+        if not self.file_path:
+            self.rendered.emit(render_document(self.snapshots, self.fmt))
+            return
+        try:
+            export(self.snapshots, self.file_path, self.fmt, self.compress)
+        except OSError as e:
+            logger.error(f"Export to {self.file_path} failed: {e}")
+            self.failed.emit(str(e))
+            return
+        self.exported.emit(self.file_path)
@@ -0,0 +1,66 @@
+# benchmarks/bench_parser_workers.py
+# ---------------------------------------------------------------------
+# Author: Marvin Schubert
+# © 2025, Marvin Schubert. All rights reserved.
+#
+# Description:
+# Measures how the content extraction stage scales with the number of
+# parser workers on a generated folder full of Python files.
+#
+# Usage:
+#   python benchmarks/bench_parser_workers.py [--files 400] [--classes 20] [--workers 1,2,4]
+# ---------------------------------------------------------------------
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app.config import Settings
+from app.file_scanner import FileScanner
+
+def make_python_files(root: str, files: int, classes: int):
+    """Writes `files` modules, each with `classes` small classes, into 10 packages."""
+    for i in range(files):
+        package = os.path.join(root, f"pkg{i % 10}")
+        os.makedirs(package, exist_ok=True)
+        body = "\n".join(
+            f"class C{j}:\n    def method(self, x):\n        return x * {j}\n"
+            for j in range(classes)
+        )
+        with open(os.path.join(package, f"mod{i}.py"), "w", encoding="utf-8") as f:
+            f.write(body)
+
+def time_scan(root: str, workers: int) -> float:
+    settings = Settings(show_py_content=True, parser_workers=workers)
+    start = time.perf_counter()
+    FileScanner(settings, root).build_tree()
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="Parser worker scaling benchmark")
+    parser.add_argument("--files", type=int, default=400)
+    parser.add_argument("--classes", type=int, default=20)
+    parser.add_argument("--workers", type=str, default="",
+                        help="Comma-separated worker counts (default: powers of two up to the core count)")
+    args = parser.parse_args()
+
+    cores = os.cpu_count() or 1
+    if args.workers:
+        counts = [int(w) for w in args.workers.split(",")]
+    else:
+        counts = sorted({1, 2, 4, 8, 16, cores} & set(range(1, cores + 1)))
+
+    with tempfile.TemporaryDirectory() as root:
+        make_python_files(root, args.files, args.classes)
+        baseline = None
+        print(f"{args.files} files x {args.classes} classes, {cores} cores")
+        print(f"{'workers':>8} {'seconds':>9} {'speedup':>8}")
+        for workers in counts:
+            seconds = time_scan(root, workers)
+            baseline = baseline or seconds
+            print(f"{workers:>8} {seconds:>9.3f} {baseline / seconds:>7.2f}x")
+
+if __name__ == "__main__":
+    main()
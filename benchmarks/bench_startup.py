@@ -0,0 +1,69 @@
+# benchmarks/bench_startup.py
+# ---------------------------------------------------------------------
+# Author: Marvin Schubert
+# © 2025, Marvin Schubert. All rights reserved.
+#
+# Description:
+# Compares the start-up cost of the headless CLI with the GUI launch.
+# Each variant runs in a fresh interpreter: the CLI scans a tiny folder
+# end to end, the GUI variant imports Qt and creates the main window
+# (offscreen) without entering the event loop.
+#
+# Usage:
+#   python benchmarks/bench_startup.py [--runs 5]
+# ---------------------------------------------------------------------
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+GUI_LAUNCH = (
+    "from PySide6.QtWidgets import QApplication\n"
+    "from app.main_window import MainWindow\n"
+    "from app.config import Settings\n"
+    "app = QApplication([])\n"
+    "MainWindow(Settings()).show()\n"
+    "app.processEvents()\n"
+)
+
+def time_command(command, runs: int, env=None) -> float:
+    """Median wall time of `runs` executions of a command, in seconds."""
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=PROJECT_ROOT, env=env, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+def main():
+    parser = argparse.ArgumentParser(description="CLI vs. GUI start-up benchmark")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    gui_env = dict(os.environ, QT_QPA_PLATFORM=os.environ.get("QT_QPA_PLATFORM", "offscreen"))
+
+    with tempfile.TemporaryDirectory() as root:
+        with open(os.path.join(root, "mod.py"), "w", encoding="utf-8") as f:
+            f.write("class Foo:\n    pass\n")
+
+        variants = [
+            ("interpreter only", [sys.executable, "-c", "pass"], None),
+            ("cli: --help", [sys.executable, "-m", "app", "--help"], None),
+            ("cli: scan tiny folder", [sys.executable, "-m", "app", root, "-j", "1", "--no-cache"], None),
+            ("gui: create main window", [sys.executable, "-c", GUI_LAUNCH], gui_env),
+        ]
+
+        print(f"median of {args.runs} runs")
+        print(f"{'variant':<26} {'seconds':>9}")
+        for name, command, env in variants:
+            print(f"{name:<26} {time_command(command, args.runs, env):>9.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+# benchmarks/bench_suite.py
+# ---------------------------------------------------------------------
+# Author: Marvin Schubert
+# © 2025, Marvin Schubert. All rights reserved.
+#
+# Description:
+# Benchmark suite for scanning and parsing at scale. Generates a
+# synthetic repository (see synthetic_repo.py) and times
+# count_entries, build_tree (tree only and with contents), every
+# registered parser and an end-to-end ScanWorker run. Each case runs
+# in a fresh interpreter, so its peak RSS is its own. Results are
+# written as JSON; --compare prints the change against an earlier run.
+#
+# Usage:
+#   python benchmarks/bench_suite.py [-o results.json] [--repeats 3] [--depth 4] ...
+#   python benchmarks/bench_suite.py --compare old.json new.json
+# ---------------------------------------------------------------------
+
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+from typing import Callable, Dict, List, Optional
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from synthetic_repo import RepoSpec, generate
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Bumped when the JSON layout changes
+RESULT_FORMAT = 1
+
+# Cases that do not depend on the registered parsers, in run order
+BASE_CASES = ["count_entries", "build_tree_only", "build_tree", "scan_worker"]
+
+def scan_settings(**overrides):
+    """Settings for reproducible runs: no parse cache, parse inline, no watching."""
+    from app.config import Settings
+    values = dict(parser_workers=1, use_parse_cache=False, watch_changes=False,
+                  stream_results=False)
+    values.update(overrides)
+    return Settings(**values)
+
+def peak_rss_bytes() -> Optional[int]:
+    """Peak resident set size of this process, None where it cannot be read."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+def case_function(name: str, root: str) -> Callable[[], Dict[str, int]]:
+    """
+    Returns a function that runs one iteration of a case and reports the
+    work done ("entries", and for parser cases "files" and "bytes").
+    """
+    from app.file_scanner import FileScanner
+
+    if name == "count_entries":
+        def run():
+            return {"entries": FileScanner(scan_settings(), root).count_entries()}
+        return run
+
+    if name in ("build_tree_only", "build_tree"):
+        contents = name == "build_tree"
+        settings = scan_settings(show_py_content=contents, show_docker_content=contents,
+                                 show_toml_content=contents)
+        def run():
+            scanner = FileScanner(settings, root)
+            scanner.build_tree()
+            return {"entries": len(scanner.tree) - 1}
+        return run
+
+    if name == "scan_worker":
+        from PySide6.QtCore import QCoreApplication
+        from app.worker import ScanWorker
+        app = QCoreApplication.instance() or QCoreApplication([])
+        def run():
+            worker = ScanWorker(root, scan_settings())
+            worker.start()
+            worker.wait()
+            app.processEvents()
+            return {"entries": len(worker.snapshot.tree) - 1 if worker.snapshot else 0}
+        return run
+
+    if name.startswith("parser:"):
+        from app.content_extractor import run_parser
+        from app.parser_services.registry import ParserTable, get_parser
+        kind = name.split(":", 1)[1]
+        table = ParserTable([get_parser(kind)])
+        files = [os.path.join(directory, file)
+                 for directory, _, names in os.walk(root) for file in names
+                 if table.kinds_for(file.lower())]
+        size = sum(os.path.getsize(path) for path in files)
+        def run():
+            for path in files:
+                run_parser((kind, path))
+            return {"files": len(files), "bytes": size}
+        return run
+
+    raise ValueError(f"Unknown benchmark case: {name}")
+
+def run_case_here(name: str, root: str, repeats: int) -> Dict[str, object]:
+    """
+    Runs a case `repeats` times in this process and returns its measurements.
+    """
+    run = case_function(name, root)
+    samples = []
+    work: Dict[str, int] = {}
+    for _ in range(repeats):
+        start = time.perf_counter()
+        work = run()
+        samples.append(time.perf_counter() - start)
+    best = min(samples)
+    result: Dict[str, object] = {
+        "name": name,
+        "repeats": repeats,
+        "wall_seconds": {"min": best, "median": statistics.median(samples), "samples": samples},
+        "peak_rss_bytes": peak_rss_bytes(),
+    }
+    result.update(work)
+    for unit in ("entries", "files", "bytes"):
+        if unit in work and best > 0:
+            result[f"{unit}_per_second"] = work[unit] / best
+    return result
+
+def run_case(name: str, root: str, repeats: int) -> Dict[str, object]:
+    """
+    Runs a case in a fresh interpreter and returns its measurements, or an
+    entry with "error" if it failed (e.g. PySide6 missing for scan_worker).
+    """
+    env = dict(os.environ)
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    command = [sys.executable, os.path.abspath(__file__), "--run-case", name,
+               "--root", root, "--repeats", str(repeats)]
+    process = subprocess.run(command, cwd=PROJECT_ROOT, env=env, capture_output=True, text=True)
+    if process.returncode != 0:
+        lines = process.stderr.strip().splitlines()
+        # The last traceback line, or the first line of a crash report
+        fatal = [line for line in lines if line.startswith("Fatal Python error")]
+        error = (fatal or lines or [f"exit code {process.returncode}"])[-1]
+        return {"name": name, "error": error}
+    return json.loads(process.stdout.strip().splitlines()[-1])
+
+def git_commit() -> Optional[str]:
+    try:
+        process = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT,
+                                 capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return process.stdout.strip() or None
+
+def print_results(results: List[Dict[str, object]]):
+    print(f"{'case':<18} {'min s':>9} {'median s':>9} {'peak RSS MB':>12} {'rate':>16}")
+    for result in results:
+        if "error" in result:
+            print(f"{result['name']:<18} skipped: {result['error']}")
+            continue
+        wall = result["wall_seconds"]
+        rss = result["peak_rss_bytes"]
+        rss_text = f"{rss / 1e6:.1f}" if rss else "-"
+        if "entries_per_second" in result:
+            rate = f"{result['entries_per_second']:,.0f} entries/s"
+        else:
+            rate = f"{result.get('files_per_second', 0):,.0f} files/s"
+        print(f"{result['name']:<18} {wall['min']:>9.3f} {wall['median']:>9.3f} {rss_text:>12} {rate:>16}")
+
+def compare(old_path: str, new_path: str) -> int:
+    """
+    Prints the change of each case's best wall time and peak RSS between two
+    result files. Returns 1 if any case got more than 10% slower, else 0.
+    """
+    with open(old_path, encoding="utf-8") as f:
+        old = {case["name"]: case for case in json.load(f)["cases"]}
+    with open(new_path, encoding="utf-8") as f:
+        new = json.load(f)["cases"]
+    regressed = False
+    print(f"{'case':<18} {'old s':>9} {'new s':>9} {'change':>8} {'RSS change':>11}")
+    for case in new:
+        before = old.get(case["name"])
+        if before is None or "error" in case or "error" in before:
+            continue
+        old_s, new_s = before["wall_seconds"]["min"], case["wall_seconds"]["min"]
+        change = new_s / old_s - 1 if old_s else 0.0
+        rss_change = "-"
+        if before.get("peak_rss_bytes") and case.get("peak_rss_bytes"):
+            rss_change = f"{case['peak_rss_bytes'] / before['peak_rss_bytes'] - 1:+.1%}"
+        regressed |= change > 0.10
+        print(f"{case['name']:<18} {old_s:>9.3f} {new_s:>9.3f} {change:>+8.1%} {rss_change:>11}")
+    return 1 if regressed else 0
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Scanning and parsing benchmark suite")
+    parser.add_argument("-o", "--output", default="", help="Write the results as JSON to this file")
+    parser.add_argument("--repeats", type=int, default=3, help="Runs per case (best and median are reported)")
+    parser.add_argument("--cases", default="", help="Comma-separated subset of cases to run")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="Compare two result files")
+    parser.add_argument("--run-case", help=argparse.SUPPRESS)
+    parser.add_argument("--root", help=argparse.SUPPRESS)
+    for name, value in RepoSpec().as_dict().items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=type(value), default=value,
+                            help=f"Synthetic repository: {name} (default: {value})")
+    args = parser.parse_args()
+
+    if args.compare:
+        return compare(*args.compare)
+    if args.run_case:
+        # Child process: one case, result as the last line of stdout
+        print(json.dumps(run_case_here(args.run_case, args.root, args.repeats)))
+        return 0
+
+    from app.parser_services.registry import registered_parsers
+    cases = BASE_CASES[:2] + [f"parser:{spec.kind}" for spec in registered_parsers()] + BASE_CASES[2:]
+    if args.cases:
+        cases = [case for case in args.cases.split(",") if case]
+
+    spec = RepoSpec(**{name: getattr(args, name) for name in RepoSpec().as_dict()})
+    with tempfile.TemporaryDirectory() as tmp:
+        root = os.path.join(tmp, "repo")
+        start = time.perf_counter()
+        repo = generate(root, spec)
+        print(f"Generated {repo['files']:,} files in {repo['dirs']:,} folders "
+              f"({repo['bytes'] / 1e6:.1f} MB) in {time.perf_counter() - start:.1f} s")
+        results = [run_case(case, root, args.repeats) for case in cases]
+
+    print_results(results)
+    report = {
+        "format": RESULT_FORMAT,
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "repository": {"spec": spec.as_dict(), "counts": repo},
+        "cases": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,187 @@
+# benchmarks/synthetic_repo.py
+# ---------------------------------------------------------------------
+# Author: Marvin Schubert
+# © 2025, Marvin Schubert. All rights reserved.
+#
+# Description:
+# Deterministic generator for synthetic repositories used by the
+# benchmarks. The same parameters and seed always produce the same
+# tree: nested packages with .py modules of varying size, .toml files
+# and Dockerfiles, plus optional venv folders, a .git folder and
+# symlinks.
+#
+# Usage:
+#   python benchmarks/synthetic_repo.py TARGET [--depth 4] [--fanout 4] ...
+# ---------------------------------------------------------------------
+
+import os
+import json
+import random
+import argparse
+from typing import Dict, List
+
+class RepoSpec:
+    """
+    Shape of a synthetic repository.
+    """
+
+    def __init__(self,
+                 depth: int = 4,
+                 fanout: int = 4,
+                 files_per_dir: int = 10,
+                 py_fraction: float = 0.6,
+                 py_classes: int = 4,
+                 venvs: int = 2,
+                 venv_files: int = 200,
+                 git_objects: int = 200,
+                 symlinks: int = 10,
+                 seed: int = 0):
+        """
+        :param depth: Levels of directories below the root.
+        :param fanout: Subdirectories per directory.
+        :param files_per_dir: Files per directory.
+        :param py_fraction: Share of the files that are .py modules.
+        :param py_classes: Mean number of classes per module (between 1 and twice the mean).
+        :param venvs: Number of virtual environment folders.
+        :param venv_files: .py files inside each virtual environment folder.
+        :param git_objects: Files inside the .git folder (0 = no .git folder).
+        :param symlinks: Number of file and directory symlinks (if the OS allows them).
+        :param seed: Seed of the random generator.
+        """
+        self.depth = depth
+        self.fanout = fanout
+        self.files_per_dir = files_per_dir
+        self.py_fraction = py_fraction
+        self.py_classes = py_classes
+        self.venvs = venvs
+        self.venv_files = venv_files
+        self.git_objects = git_objects
+        self.symlinks = symlinks
+        self.seed = seed
+
+    def as_dict(self) -> Dict[str, float]:
+        return dict(vars(self))
+
+def python_module(rng: random.Random, classes: int) -> str:
+    """A module with `classes` classes, each with a docstring and a few methods."""
+    parts = ['"""Generated module."""', "import os", "from typing import List", ""]
+    for i in range(classes):
+        methods = "\n".join(
+            f"    def method_{j}(self, value: int) -> int:\n"
+            f"        total = value * {rng.randint(1, 99)}\n"
+            f"        for item in range({rng.randint(2, 9)}):\n"
+            f"            total += item\n"
+            f"        return total\n"
+            for j in range(rng.randint(1, 6))
+        )
+        parts.append(f"class Generated{i}:\n    \"\"\"Class number {i}.\"\"\"\n\n{methods}")
+    parts.append("def helper(items: List[int]) -> int:\n    return sum(items)\n")
+    return "\n".join(parts)
+
+def generate(root: str, spec: RepoSpec) -> Dict[str, int]:
+    """
+    Writes the repository described by `spec` into `root` (which must be empty
+    or missing). Returns counts of what was written.
+    """
+    rng = random.Random(spec.seed)
+    os.makedirs(root, exist_ok=True)
+    counts = {"dirs": 0, "files": 0, "py_files": 0, "toml_files": 0, "dockerfiles": 0,
+              "venv_files": 0, "git_files": 0, "symlinks": 0, "bytes": 0}
+    directories: List[str] = []
+    py_files: List[str] = []
+
+    def write(path: str, text: str):
+        with open(path, "w", encoding="utf-8", newline="\n") as f:
+            f.write(text)
+        counts["files"] += 1
+        counts["bytes"] += len(text.encode("utf-8"))
+
+    # Packages, breadth-first so the layout does not depend on recursion order
+    level = [root]
+    for depth in range(spec.depth + 1):
+        next_level = []
+        for directory in level:
+            directories.append(directory)
+            for i in range(spec.files_per_dir):
+                roll = rng.random()
+                if roll < spec.py_fraction:
+                    path = os.path.join(directory, f"module_{i}.py")
+                    classes = rng.randint(1, max(1, 2 * spec.py_classes))
+                    write(path, python_module(rng, classes))
+                    py_files.append(path)
+                    counts["py_files"] += 1
+                elif roll < spec.py_fraction + 0.05:
+                    write(os.path.join(directory, f"config_{i}.toml"),
+                          f'[tool.generated]\nname = "pkg{i}"\nversion = "0.{i}.0"\n')
+                    counts["toml_files"] += 1
+                elif roll < spec.py_fraction + 0.07:
+                    write(os.path.join(directory, f"Dockerfile.variant{i}"),
+                          f"FROM python:3.11-slim\nWORKDIR /app\nCOPY . .\nRUN pip install pkg{i}\n")
+                    counts["dockerfiles"] += 1
+                else:
+                    write(os.path.join(directory, f"notes_{i}.md"), f"# Notes {i}\n" + "text\n" * rng.randint(1, 50))
+            if depth < spec.depth:
+                for i in range(spec.fanout):
+                    child = os.path.join(directory, f"pkg_{i}")
+                    os.mkdir(child)
+                    counts["dirs"] += 1
+                    next_level.append(child)
+        level = next_level
+
+    # Virtual environments in some packages (skipped by default settings)
+    for v in range(spec.venvs):
+        parent = directories[rng.randrange(len(directories))]
+        site = os.path.join(parent, ".venv" if v % 2 else "venv", "lib", "site-packages", f"dep{v}")
+        os.makedirs(site, exist_ok=True)
+        counts["dirs"] += 4
+        for i in range(spec.venv_files):
+            write(os.path.join(site, f"dep_module_{i}.py"), python_module(rng, 2))
+            counts["venv_files"] += 1
+
+    # A .git folder with loose objects (skipped by default settings)
+    if spec.git_objects:
+        objects = os.path.join(root, ".git", "objects")
+        os.makedirs(objects)
+        counts["dirs"] += 2
+        write(os.path.join(root, ".git", "HEAD"), "ref: refs/heads/main\n")
+        for i in range(spec.git_objects):
+            bucket = os.path.join(objects, f"{i % 256:02x}")
+            if not os.path.isdir(bucket):
+                os.mkdir(bucket)
+                counts["dirs"] += 1
+            with open(os.path.join(bucket, f"{rng.getrandbits(152):038x}"), "wb") as f:
+                f.write(bytes(rng.getrandbits(8) for _ in range(64)))
+            counts["files"] += 1
+            counts["git_files"] += 1
+
+    # Symlinks to modules and to leaf directories (never to an ancestor, so walks stay finite)
+    leaves = [d for d in directories if not any(name.startswith("pkg_") for name in os.listdir(d))]
+    for i in range(spec.symlinks):
+        parent = directories[rng.randrange(len(directories))]
+        if i % 2 and leaves:
+            target, name = leaves[rng.randrange(len(leaves))], f"linked_dir_{i}"
+        elif py_files:
+            target, name = py_files[rng.randrange(len(py_files))], f"linked_{i}.py"
+        else:
+            break
+        if os.path.dirname(target) == parent or target == parent:
+            continue
+        try:
+            os.symlink(target, os.path.join(parent, name), target_is_directory=os.path.isdir(target))
+        except (OSError, NotImplementedError):
+            # E.g. Windows without the privilege to create symlinks
+            break
+        counts["symlinks"] += 1
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description="Generates a synthetic repository")
+    parser.add_argument("target", help="Folder to create")
+    for name, value in RepoSpec().as_dict().items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=type(value), default=value)
+    args = parser.parse_args()
+    spec = RepoSpec(**{name: getattr(args, name) for name in RepoSpec().as_dict()})
+    print(json.dumps(generate(args.target, spec), indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -9,15 +9,19 @@
 
 import sys
 import logging
-from PySide6.QtWidgets import QApplication
-from app.main_window import MainWindow
+import multiprocessing
 from app.config import Settings
 
 def main():
     """
     Launches the PySide6 application.
     Initializes settings, logging, and creates the main window.
+    Qt is imported here, so importing this module stays cheap (see app/cli.py
+    for the headless entry point).
     """
+    from PySide6.QtWidgets import QApplication
+    from app.main_window import MainWindow
+
     # Configure basic logging.
     logging.basicConfig(
         level=logging.INFO,
@@ -43,4 +47,6 @@ def main():
     sys.exit(app.exec())
     
 if __name__ == "__main__":
+    # Needed for the parser process pool in frozen builds
+    multiprocessing.freeze_support()
     main()
@@ -0,0 +1,18 @@
+# tests/conftest.py
+# ---------------------------------------------------------------------
+# Author: Marvin Schubert
+# © 2025, Marvin Schubert. All rights reserved.
+#
+# Description:
+# Shared pytest fixtures.
+# ---------------------------------------------------------------------
+
+import pytest
+
+@pytest.fixture(autouse=True)
+def isolated_cache_dir(tmp_path_factory, monkeypatch):
+    """Keeps the persistent parse cache of the tests out of the user's cache directory."""
+    cache_home = str(tmp_path_factory.mktemp("cache"))
+    monkeypatch.setenv("XDG_CACHE_HOME", cache_home)
+    monkeypatch.setenv("LOCALAPPDATA", cache_home)
+    return cache_home
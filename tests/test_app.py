@@ -9,18 +9,27 @@
 
 import sys
 import os
+import time
+import threading
 import pytest
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from PySide6.QtWidgets import QApplication
+from PySide6.QtWidgets import QApplication, QFileDialog
 from app.main_window import MainWindow
 from app.config import Settings
+from app.file_scanner import FileScanner
+from app.incremental_scanner import IncrementalScanner
+from app.folder_watcher import FolderWatcher
+from app.worker import IncrementalUpdateWorker
+from app.tree_model import ScanSnapshot
+from app.result_model import ResultTreeModel, FETCH_BATCH_SIZE
+from app.api import format_output, format_batch_output, root_name
 
 @pytest.fixture
 def app_fixture():
-    """Creates a QApplication instance for testing."""
-    return QApplication([])
+    """Creates a QApplication instance for testing (only one may exist per process)."""
+    return QApplication.instance() or QApplication([])
 
 def test_main_window_init(app_fixture):
     """Tests that the MainWindow can be created without error."""
@@ -28,3 +37,184 @@ def test_main_window_init(app_fixture):
     window = MainWindow(settings)
     assert window is not None
     assert window.windowTitle() == settings.window_title
+
+def test_folder_watcher_updates_results(app_fixture, tmp_path):
+    """A file created in a watched folder shows up without a full rescan."""
+    settings = Settings(parser_workers=1)
+    incremental = IncrementalScanner(settings, str(tmp_path))
+    incremental.full_scan()
+    # Later changes in the settings panel do not reach the watched result
+    settings.ignore_patterns = ["*.py"]
+    watcher = FolderWatcher(incremental)
+    updates = []
+    threads = []
+    real_update = incremental.update
+    incremental.update = lambda paths: threads.append(threading.current_thread()) or real_update(paths)
+    watcher.resultsUpdated.connect(lambda snapshot: updates.append(snapshot.render()[0]))
+
+    (tmp_path / "new.py").write_text("class New:\n    pass\n", encoding="utf-8")
+    deadline = time.monotonic() + 5
+    while not updates and time.monotonic() < deadline:
+        app_fixture.processEvents()
+        time.sleep(0.01)
+    watcher.stop()
+
+    assert updates and updates[-1] == "└── new.py"
+    assert threads and threading.main_thread() not in threads
+
+def test_failed_incremental_update_falls_back_to_a_full_scan(tmp_path):
+    """An error while patching rebuilds the result from a full scan instead of leaving it half-patched."""
+    (tmp_path / "a.py").write_text("class A:\n    pass\n", encoding="utf-8")
+    settings = Settings(parser_workers=1, use_parse_cache=False)
+    incremental = IncrementalScanner(settings, str(tmp_path))
+    incremental.full_scan()
+    (tmp_path / "b.py").write_text("class B:\n    pass\n", encoding="utf-8")
+
+    def broken_rescan(directory):
+        incremental.contents.clear()
+        raise OSError("I/O error")
+    incremental._rescan_directory = broken_rescan
+    worker = IncrementalUpdateWorker(incremental, [str(tmp_path)])
+    updates = []
+    worker.updated.connect(updates.append)
+    worker.run()
+
+    assert updates and updates[0].render() == FileScanner(settings, str(tmp_path)).build_tree()
+
+def test_folder_watcher_stops_beyond_the_watch_limit(app_fixture, tmp_path, monkeypatch):
+    """A folder with more directories than can be watched is not followed half-way."""
+    for name in ("a", "b", "c"):
+        (tmp_path / name).mkdir()
+    incremental = IncrementalScanner(Settings(parser_workers=1, use_parse_cache=False), str(tmp_path))
+    incremental.full_scan()
+    monkeypatch.setattr(FolderWatcher, "MAX_WATCHES", 3)
+    watcher = FolderWatcher(incremental)
+    reasons = []
+    watcher.watchingStopped.connect(reasons.append)
+    app_fixture.processEvents()
+
+    assert not watcher.active and reasons and "4 folders" in reasons[0]
+
+def test_streamed_output_matches_final_output(app_fixture, tmp_path):
+    """Appending streamed chunks yields the same text as copying the final result."""
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "mod.py").write_text("class Foo:\n    pass\n", encoding="utf-8")
+    (tmp_path / "pyproject.toml").write_text("[tool]\n", encoding="utf-8")
+    settings = Settings(show_py_content=True, show_toml_content=True, parser_workers=1)
+    chunks = []
+    scanner = FileScanner(settings, str(tmp_path),
+                          output_callback=lambda section, text: chunks.append((section, text)))
+    tree, file_contents = scanner.scan()
+
+    window = MainWindow(settings)
+    window.output_text.setPlainText(root_name(str(tmp_path)))
+    for section, text in chunks:
+        window.on_output_chunk(section, text)
+    streamed = window.output_text.toPlainText()
+
+    window.show_scan_results(ScanSnapshot(tree, scanner.node_contents))
+    assert window.output_stack.currentWidget() is window.result_view
+    assert streamed == window.result_model.to_text()
+
+def test_copy_output_renders_in_a_worker(app_fixture, tmp_path):
+    """Copying a finished result renders it off the GUI thread into the clipboard."""
+    (tmp_path / "mod.py").write_text("class Foo:\n    pass\n", encoding="utf-8")
+    scanner = FileScanner(Settings(parser_workers=1, use_parse_cache=False), str(tmp_path))
+    scanner.scan()
+    window = MainWindow(Settings())
+
+    # A preview shown while the scan runs is neither copied nor exported
+    window.show_batch_results([ScanSnapshot(scanner.preview(1))], final=False)
+    window.copy_output()
+    window.export_output()
+    assert not window._render_workers and "wait for the scan" in window.progress_label.text()
+
+    window.show_scan_results(scanner.snapshot())
+    window.copy_output()
+    worker = window._render_workers[0]
+    assert worker.wait(10_000)
+    app_fixture.processEvents()
+    assert QApplication.clipboard().text() == window.result_model.to_text()
+    assert "class Foo" in QApplication.clipboard().text()
+
+def test_failed_scan_enables_the_output_actions_again(app_fixture, tmp_path, monkeypatch):
+    """A scan that fails does not leave Copy and Export disabled."""
+    missing = str(tmp_path / "missing")
+    monkeypatch.setattr(QFileDialog, "getExistingDirectory", lambda *args: missing)
+    window = MainWindow(Settings(parser_workers=1, use_parse_cache=False))
+    window.open_folder_dialog()
+    assert not window.copy_button.isEnabled()
+
+    assert window.worker.wait(10_000)
+    app_fixture.processEvents()
+    assert window.copy_button.isEnabled() and window.export_button.isEnabled()
+    assert window.progress_label.text().startswith("Scan failed:")
+
+def test_result_model_fetches_rows_lazily(app_fixture, tmp_path):
+    """Rows are added in batches and file contents only when a file is expanded."""
+    for i in range(FETCH_BATCH_SIZE + 10):
+        (tmp_path / f"notes_{i:04}.txt").write_text("", encoding="utf-8")
+    (tmp_path / "a.py").write_text("class A:\n    x = 1\n", encoding="utf-8")
+    settings = Settings(show_py_content=True, parser_workers=1, use_parse_cache=False)
+    scanner = FileScanner(settings, str(tmp_path))
+    tree, file_contents = scanner.scan()
+    model = ResultTreeModel([ScanSnapshot(tree, scanner.node_contents)])
+
+    root = model.index(0, 0)
+    assert model.hasChildren(root) and model.rowCount(root) == 0
+    model.fetchMore(root)
+    assert model.rowCount(root) == FETCH_BATCH_SIZE and model.canFetchMore(root)
+    model.fetchMore(root)
+    assert model.rowCount(root) == FETCH_BATCH_SIZE + 11 and not model.canFetchMore(root)
+
+    py_file = model.index(0, 0, root)
+    assert py_file.data() == "a.py" and model.parent(py_file) == root
+    assert model.hasChildren(py_file) and not model.hasChildren(model.index(1, 0, root))
+    model.fetchMore(py_file)
+    lines = [model.index(row, 0, py_file).data() for row in range(model.rowCount(py_file))]
+    assert lines == ["Class: A", "class A:", "    x = 1"]
+    assert model.parent(model.index(2, 0, py_file)) == py_file
+
+    assert model.to_text() == format_output(str(tmp_path), tree.render(), "\n".join(file_contents))
+
+def test_result_model_shows_one_row_per_batch_root(app_fixture, tmp_path):
+    """Each root of a batch is a top-level row with its own subtree."""
+    snapshots = []
+    for name in ("one", "two"):
+        root = tmp_path / name
+        (root / "src").mkdir(parents=True)
+        (root / "src" / f"{name}.txt").write_text("", encoding="utf-8")
+        scanner = FileScanner(Settings(parser_workers=1, use_parse_cache=False), str(root))
+        tree, _ = scanner.scan()
+        snapshots.append(ScanSnapshot(tree, scanner.node_contents))
+    model = ResultTreeModel(snapshots)
+
+    assert model.rowCount() == 2
+    second = model.index(1, 0)
+    assert second.data() == "two" and not model.parent(second).isValid()
+    model.fetchMore(second)
+    src = model.index(0, 0, second)
+    model.fetchMore(src)
+    leaf = model.index(0, 0, src)
+    assert leaf.data() == "two.txt" and model.parent(leaf) == src and model.parent(src) == second
+    assert model.to_text() == format_batch_output((s.root_folder,) + s.render() for s in snapshots)
+
+def test_batch_scan_lists_the_subfolders_in_the_worker(app_fixture, tmp_path):
+    """The batch roots are listed off the GUI thread; hidden folders are left out."""
+    for name in ("beta", "Alpha", ".hidden"):
+        (tmp_path / name).mkdir()
+    window = MainWindow(Settings(parser_workers=1, use_parse_cache=False))
+    window.start_batch_scan(str(tmp_path))
+    assert window.worker.wait(10_000)
+    app_fixture.processEvents()
+
+    assert window.worker.roots == [str(tmp_path / "Alpha"), str(tmp_path / "beta")]
+    assert window.result_model.rowCount() == 2
+    assert window.path_label.text() == f"{tmp_path} (2 folders)"
+
+    empty = tmp_path / "beta"
+    window.start_batch_scan(str(empty))
+    assert window.worker.wait(10_000)
+    app_fixture.processEvents()
+    assert window.progress_label.text() == "No subfolders to scan."
+    assert window.copy_button.isEnabled()
@@ -0,0 +1,144 @@
+# tests/test_cli.py
+# ---------------------------------------------------------------------
+# Author: Marvin Schubert
+# © 2025, Marvin Schubert. All rights reserved.
+#
+# Description:
+# Tests for the headless CLI and the scan() API.
+# ---------------------------------------------------------------------
+
+import os
+import sys
+import gzip
+import json
+import shutil
+import subprocess
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app import cli
+from app.api import scan, scan_many, scan_diff, format_output, ROOT_HEADER, CONTENTS_HEADER
+from app.config import Settings
+from app.file_scanner import FileScanner
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+def test_cli_writes_same_output_as_gui(tmp_path):
+    """The CLI output file holds the text the GUI would show."""
+    root = tmp_path / "repo"
+    (root / "pkg").mkdir(parents=True)
+    (root / "pkg" / "mod.py").write_text("class Foo:\n    pass\n", encoding="utf-8")
+    (root / "pyproject.toml").write_text("[tool]\n", encoding="utf-8")
+    output = tmp_path / "out.txt"
+
+    assert cli.main([str(root), "-o", str(output), "-j", "1", "--no-cache"]) == 0
+
+    tree_str, classes_str = FileScanner(Settings(parser_workers=1, use_parse_cache=False),
+                                        str(root)).build_tree()
+    expected = format_output(str(root), tree_str, classes_str)
+    assert output.read_text(encoding="utf-8") == expected + "\n"
+    assert scan(str(root), Settings(parser_workers=1, use_parse_cache=False)).text == expected
+    assert "Class: Foo" in expected
+
+def test_batch_scan_has_one_section_per_root(tmp_path):
+    """Several paths give one section per root, equal to scanning each root alone."""
+    roots = []
+    for name in ("alpha", "beta"):
+        root = tmp_path / name
+        (root / "src").mkdir(parents=True)
+        (root / "src" / f"{name}.py").write_text(f"class {name.title()}:\n    pass\n", encoding="utf-8")
+        roots.append(str(root))
+    settings = Settings(parser_workers=1, use_parse_cache=False)
+    updates = []
+
+    batch = scan_many(roots, settings, progress_callback=updates.append)
+
+    assert [result.root_folder for result in batch.results] == roots
+    expected = "\n\n".join(f"{ROOT_HEADER.format(root)}\n{scan(root, settings).text}" for root in roots)
+    assert batch.text == expected
+    assert batch.metrics.counters["files_parsed"] == 2
+    assert updates[-1].finished and updates[-1].roots_done == 2 and updates[-1].roots_total == 2
+
+    output = tmp_path / "out.txt"
+    assert cli.main(roots + ["-o", str(output), "-j", "1", "--no-cache"]) == 0
+    assert output.read_text(encoding="utf-8") == expected + "\n"
+
+def test_diff_scan_emits_only_changes(tmp_path):
+    """A diff scan lists added, removed and modified entries and skips unchanged files."""
+    root = tmp_path / "repo"
+    for name in ("keep", "edit", "gone"):
+        (root / name).mkdir(parents=True)
+        (root / name / f"{name}.py").write_text(f"class {name.title()}:\n    pass\n", encoding="utf-8")
+    (root / "edit" / "touched.py").write_text("class Touched:\n    pass\n", encoding="utf-8")
+    settings = Settings(parser_workers=1, use_parse_cache=False)
+    snapshot = str(tmp_path / "snapshot.json")
+    scan(str(root), settings, save_snapshot=snapshot)
+
+    edited = root / "edit" / "edit.py"
+    edited.write_text("class Edit:\n    value = 1\n", encoding="utf-8")
+    os.utime(edited, ns=(1, 1))
+    # A new mtime alone re-parses the file, but it is not reported as modified
+    os.utime(root / "edit" / "touched.py", ns=(1, 1))
+    shutil.rmtree(root / "gone")
+    (root / "new").mkdir()
+    (root / "new" / "new.py").write_text("class New:\n    pass\n", encoding="utf-8")
+    diff = scan_diff(str(root), snapshot, settings, save_snapshot=snapshot)
+
+    assert diff.changes_str == "+ new/\n- gone/\n~ edit/edit.py"
+    assert "value = 1" in diff.classes_str and "class New" in diff.classes_str
+    assert "Keep" not in diff.classes_str and "Touched" not in diff.classes_str
+    counters = diff.metrics.counters
+    assert counters["files_parsed"] == 3 and counters["unchanged_files"] == 1
+
+    output = tmp_path / "out.txt"
+    assert cli.main([str(root), "--diff", snapshot, "-o", str(output), "-j", "1", "--no-cache"]) == 0
+    assert output.read_text(encoding="utf-8") == format_output(str(root), "No changes.", "") + "\n"
+
+def test_export_formats_come_from_the_same_result(tmp_path):
+    """Text, Markdown and JSON exports (plain or gzip) hold the same scan result."""
+    root = tmp_path / "repo"
+    (root / "pkg").mkdir(parents=True)
+    (root / "pkg" / "mod.py").write_text("class Foo:\n    s = '```'\n", encoding="utf-8")
+    (root / "Dockerfile").write_text("FROM python:3.12\n", encoding="utf-8")
+    settings = Settings(parser_workers=1, use_parse_cache=False)
+    text = scan(str(root), settings).text
+    args = [str(root), "-j", "1", "--no-cache"]
+
+    assert cli.main(args + ["-o", str(tmp_path / "out.txt.gz")]) == 0
+    with gzip.open(tmp_path / "out.txt.gz", "rt", encoding="utf-8") as f:
+        assert f.read() == text + "\n"
+
+    assert cli.main(args + ["-o", str(tmp_path / "out.md")]) == 0
+    markdown = (tmp_path / "out.md").read_text(encoding="utf-8")
+    assert markdown.startswith("# repo\n\n```text\n├── Dockerfile\n")
+    assert "````python\nClass: Foo\nclass Foo:\n    s = '```'\n````" in markdown
+    assert "```dockerfile\nFROM python:3.12\n```" in markdown
+
+    assert cli.main(args + ["-o", str(tmp_path / "out.data"), "--format", "json"]) == 0
+    document = json.loads((tmp_path / "out.data").read_text(encoding="utf-8"))
+    (result,) = document["roots"]
+    tree_str, classes_str = text.split(CONTENTS_HEADER)
+    assert "\n".join(result["tree"]) == tree_str.split("\n", 1)[1].rstrip("\n")
+    assert [entry["path"] for entry in result["files"]] == [str(root / "Dockerfile"), str(root / "pkg" / "mod.py")]
+    assert result["files"][1]["content"] in classes_str
+
+def test_cli_does_not_import_qt(tmp_path):
+    """Neither the CLI nor the scan API pull in PySide6."""
+    code = "import sys, app.cli, app.api; print('PySide6' in sys.modules)"
+    result = subprocess.run([sys.executable, "-c", code], cwd=PROJECT_ROOT,
+                            capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "False"
+
+def test_cli_exits_quietly_when_stdout_is_closed(tmp_path):
+    """A reader that stops early (`| head`) ends the CLI with 141, not a traceback."""
+    root = tmp_path / "repo"
+    root.mkdir()
+    for i in range(200):
+        (root / f"mod_{i}.py").write_text(f"class Foo{i}:\n    pass\n", encoding="utf-8")
+
+    process = subprocess.Popen([sys.executable, "-m", "app", str(root), "--no-cache", "-j", "1"],
+                               cwd=PROJECT_ROOT, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    process.stdout.close()
+    stderr = process.stderr.read().decode("utf-8", "replace")
+    process.stderr.close()
+    assert process.wait() == 141
+    assert "Traceback" not in stderr
+    assert "BrokenPipeError" not in stderr
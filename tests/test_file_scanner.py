@@ -0,0 +1,421 @@
+# tests/test_file_scanner.py
+# ---------------------------------------------------------------------
+# Author: Marvin Schubert
+# © 2025, Marvin Schubert. All rights reserved.
+#
+# Description:
+# Basic tests for the FileScanner tree building and progress reporting.
+# ---------------------------------------------------------------------
+
+import os
+import sys
+import shutil
+import subprocess
+import pytest
+from concurrent.futures.process import BrokenProcessPool
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app import file_scanner
+from app.file_scanner import FileScanner
+from app.config import Settings
+from app.cancellation import CancellationToken, ScanCancelled
+from app import content_extractor, parse_cache
+from app.parse_cache import ParseCache
+from app import packer
+from app.content_extractor import MIN_JOBS_FOR_POOL, ParserPools
+
+def _make_sample_tree(root):
+    """Creates a small folder structure with .py, Docker, .toml, venv and .git entries."""
+    os.makedirs(os.path.join(root, "pkg", "sub"))
+    os.makedirs(os.path.join(root, ".git", "objects"))
+    os.makedirs(os.path.join(root, "venv", "lib"))
+    with open(os.path.join(root, "pkg", "mod.py"), "w", encoding="utf-8") as f:
+        f.write("class Foo:\n    pass\n\ndef helper():\n    pass\n")
+    with open(os.path.join(root, "pkg", "sub", "cache.pyc"), "wb") as f:
+        f.write(b"\x00")
+    with open(os.path.join(root, "Dockerfile"), "w", encoding="utf-8") as f:
+        f.write("FROM python:3.9")
+    with open(os.path.join(root, "pyproject.toml"), "w", encoding="utf-8") as f:
+        f.write("[tool.poetry]")
+
+def test_build_tree_output(tmp_path):
+    """Checks the exact ASCII tree and collected contents for a sample folder."""
+    root = str(tmp_path)
+    _make_sample_tree(root)
+    scanner = FileScanner(Settings(skip_python_aux=True), root)
+    tree_str, classes_str = scanner.build_tree()
+
+    assert tree_str == "\n".join([
+        "├── Dockerfile",
+        "├── pkg",
+        "│   ├── mod.py",
+        "│   └── sub",
+        "├── pyproject.toml",
+        "└── venv [venv skipped]",
+    ])
+    assert classes_str == "\n".join([
+        f"File: {os.path.join(root, 'Dockerfile')}\nFROM python:3.9\n------",
+        f"File: {os.path.join(root, 'pkg', 'mod.py')}\nClass: Foo\nclass Foo:\n    pass\n------",
+        f"File: {os.path.join(root, 'pyproject.toml')}\n[tool.poetry]\n------",
+    ])
+
+def test_directories_vanishing_during_the_walk(tmp_path):
+    """A folder removed or replaced by a file after its parent was listed does not abort the scan."""
+    root = str(tmp_path)
+    for name in ("gone", "swapped", "kept"):
+        os.makedirs(os.path.join(root, name))
+        with open(os.path.join(root, name, "mod.py"), "w", encoding="utf-8") as f:
+            f.write(f"class {name.title()}:\n    pass\n")
+    scanner = FileScanner(Settings(parser_workers=1, use_parse_cache=False), root)
+    real_list_dir = scanner._list_dir
+
+    def list_dir(path, *args):
+        listing = real_list_dir(path, *args)
+        if path == root:
+            shutil.rmtree(os.path.join(root, "gone"))
+            shutil.rmtree(os.path.join(root, "swapped"))
+            with open(os.path.join(root, "swapped"), "w") as f:
+                f.write("")
+        return listing
+
+    scanner._list_dir = list_dir
+    tree_str, classes_str = scanner.build_tree()
+
+    assert tree_str == "├── gone\n├── kept\n│   └── mod.py\n└── swapped"
+    assert "Class: Kept" in classes_str and "Class: Gone" not in classes_str
+
+def test_progress_reporting(tmp_path):
+    """Progress is coalesced into few updates and the final one has the exact totals."""
+    root = str(tmp_path)
+    _make_sample_tree(root)
+    for i in range(500):
+        with open(os.path.join(root, "pkg", f"data{i}.txt"), "w") as f:
+            f.write("x")
+    updates = []
+    scanner = FileScanner(Settings(skip_git=False, skip_venv=False, parser_workers=1), root,
+                          progress_callback=updates.append)
+    scanner.build_tree()
+
+    final = updates[-1]
+    assert len(updates) < 20
+    assert all(u.processed <= u.estimated_total for u in updates)
+    assert [u.finished for u in updates] == [False] * (len(updates) - 1) + [True]
+    assert final.processed == final.estimated_total == scanner.count_entries()
+    assert final.files_parsed == 3
+    assert final.bytes_parsed == os.path.getsize(os.path.join(root, "pkg", "mod.py")) + 15 + 13
+
+    # A folder that cannot be listed still ends with a finished update
+    updates.clear()
+    scanner = FileScanner(Settings(parser_workers=1), root, progress_callback=updates.append)
+    scanner._list_dir = lambda *args: None  # Access denied
+    scanner.build_tree()
+    assert updates and updates[-1].finished
+
+def test_build_tree_deeper_than_recursion_limit(tmp_path):
+    """Very deep trees are handled iteratively without hitting the recursion limit."""
+    depth = sys.getrecursionlimit() + 100
+    path = str(tmp_path)
+    for _ in range(depth):
+        path = os.path.join(path, "d")
+        os.mkdir(path)
+
+    try:
+        scanner = FileScanner(Settings(), str(tmp_path))
+        tree_str, _ = scanner.build_tree()
+    finally:
+        # shutil.rmtree (used by pytest's tmp_path cleanup) recurses per level
+        while path != str(tmp_path):
+            os.rmdir(path)
+            path = os.path.dirname(path)
+    lines = tree_str.split("\n")
+
+    assert len(lines) == depth
+    assert lines[-1] == " " * 4 * (depth - 1) + "└── d"
+
+def test_parallel_extraction_keeps_tree_order(tmp_path):
+    """Parsing with a worker pool yields the same output as parsing inline."""
+    root = str(tmp_path)
+    for i in range(MIN_JOBS_FOR_POOL + 4):
+        package = os.path.join(root, f"pkg{i % 3}")
+        os.makedirs(package, exist_ok=True)
+        with open(os.path.join(package, f"mod{i}.py"), "w", encoding="utf-8") as f:
+            f.write(f"class C{i}:\n    pass\n")
+        with open(os.path.join(package, f"conf{i}.toml"), "w", encoding="utf-8") as f:
+            f.write(f"value = {i}")
+
+    inline = FileScanner(Settings(parser_workers=1), root).build_tree()
+    pooled = FileScanner(Settings(parser_workers=2), root).build_tree()
+
+    assert pooled == inline
+    assert inline[1].count("File: ") == 2 * (MIN_JOBS_FOR_POOL + 4)
+
+def test_broken_process_pool_is_replaced(tmp_path):
+    """Batches of a broken shared process pool are parsed inline, and the pool is discarded."""
+    class BrokenPool:
+        shut_down = False
+        def submit(self, *args, **kwargs):
+            raise BrokenProcessPool("a worker process died")
+        def shutdown(self, wait=True):
+            self.shut_down = True
+
+    jobs = []
+    for i in range(MIN_JOBS_FOR_POOL):
+        path = tmp_path / f"mod{i}.py"
+        path.write_text(f"class C{i}:\n    pass\n", encoding="utf-8")
+        jobs.append(("python", str(path)))
+    pools = ParserPools(2)
+    broken = pools._process_pool = BrokenPool()
+    try:
+        results = dict(content_extractor.iter_contents(jobs, 2, pools=pools))
+    finally:
+        pools.shutdown()
+
+    assert all(f"Class: C{i}" in results[i] for i in range(len(jobs)))
+    assert broken.shut_down and pools._process_pool is None
+
+def test_parse_cache_reuses_unchanged_files(tmp_path, monkeypatch):
+    """A second scan only re-parses files whose mtime/size changed."""
+    root = tmp_path / "repo"
+    root.mkdir()
+    (root / "a.py").write_text("class A:\n    pass\n", encoding="utf-8")
+    (root / "b.py").write_text("class B:\n    pass\n", encoding="utf-8")
+    settings = Settings(parser_workers=1, parse_cache_path=str(tmp_path / "cache.sqlite3"))
+    first = FileScanner(settings, str(root)).build_tree()
+
+    parsed = []
+    real_run_parser = content_extractor.run_parser
+    monkeypatch.setattr(content_extractor, "run_parser",
+                        lambda job, *args: parsed.append(job[1]) or real_run_parser(job, *args))
+
+    assert FileScanner(settings, str(root)).build_tree() == first
+    assert parsed == []
+
+    (root / "b.py").write_text("class B2:\n    pass\n", encoding="utf-8")
+    _, classes_str = FileScanner(settings, str(root)).build_tree()
+    assert parsed == [str(root / "b.py")]
+    assert "Class: A" in classes_str and "Class: B2" in classes_str
+
+def test_parse_cache_drops_outdated_and_least_recently_used_entries(tmp_path):
+    """The cache drops old parser versions and keeps at most max_entries files."""
+    db_path = str(tmp_path / "cache.sqlite3")
+    cache = ParseCache(db_path)
+    cache.put_many([(("/old.py", "python"), (1, 1, 0), "old version"),
+                    (("/a.py", "python"), (1, 1, 1), "a"),
+                    (("/b.py", "python:functions"), (1, 1, 1), "b"),
+                    (("/c.toml", "toml"), (1, 1, 1), "c")])
+    # Make /c.toml the least recently used entry
+    cache._conn.execute("UPDATE parse_cache SET last_used = 0 WHERE path = '/c.toml'")
+    cache._conn.commit()
+    cache.close()
+
+    parse_cache._writes_since_prune.pop(db_path, None)
+    cache = ParseCache(db_path, max_entries=2, versions={"python": 1, "toml": 1})
+    rows = cache._conn.execute("SELECT path FROM parse_cache ORDER BY path").fetchall()
+    assert [path for path, in rows] == ["/a.py", "/b.py"]
+    cache.close()
+
+    # Later in the same session, closing after many writes prunes again
+    cache = ParseCache(db_path, max_entries=2)
+    cache.put_many(((f"/new{i}.py", "python"), (1, 1, 1), "") for i in range(parse_cache.PRUNE_AFTER_WRITES))
+    cache.close()
+    cache = ParseCache(db_path)
+    assert cache._conn.execute("SELECT COUNT(*) FROM parse_cache").fetchone()[0] == 2
+    cache.close()
+
+def test_streamed_chunks_join_to_build_tree_result(tmp_path, monkeypatch):
+    """Streamed tree/content chunks add up to exactly what build_tree returns."""
+    root = str(tmp_path)
+    _make_sample_tree(root)
+    monkeypatch.setattr(file_scanner, "OUTPUT_BATCH_SIZE", 2)
+    chunks = {file_scanner.TREE_SECTION: [], file_scanner.CONTENTS_SECTION: []}
+    scanner = FileScanner(Settings(parser_workers=1), root,
+                          output_callback=lambda section, text: chunks[section].append(text))
+    scanner.scan()
+
+    expected = FileScanner(Settings(parser_workers=1), root).build_tree()
+    assert len(chunks[file_scanner.TREE_SECTION]) > 1
+    assert "\n".join(chunks[file_scanner.TREE_SECTION]) == expected[0]
+    assert "\n".join(chunks[file_scanner.CONTENTS_SECTION]) == expected[1]
+
+def test_cancelled_scan_stops_promptly(tmp_path, monkeypatch):
+    """A cancelled token stops the walk and the parsing at the next entry."""
+    root = str(tmp_path)
+    for i in range(200):
+        with open(os.path.join(root, f"mod{i:03}.py"), "w", encoding="utf-8") as f:
+            f.write(f"class C{i}:\n    pass\n")
+
+    # Cancelled during the walk: the first progress snapshot cancels the scan
+    token = CancellationToken()
+    seen = []
+    scanner = FileScanner(Settings(parser_workers=1), root,
+                          progress_callback=lambda p: seen.append(p) or token.cancel(),
+                          cancel_token=token)
+    with pytest.raises(ScanCancelled):
+        scanner.scan()
+    assert len(scanner.tree) == 2
+    assert not any(p.finished for p in seen)
+
+    # Cancelled while parsing: no further files are parsed
+    monkeypatch.setattr(file_scanner, "OUTPUT_BATCH_SIZE", 1)
+    parsed = []
+    real_run_parser = content_extractor.run_parser
+    monkeypatch.setattr(content_extractor, "run_parser",
+                        lambda job, *args: parsed.append(job[1]) or real_run_parser(job, *args))
+    token = CancellationToken()
+    scanner = FileScanner(Settings(parser_workers=1, use_parse_cache=False), root,
+                          output_callback=lambda section, text: token.cancel()
+                          if section == file_scanner.CONTENTS_SECTION else None,
+                          cancel_token=token)
+    with pytest.raises(ScanCancelled):
+        scanner.scan()
+    assert len(parsed) <= 2
+
+def test_scan_metrics_count_phases_and_slowest_files(tmp_path):
+    """Every scan records its counters, phase timers and slowest files."""
+    root = str(tmp_path)
+    _make_sample_tree(root)
+    with open(os.path.join(root, "pkg", "broken.py"), "w", encoding="utf-8") as f:
+        f.write("class Broken(:\n")
+    settings = Settings(parser_workers=1)
+    FileScanner(settings, root).build_tree()
+    scanner = FileScanner(settings, root)
+    scanner.build_tree()
+    metrics = scanner.metrics
+
+    counters = metrics.counters
+    # Root, pkg and pkg/sub; .git is skipped and venv is not descended into
+    assert counters["dirs"] == 3
+    assert counters["candidate_files"] == 4
+    # Results without errors come from the cache on the second scan
+    assert counters["cache_hits"] == 3 and counters["cache_misses"] == 1
+    assert counters["files_parsed"] == 1 and counters["parse_failures"] == 1
+    assert metrics.slowest_files[0].path == os.path.join(root, "pkg", "broken.py")
+    assert metrics.phases["walk"] >= metrics.phases["list"] > 0
+    assert metrics.total_seconds >= metrics.phases["extract"]
+    assert '"cache_hits": 3' in metrics.to_json()
+
+@pytest.mark.skipif(not hasattr(os, "symlink"), reason="symlinks not supported")
+def test_symlink_policies_avoid_cycles_and_duplicates(tmp_path):
+    """Linked folders are listed per policy; a link to an ancestor never loops."""
+    root = str(tmp_path)
+    os.makedirs(os.path.join(root, "a"))
+    open(os.path.join(root, "a", "x.txt"), "w").close()
+    try:
+        os.symlink("..", os.path.join(root, "a", "loop"), target_is_directory=True)
+        os.symlink("a", os.path.join(root, "b"), target_is_directory=True)
+    except (OSError, NotImplementedError):
+        pytest.skip("cannot create symlinks")
+
+    expected = {
+        "no-follow": ["├── a", "│   ├── loop -> .. [link not followed]", "│   └── x.txt",
+                      "└── b -> a [link not followed]"],
+        "follow-once": ["├── a", "│   ├── loop -> .. [already listed]", "│   └── x.txt",
+                        "└── b -> a [already listed]"],
+        "follow": ["├── a", "│   ├── loop -> .. [already listed]", "│   └── x.txt",
+                   "└── b -> a", "    ├── loop -> .. [already listed]", "    └── x.txt"],
+    }
+    for policy, lines in expected.items():
+        scanner = FileScanner(Settings(parser_workers=1, symlink_policy=policy), root)
+        tree_str, _ = scanner.build_tree()
+        assert tree_str == "\n".join(lines), policy
+        # The counting walk follows the same policy
+        assert scanner.count_entries() == len(scanner.tree) - 1, policy
+
+def test_dedup_emits_repeated_contents_once(tmp_path):
+    """Identical Dockerfiles are printed once; the others refer to the first."""
+    for service in ("api", "web", "worker"):
+        (tmp_path / service).mkdir()
+        (tmp_path / service / "Dockerfile").write_text("FROM python:3.12\nRUN pip install app\n",
+                                                       encoding="utf-8")
+    (tmp_path / "worker" / "Dockerfile").write_text("FROM alpine\n", encoding="utf-8")
+    settings = Settings(parser_workers=1, use_parse_cache=False, dedup_contents=True)
+    chunks = []
+    scanner = FileScanner(settings, str(tmp_path),
+                          output_callback=lambda section, text: chunks.append((section, text)))
+    tree, file_contents = scanner.scan()
+
+    first = os.path.join(str(tmp_path), "api", "Dockerfile")
+    web = os.path.join(str(tmp_path), "web", "Dockerfile")
+    assert file_contents[1] == f"File: {web}\nSame content as: {first}\n------"
+    assert sum("RUN pip install app" in block for block in file_contents) == 1
+    assert "FROM alpine" in file_contents[2]
+    assert scanner.metrics.counters["duplicate_contents"] == 1
+    # Streamed output and the rendered snapshot agree; every node keeps its full block
+    streamed = "\n".join(text for section, text in chunks if section == file_scanner.CONTENTS_SECTION)
+    assert scanner.snapshot().render()[1] == streamed == "\n".join(file_contents)
+    assert all("RUN pip install app" in blocks[0] for node, blocks in scanner.node_contents.items()
+               if "worker" not in scanner.tree.path_of(node))
+
+def test_token_budget_packs_pinned_and_shallow_files_first(tmp_path):
+    """A budgeted scan keeps the tree, packs pinned then shallow files and stops parsing."""
+    body = "RUN echo " + "x" * 390 + "\n"  # About 100 tokens per block
+    (tmp_path / "Dockerfile").write_text("FROM alpine\n" + body, encoding="utf-8")
+    for i in range(30):
+        folder = tmp_path / f"svc{i:02d}" / "build"
+        folder.mkdir(parents=True)
+        (folder / "Dockerfile").write_text(f"FROM svc{i}\n" + body, encoding="utf-8")
+    settings = Settings(parser_workers=1, use_parse_cache=False, token_budget=700,
+                        pinned_paths=["svc29"])
+    scanner = FileScanner(settings, str(tmp_path))
+    tree, file_contents = scanner.scan()
+
+    assert tree.render().count("Dockerfile") == 31
+    assert "FROM svc29" in file_contents[-2]  # Pinned, but rendered in tree order
+    assert "FROM alpine" in file_contents[0]
+    assert file_contents[-1] == scanner.budget_note
+    counters = scanner.metrics.counters
+    assert counters["files_parsed"] < counters["candidate_files"] == 31
+    assert counters["budget_omitted"] == 31 - (len(file_contents) - 1)
+    assert scanner.budget_note.startswith(f"[{counters['budget_omitted']} more files")
+    output = "\n".join(file_contents)
+    assert packer.estimate_tokens(output) + packer.estimate_tokens(tree.render()) <= 700 * 1.1
+    assert scanner.snapshot().render() == (tree.render(), output)
+
+def test_max_depth_and_preview_stop_listing_deep_folders(tmp_path):
+    """Folders below max_depth are shown but not listed; a preview lists only its top levels."""
+    root = str(tmp_path)
+    os.makedirs(os.path.join(root, "data", "a", "b"))
+    for i in range(50):
+        with open(os.path.join(root, "data", "a", "b", f"part{i}.py"), "w", encoding="utf-8") as f:
+            f.write("class Part:\n    pass\n")
+    with open(os.path.join(root, "main.py"), "w", encoding="utf-8") as f:
+        f.write("class Main:\n    pass\n")
+    settings = Settings(parser_workers=1, use_parse_cache=False, max_depth=2)
+    scanner = FileScanner(settings, root)
+    tree_str, classes_str = scanner.build_tree()
+
+    assert tree_str == "├── data\n│   └── a [depth limit]\n└── main.py"
+    assert "class Main" in classes_str and "Part" not in classes_str
+    assert scanner.count_entries() == len(scanner.tree) - 1
+
+    preview = FileScanner(Settings(parser_workers=1, use_parse_cache=False), root).preview(1)
+    assert preview.render() == "├── data [depth limit]\n└── main.py"
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="needs git to create the index")
+@pytest.mark.parametrize("index_version", [2, 3, 4])
+def test_git_index_lists_tracked_files_only(tmp_path, index_version):
+    """The tree built from .git/index matches a walk of a clean checkout and skips untracked files."""
+    root = str(tmp_path / "repo")
+    _make_sample_tree(root)
+    # Git tracks neither the sample's .git folder nor the empty venv folder
+    shutil.rmtree(os.path.join(root, ".git"))
+    shutil.rmtree(os.path.join(root, "venv"))
+    git = ["git", "-C", root, "-c", "user.name=test", "-c", "user.email=test@example.com"]
+    subprocess.run(git + ["init", "-q"], check=True)
+    subprocess.run(git + ["add", "-A"], check=True)
+    subprocess.run(git + ["update-index", "--index-version", str(index_version)], check=True)
+    settings = Settings(parser_workers=1, use_parse_cache=False)
+    walked = FileScanner(settings, root).build_tree()
+
+    with open(os.path.join(root, "pkg", "untracked.py"), "w", encoding="utf-8") as f:
+        f.write("class Untracked:\n    pass\n")
+    settings.use_git_index = True
+    scanner = FileScanner(settings, root)
+    assert scanner.build_tree() == walked
+    assert scanner.metrics.counters["dirs"] == 3 and scanner.count_entries() == 6
+    # A subfolder of the working tree uses the same index
+    assert FileScanner(settings, os.path.join(root, "pkg")).build_tree()[0] == "├── mod.py\n└── sub\n    └── cache.pyc"
+
+    # Outside a git working tree the folder is walked
+    other = tmp_path / "outside"
+    shutil.copytree(os.path.join(root, "pkg"), other)
+    assert "untracked.py" in FileScanner(settings, str(other)).build_tree()[0]
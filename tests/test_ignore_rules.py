@@ -0,0 +1,63 @@
+# tests/test_ignore_rules.py
+# ---------------------------------------------------------------------
+# Author: Marvin Schubert
+# © 2025, Marvin Schubert. All rights reserved.
+#
+# Description:
+# Tests for the .gitignore pattern matching and pruning during scans.
+# ---------------------------------------------------------------------
+
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app.ignore_rules import IgnoreSpec
+from app.file_scanner import FileScanner
+from app.config import Settings
+
+def test_gitignore_pattern_semantics():
+    """Patterns follow git's rules for anchoring, directories, ** and negation."""
+    cases = [
+        (["*.pyc"], "a/b/x.pyc", False, True),
+        (["build/"], "src/build", True, True),
+        (["build/"], "build", False, None),
+        (["/build"], "src/build", True, None),
+        (["doc/frotz"], "a/doc/frotz", True, None),
+        (["**/foo"], "foo", False, True),
+        (["a/**/b"], "a/x/y/b", False, True),
+        (["abc/**"], "abc/x/y", False, True),
+        (["*.log", "!keep.log"], "logs/keep.log", False, False),
+        (["!keep.log", "*.log"], "logs/keep.log", False, True),
+        (["[!a]x"], "ax", False, None),
+        (["\\#x"], "#x", False, True),
+        (["a*"], "ab/c", False, None),
+    ]
+    for lines, path, is_dir, expected in cases:
+        spec = IgnoreSpec.from_lines(lines)
+        assert spec.match(path, path.rsplit("/", 1)[-1], is_dir) == expected, (lines, path)
+
+def test_ignored_directories_are_not_listed(tmp_path, monkeypatch):
+    """Nested .gitignore files and extra patterns prune entries before listing."""
+    root = tmp_path / "repo"
+    for directory in ("node_modules/pkg", "src/build", "src/data", "docs"):
+        (root / directory).mkdir(parents=True)
+    (root / ".gitignore").write_text("node_modules/\n*.log\n", encoding="utf-8")
+    (root / "src" / ".gitignore").write_text("build\n!keep.log\n", encoding="utf-8")
+    for name in ("src/main.py", "src/keep.log", "src/other.log", "docs/a.md", "src/data/d.csv"):
+        (root / name).write_text("x = 1\n", encoding="utf-8")
+
+    listed = []
+    scanner = FileScanner(Settings(parser_workers=1, use_parse_cache=False,
+                                   ignore_patterns=["/src/data/"]), str(root))
+    real_list_dir = scanner._list_dir
+    monkeypatch.setattr(scanner, "_list_dir", lambda path, *args: listed.append(path) or real_list_dir(path, *args))
+    tree_str, _ = scanner.build_tree()
+
+    assert tree_str == "\n".join([
+        "├── docs",
+        "│   └── a.md",
+        "└── src",
+        "    ├── keep.log",
+        "    └── main.py",
+    ])
+    assert sorted(os.path.relpath(path, root) for path in listed) == [".", "docs", "src"]
+    assert scanner.count_entries() == 7  # Includes the two .gitignore files
@@ -0,0 +1,100 @@
+# tests/test_incremental_scanner.py
+# ---------------------------------------------------------------------
+# Author: Marvin Schubert
+# © 2025, Marvin Schubert. All rights reserved.
+#
+# Description:
+# Tests that incremental updates match a fresh full scan.
+# ---------------------------------------------------------------------
+
+import os
+import sys
+import shutil
+import pytest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app.config import Settings
+from app.file_scanner import FileScanner
+from app.incremental_scanner import IncrementalScanner
+from app.result_cache import is_current
+
+def _write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+def test_apply_changes_matches_full_scan(tmp_path):
+    """Added, removed and modified entries are patched into the result."""
+    root = str(tmp_path)
+    _write(os.path.join(root, "pkg", "a.py"), "class A:\n    pass\n")
+    _write(os.path.join(root, "pkg", "old", "b.py"), "class B:\n    pass\n")
+    _write(os.path.join(root, "pyproject.toml"), "[tool]\n")
+    settings = Settings(parser_workers=1)
+
+    incremental = IncrementalScanner(settings, root)
+    assert incremental.full_scan() == FileScanner(settings, root).build_tree()
+
+    _write(os.path.join(root, "pkg", "a.py"), "class A2:\n    pass\n")
+    _write(os.path.join(root, "pkg", "new", "deep", "c.toml"), "c = 1\n")
+    shutil.rmtree(os.path.join(root, "pkg", "old"))
+    _write(os.path.join(root, "zz.py"), "class Z:\n    pass\n")
+
+    changed = [
+        os.path.join(root, "pkg", "a.py"),
+        os.path.join(root, "pkg"),
+        os.path.join(root, "pkg", "old"),
+        root,
+    ]
+    tree_str, classes_str = incremental.apply_changes(changed)
+
+    assert (tree_str, classes_str) == FileScanner(settings, root).build_tree()
+    assert "Class: A2" in classes_str and "Class: B" not in classes_str
+    assert os.path.join(root, "pkg", "old") not in incremental.watched_directories()
+    assert os.path.join(root, "pkg", "new", "deep") in incremental.watched_directories()
+
+    # The patched result carries the stamps of what it was built from
+    assert is_current(incremental.snapshot())
+    _write(os.path.join(root, "pkg", "new", "deep", "c.toml"), "c = 2\n")
+    os.utime(os.path.join(root, "pkg", "new", "deep", "c.toml"), ns=(0, 0))
+    assert not is_current(incremental.snapshot())
+
+def test_vanished_directory_is_dropped_from_the_result(tmp_path):
+    """A changed directory that is gone by the time it is re-listed is removed, not fatal."""
+    root = str(tmp_path)
+    _write(os.path.join(root, "pkg", "sub", "a.py"), "class A:\n    pass\n")
+    _write(os.path.join(root, "b.py"), "class B:\n    pass\n")
+    settings = Settings(parser_workers=1, use_parse_cache=False)
+    incremental = IncrementalScanner(settings, root)
+    incremental.full_scan()
+
+    # Reported as changed while it still existed, removed before the re-listing
+    shutil.rmtree(os.path.join(root, "pkg", "sub"))
+    incremental._rescan_directory(os.path.join(root, "pkg", "sub"))
+
+    assert incremental.render() == FileScanner(settings, root).build_tree()
+    assert os.path.join(root, "pkg", "sub") not in incremental.watched_directories()
+
+@pytest.mark.skipif(not hasattr(os, "symlink"), reason="symlinks not supported")
+def test_follow_once_patch_matches_full_scan(tmp_path):
+    """A patched result lists each linked folder once, like a fresh follow-once scan."""
+    root = str(tmp_path / "root")
+    external = str(tmp_path / "external")
+    _write(os.path.join(external, "x.py"), "class X:\n    pass\n")
+    _write(os.path.join(root, "b.py"), "class B:\n    pass\n")
+    try:
+        os.symlink(external, os.path.join(root, "a_link"), target_is_directory=True)
+    except (OSError, NotImplementedError):
+        pytest.skip("cannot create symlinks")
+    settings = Settings(parser_workers=1, use_parse_cache=False, symlink_policy="follow-once")
+    incremental = IncrementalScanner(settings, root)
+    incremental.full_scan()
+
+    # A new folder linking to the same external folder: listed once, at a_link
+    os.makedirs(os.path.join(root, "c"))
+    os.symlink(external, os.path.join(root, "c", "again"), target_is_directory=True)
+    tree_str, classes_str = incremental.apply_changes([root])
+    assert (tree_str, classes_str) == FileScanner(settings, root).build_tree()
+    assert "again -> " in tree_str and "[already listed]" in tree_str
+
+    # Without the first link, the second one is the place it is listed
+    os.remove(os.path.join(root, "a_link"))
+    assert incremental.apply_changes([root]) == FileScanner(settings, root).build_tree()
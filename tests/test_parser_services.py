@@ -11,9 +11,11 @@ import os
 import sys
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 import tempfile
-from app.parser_services.python_parser import extract_python_classes
+from app.parser_services.python_parser import extract_python_classes, extract_python
 from app.parser_services.docker_parser import read_dockerfile_content
 from app.parser_services.toml_parser import read_toml_content
+from app.parser_services.parser_spec import ParserSpec
+from app.parser_services.registry import ParserTable, registered_parsers
 
 def test_extract_python_classes():
     """Create a temporary Python file and check if classes are extracted."""
@@ -68,3 +70,64 @@ def test_read_toml_content():
         os.unlink(tmp_path)
 
     assert "name=\"test\"" in content
+
+def test_bounded_reads_guard_large_binary_and_misencoded_files(tmp_path):
+    """Large files are truncated at a line, binary files skipped, bad bytes replaced."""
+    big_py = tmp_path / "big.py"
+    big_py.write_text("".join(f"class C{i}:\n    x = {i}\n\n" for i in range(100)), encoding="utf-8")
+    result = extract_python_classes(str(big_py), max_bytes=100)
+    assert result.startswith("Class: C0\nclass C0:\n    x = 0")
+    assert "Class: C99" not in result
+    assert result.splitlines()[-1].startswith("[... truncated:")
+
+    binary = tmp_path / "data.toml"
+    binary.write_bytes(b"a = 1\x00\x01\x02")
+    assert read_toml_content(str(binary)) == "[Binary file skipped: 8 bytes]"
+
+    latin1 = tmp_path / "Dockerfile"
+    latin1.write_bytes(b"LABEL author=\"M\xfcller\"\r\n")
+    assert read_dockerfile_content(str(latin1)) == "LABEL author=\"M�ller\"\n"
+
+def test_single_parse_extractors_and_prefilter(tmp_path, monkeypatch):
+    """All extractors share one parse; files without candidate keywords are not parsed."""
+    source = tmp_path / "mod.py"
+    source.write_text('"""Module doc."""\nimport os\n\nclass A:\n    def m(self, x: int = 1) -> str:\n'
+                      '        return ""\n\ndef f(*args):\n    """F doc."""\n', encoding="utf-8")
+    parses = []
+    import ast
+    real_parse = ast.parse
+    monkeypatch.setattr(ast, "parse", lambda *a, **k: parses.append(1) or real_parse(*a, **k))
+
+    result = extract_python(str(source), extractors=["functions", "imports", "docstrings", "classes"])
+    assert len(parses) == 1
+    assert result.splitlines()[:3] == ["Import: import os", "Docstring (module):", "Module doc."]
+    assert "Class: A\nclass A:" in result
+    assert "Function: def A.m(self, x: int=1) -> str" in result
+    assert "Function: def f(*args)" in result
+
+    no_classes = tmp_path / "settings.py"
+    no_classes.write_text("# class Foo is mentioned here\nDEBUG = True\n", encoding="utf-8")
+    assert extract_python_classes(str(no_classes)) == ""
+    assert len(parses) == 1
+
+def test_parser_table_dispatches_names_suffixes_and_globs():
+    """Lookup tables give the same parsers as the declared names, suffixes and globs."""
+    table = ParserTable(registered_parsers())
+    assert table.kinds_for("main.py") == ("python",)
+    assert table.kinds_for("dockerfile") == ("docker",)
+    assert table.kinds_for("dockerfile.prod") == ("docker",)
+    assert table.kinds_for("dockerfile.toml") == ("docker", "toml")
+    assert table.kinds_for("pyproject.toml") == ("toml",)
+    assert table.kinds_for("main.pyc") == ()
+
+    read = lambda file_path, max_bytes: ""
+    table = ParserTable([
+        ParserSpec("make", read, 1, filenames=("Makefile",), globs=("*.mk",)),
+        ParserSpec("reqs", read, 1, globs=("requirements*.txt",)),
+        ParserSpec("archive", read, 1, suffixes=(".tar.gz",)),
+    ])
+    assert table.kinds_for("makefile") == ("make",)
+    assert table.kinds_for("rules.mk") == ("make",)
+    assert table.kinds_for("requirements-dev.txt") == ("reqs",)
+    assert table.kinds_for("notes.txt") == ()
+    assert table.kinds_for("src.tar.gz") == ("archive",)
@@ -0,0 +1,87 @@
+# tests/test_result_cache.py
+# ---------------------------------------------------------------------
+# Author: Marvin Schubert
+# © 2025, Marvin Schubert. All rights reserved.
+#
+# Description:
+# Tests for the GUI's scan result cache: complete keys, LRU eviction
+# by size and invalidation after file system changes.
+# ---------------------------------------------------------------------
+
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from app.config import Settings
+from app.file_scanner import FileScanner
+from app.result_cache import ResultCache, estimate_bytes
+
+def _scan(settings, root):
+    scanner = FileScanner(settings, str(root))
+    scanner.scan()
+    return scanner.snapshot()
+
+def _bump_mtime(path):
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+def test_cache_key_and_invalidation(tmp_path):
+    """Every scan setting is part of the key, and changed folders or files miss."""
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "a.py").write_text("class A:\n    pass\n", encoding="utf-8")
+    settings = Settings(parser_workers=1, use_parse_cache=False)
+    cache = ResultCache(10_000_000)
+    cache.put(str(tmp_path), settings, _scan(settings, tmp_path))
+
+    assert cache.get(str(tmp_path), settings) is not None
+    for name, value in (("skip_git", False), ("skip_python_aux", True), ("max_file_bytes", 10)):
+        changed = Settings(parser_workers=1, use_parse_cache=False, **{name: value})
+        assert cache.get(str(tmp_path), changed) is None
+    # Settings that do not change the result share the entry
+    assert cache.get(str(tmp_path), Settings(parser_workers=4, stream_results=False)) is not None
+
+    # A parsed file is edited in place
+    (tmp_path / "pkg" / "a.py").write_text("class B:\n    pass\n", encoding="utf-8")
+    _bump_mtime(tmp_path / "pkg" / "a.py")
+    assert cache.get(str(tmp_path), settings) is None and len(cache) == 0
+
+    # An entry is added to a nested folder
+    cache.put(str(tmp_path), settings, _scan(settings, tmp_path))
+    (tmp_path / "pkg" / "notes.txt").write_text("", encoding="utf-8")
+    _bump_mtime(tmp_path / "pkg")
+    assert cache.get(str(tmp_path), settings) is None
+
+    # Stamps are taken while scanning: an edit after the scan but before
+    # the result is stored still invalidates it
+    snapshot = _scan(settings, tmp_path)
+    _bump_mtime(tmp_path / "pkg" / "a.py")
+    cache.put(str(tmp_path), settings, snapshot)
+    assert cache.get(str(tmp_path), settings, check=False) is snapshot
+    assert cache.get(str(tmp_path), settings) is None
+
+def test_cache_evicts_least_recently_used_by_size(tmp_path):
+    """The total estimated size stays within the budget, oldest entries go first."""
+    settings = Settings(parser_workers=1, use_parse_cache=False)
+    snapshots = {}
+    for name in ("a", "b", "c"):
+        folder = tmp_path / name
+        folder.mkdir()
+        for i in range(20):
+            (folder / f"file_{i}.txt").write_text("", encoding="utf-8")
+        snapshots[name] = _scan(settings, folder)
+    size = estimate_bytes(snapshots["a"])
+    cache = ResultCache(2 * size + size // 2)
+
+    cache.put(str(tmp_path / "a"), settings, snapshots["a"])
+    cache.put(str(tmp_path / "b"), settings, snapshots["b"])
+    assert cache.get(str(tmp_path / "a"), settings) is snapshots["a"]
+    cache.put(str(tmp_path / "c"), settings, snapshots["c"])
+
+    assert len(cache) == 2 and cache.total_bytes <= cache.max_bytes
+    assert cache.get(str(tmp_path / "b"), settings) is None
+    assert cache.get(str(tmp_path / "a"), settings) is snapshots["a"]
+    assert cache.get(str(tmp_path / "c"), settings) is snapshots["c"]
+
+    # A result larger than the whole budget is not stored
+    small = ResultCache(size - 1)
+    small.put(str(tmp_path / "a"), settings, snapshots["a"])
+    assert len(small) == 0 and small.total_bytes == 0